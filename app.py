@@ -38,7 +38,86 @@ from frontend.display_plots.power_cost_display import (
 
 # Import data management
 from backend.data.db_data_manager import load_client_data
-from db.db_setup import CONN
+from backend.data.data_bundle import request_scope, tod_view_fetches
+from backend.data.query_scheduler import run_fetches
+from backend.data.prefetch import prefetch_views
+from frontend.display_plots.chart_output import chart_batch
+from db.db_setup import connection_scope, is_db_available
+
+def render_summary_view(client_name, plant_name, start_date, end_date):
+    """Render the Summary tab"""
+    
+    # Automatically display all plots
+    st.subheader("Generation vs Consumption")
+    with st.spinner("Loading generation vs consumption data..."):
+        display_generation_vs_consumption(client_name, start_date, end_date, plant_name=plant_name)
+    
+    st.markdown("---")
+    
+    st.subheader("Generation Analysis")
+    with st.spinner("Loading generation data..."):
+        display_generation_only(client_name, start_date, end_date, plant_name=plant_name)
+    
+    st.markdown("---")
+    
+    st.subheader("Consumption Analysis")
+    with st.spinner("Loading consumption data..."):
+        display_consumption_only(client_name, start_date, end_date, plant_name=plant_name)
+
+def render_tod_view(client_name, plant_name, start_date, end_date):
+    """Render the ToD Analysis tab"""
+    
+    # The panels' queries are independent, run them all at once up front
+    with st.spinner("Loading ToD data..."):
+        run_fetches(tod_view_fetches(client_name, start_date, end_date, plant_name))
+    
+    # Automatically display all ToD plots
+    st.subheader("Monthly ToD Before Banking")
+    with st.spinner("Loading monthly ToD data..."):
+        display_monthly_tod_before_banking(client_name, plant_name)
+    
+    st.markdown("---")
+    
+    st.subheader("Monthly Banking Settlement")
+    with st.spinner("Loading banking settlement data..."):
+        display_monthly_banking_settlement(client_name, plant_name)
+    
+    st.markdown("---")
+    
+    st.subheader("ToD Generation vs Consumption")
+    with st.spinner("Loading ToD comparison data..."):
+        display_tod_generation_vs_consumptiont(client_name, start_date, end_date, plant_name=plant_name)
+    
+    st.markdown("---")
+    
+    st.subheader("ToD Generation Analysis")
+    with st.spinner("Loading ToD generation data..."):
+        display_tod_generation(client_name, start_date, end_date, plant_name=plant_name)
+    
+    st.markdown("---")
+    
+    st.subheader("ToD Consumption Analysis")
+    with st.spinner("Loading ToD consumption data..."):
+        display_tod_consumption(client_name, start_date, end_date, plant_name=plant_name)
+
+def render_power_cost_view(client_name, plant_name, start_date, end_date):
+    """Render the Power Cost Analysis tab"""
+    st.header("💰 Power Cost Analysis")
+    display_power_cost_analysis(client_name, plant_name)
+
+# Tab label -> render function, in display order
+VIEWS = {
+    "Summary": render_summary_view,
+    "ToD Analysis": render_tod_view,
+    "Power Cost Analysis": render_power_cost_view
+}
+
+# Tab label -> prefetch key used by backend.data.prefetch
+VIEW_KEYS = {
+    "Summary": "summary",
+    "ToD Analysis": "tod",
+    "Power Cost Analysis": "cost"
+}
 
 def main():
     """Main application function"""
@@ -82,78 +161,32 @@ def main():
         
         # Main content area
         if selected_client:
+            # Show database connection status
+            if not is_db_available():
+                st.error("❌ Database connection failed. Please check your database configuration.")
+                st.stop()
             
-            # Create tabs
-            tab1, tab2, tab3 = st.tabs(["Summary", "ToD Analysis", "Power Cost Analysis"])
-            
-            with tab1:
-                # Determine what to pass to display functions
-                display_name = selected_plant if selected_plant else selected_client
-                
-                # Show database connection status
-                if CONN is None:
-                    st.error("❌ Database connection failed. Please check your database configuration.")
-                    st.stop()
-                
-                # Automatically display all plots
-                st.subheader("Generation vs Consumption")
-                with st.spinner("Loading generation vs consumption data..."):
-                    display_generation_vs_consumption(display_name, start_date, end_date)
-                
-                st.markdown("---")
-                
-                st.subheader("Generation Analysis")
-                with st.spinner("Loading generation data..."):
-                    display_generation_only(display_name, start_date, end_date)
-                
-                st.markdown("---")
-                
-                st.subheader("Consumption Analysis")
-                with st.spinner("Loading consumption data..."):
-                    display_consumption_only(display_name, start_date, end_date)
-            
-            with tab2:
-                
-                
-                # Show database connection status
-                if CONN is None:
-                    st.error("❌ Database connection failed. Please check your database configuration.")
-                    st.stop()
-                
-                # Automatically display all ToD plots
-                st.subheader("Monthly ToD Before Banking")
-                with st.spinner("Loading monthly ToD data..."):
-                    display_monthly_tod_before_banking(display_name)
-                
-                st.markdown("---")
-                
-                st.subheader("Monthly Banking Settlement")
-                with st.spinner("Loading banking settlement data..."):
-                    display_monthly_banking_settlement(display_name)
-                
-                st.markdown("---")
-                
-                st.subheader("ToD Generation vs Consumption")
-                with st.spinner("Loading ToD comparison data..."):
-                    display_tod_generation_vs_consumptiont(display_name, start_date, end_date)
-                
-                st.markdown("---")
-                
-                st.subheader("ToD Generation Analysis")
-                with st.spinner("Loading ToD generation data..."):
-                    display_tod_generation(display_name, start_date, end_date)
-                
-                st.markdown("---")
-                
-                st.subheader("ToD Consumption Analysis")
-                with st.spinner("Loading ToD consumption data..."):
-                    display_tod_consumption(display_name, start_date, end_date)
-            
-            with tab3:
-                st.header("💰 Power Cost Analysis")
-                display_power_cost_analysis(display_name)
-                
-                
+            if FEATURES.get("lazy_tabs", False):
+                # Only the selected view fetches and renders
+                active_view = st.radio(
+                    "View",
+                    options=list(VIEWS.keys()),
+                    horizontal=True,
+                    key="active_view",
+                    label_visibility="collapsed"
+                )
+                VIEWS[active_view](selected_client, selected_plant, start_date, end_date)
+                
+                if FEATURES.get("background_prefetch", False):
+                    other_views = [VIEW_KEYS[view] for view in VIEWS if view != active_view]
+                    prefetch_views(other_views, selected_client, start_date, end_date, selected_plant)
+            else:
+                # Create tabs
+                tabs = st.tabs(list(VIEWS.keys()))
+                
+                for tab, render_view in zip(tabs, VIEWS.values()):
+                    with tab:
+                        render_view(selected_client, selected_plant, start_date, end_date)
         
         else:
             # No content when no selection is made
@@ -168,4 +201,7 @@ def main():
             st.code(str(e))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Share one pooled connection and the fetched data between panels
+    # for the duration of this script run; charts are rendered together at the end
+    with connection_scope(), request_scope(), chart_batch():
+        main()
@@ -0,0 +1,232 @@
+"""
+Data Bundle
+Per-request store that lets several display panels share a single fetch
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple
+
+import pandas as pd
+
+from backend.data.plant_directory import resolve_plant_id
+from db.db_setup import CONN
+from db.fetch_summary_data import fetch_generation_consumption_data
+from db.fetch_tod_tab_data import (
+    fetch_daily_tod_data,
+    fetch_all_daily_tod_data,
+    fetch_combined_monthly_data
+)
+from visualizations.resolution import choose_resolution
+from visualizations.tod_calculations import pivot_tod_measures, slot_totals
+
+# Bundle store of the script run executing on the current thread
+_local = threading.local()
+
+# Process-wide counters, used to confirm duplicate fetches are gone
+_stats = {"hits": 0, "misses": 0}
+_stats_lock = threading.Lock()
+
+
+def _record(outcome: str):
+    with _stats_lock:
+        _stats[outcome] += 1
+
+
+@contextmanager
+def request_scope():
+    """
+    Open a bundle scope for one Streamlit script run.
+
+    Every fetch made through the bundle inside the scope is performed once and
+    the result is shared by all panels. The store is dropped when the scope exits.
+    """
+    previous = getattr(_local, "store", None)
+    _local.store = {}
+    try:
+        yield _local.store
+    finally:
+        logging.debug(f"Data bundle scope closed with {len(_local.store)} entries, totals {get_bundle_stats()}")
+        _local.store = previous
+
+
+def get_or_fetch(key: Hashable, loader: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Return the bundled result for key, calling loader only on the first request.
+
+    Args:
+        key: Hashable identity of the data being requested
+        loader: Function that fetches the data
+        *args, **kwargs: Passed through to loader
+
+    Returns:
+        The loader result. Results are shared, so callers must not mutate them.
+    """
+    store = getattr(_local, "store", None)
+
+    if store is not None and key in store:
+        _record("hits")
+        return store[key]
+
+    _record("misses")
+    result = loader(*args, **kwargs)
+
+    # Outside a request scope nothing is retained
+    if store is not None:
+        store[key] = result
+    return result
+
+
+def in_request_scope() -> bool:
+    return getattr(_local, "store", None) is not None
+
+
+def is_bundled(key: Hashable) -> bool:
+    """True if key already has a result in the current request scope."""
+    store = getattr(_local, "store", None)
+    return store is not None and key in store
+
+
+def put_bundled(key: Hashable, result: Any) -> bool:
+    """
+    Store a result fetched elsewhere (e.g. by the query scheduler) under key.
+
+    Returns:
+        False when no request scope is open and the result was dropped
+    """
+    store = getattr(_local, "store", None)
+    if store is None:
+        return False
+    _record("misses")
+    store[key] = result
+    return True
+
+
+class Fetch(NamedTuple):
+    """A bundled fetch: the bundle key and the loader call that produces its result."""
+    key: tuple
+    loader: Callable[..., Any]
+    args: tuple
+
+
+def fetch_bundled(fetch: Fetch) -> Any:
+    return get_or_fetch(fetch.key, fetch.loader, *fetch.args)
+
+
+def _date_key(value) -> str:
+    return value.strftime('%Y-%m-%d') if hasattr(value, 'strftime') else str(value)
+
+
+def get_summary_data(
+    client_name: str,
+    start_date: str,
+    end_date: str,
+    resolution: str = "day",
+    plant_name: str = None
+) -> pd.DataFrame:
+    """
+    Get the Summary tab frame for a client (or one of its plants) and date range, fetched once per request.
+
+    Args:
+        client_name: Name of the client
+        start_date: Start date (YYYY-MM-DD)
+        end_date: End date (YYYY-MM-DD)
+        resolution: Date bin of multi-day ranges ('day', 'week' or 'month')
+        plant_name: One of the client's plants, or None for all of them
+
+    Returns:
+        Shared generation/consumption DataFrame (treat as read-only)
+    """
+    key = ("summary", client_name, plant_name, start_date, end_date, resolution)
+    return get_or_fetch(
+        key, fetch_generation_consumption_data,
+        CONN, client_name, start_date, end_date, resolution, resolve_plant_id(client_name, plant_name)
+    )
+
+
+##ToD
+def daily_tod_fetch(client_name: str, start_date, end_date=None, resolution: str = "day", plant_name: str = None) -> Fetch:
+    key = ("tod_daily", client_name, plant_name, _date_key(start_date), end_date and _date_key(end_date), resolution)
+    plant_id = resolve_plant_id(client_name, plant_name)
+    return Fetch(key, fetch_daily_tod_data, (CONN, client_name, start_date, end_date, None, resolution, plant_id))
+
+
+def all_daily_tod_fetch(client_name: str, resolution: str = "month", plant_name: str = None) -> Fetch:
+    key = ("tod_all", client_name, plant_name, resolution)
+    plant_id = resolve_plant_id(client_name, plant_name)
+    return Fetch(key, fetch_all_daily_tod_data, (CONN, client_name, None, resolution, plant_id))
+
+
+def combined_monthly_fetch(client_name: str, plant_name: str = None) -> Fetch:
+    key = ("tod_monthly_banking", client_name, plant_name)
+    return Fetch(key, fetch_combined_monthly_data, (CONN, client_name, resolve_plant_id(client_name, plant_name)))
+
+
+def get_tod_daily_pivots(
+    client_name: str,
+    start_date,
+    end_date=None,
+    resolution: str = "day",
+    plant_name: str = None
+) -> Dict[str, pd.DataFrame]:
+    """
+    Get the date x slot tables of both ToD measures, fetched and pivoted once per request.
+
+    Returns:
+        Shared dict of measure -> pivot table, see pivot_tod_measures (treat as read-only)
+    """
+    fetch = daily_tod_fetch(client_name, start_date, end_date, resolution, plant_name)
+    return get_or_fetch(("tod_daily_pivots",) + fetch.key[1:], lambda: pivot_tod_measures(fetch_bundled(fetch)))
+
+
+def get_tod_slot_totals(
+    client_name: str,
+    start_date,
+    end_date=None,
+    resolution: str = "day",
+    plant_name: str = None
+) -> pd.DataFrame:
+    """
+    Get the per-slot totals of the range (ToD binned view), derived from the daily
+    pivots rather than queried separately.
+
+    Returns:
+        Shared slot totals DataFrame, see slot_totals (treat as read-only)
+    """
+    key = ("tod_slot_totals",) + daily_tod_fetch(client_name, start_date, end_date, resolution, plant_name).key[1:]
+    return get_or_fetch(
+        key, lambda: slot_totals(get_tod_daily_pivots(client_name, start_date, end_date, resolution, plant_name))
+    )
+
+
+def tod_view_fetches(client_name: str, start_date, end_date=None, plant_name: str = None) -> List[Fetch]:
+    """
+    Every fetch the ToD tab makes, for the query scheduler.
+
+    The three range panels (binned, generation, consumption) all derive from the
+    same daily frame, so it appears once.
+    """
+    return [
+        all_daily_tod_fetch(client_name, resolution="month", plant_name=plant_name),
+        combined_monthly_fetch(client_name, plant_name),
+        daily_tod_fetch(client_name, start_date, end_date, choose_resolution(start_date, end_date), plant_name)
+    ]
+
+
+def get_bundle_stats() -> Dict[str, int]:
+    """
+    Get bundle hit/miss counters since process start (or last reset)
+
+    Returns:
+        Dictionary with 'hits' and 'misses'
+    """
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_bundle_stats():
+    """Reset bundle hit/miss counters"""
+    with _stats_lock:
+        for outcome in _stats:
+            _stats[outcome] = 0
@@ -6,13 +6,28 @@ Handles data loading and management for the dashboard
 import pandas as pd
 import logging
 from typing import Dict, List, Optional
-from db.db_setup import CONN
-from db.safe_db_utils import safe_read_sql
+from db.db_setup import CONN, is_db_available
+from db.safe_db_utils import safe_read_typed
+from backend.data.plant_directory import PLANT_DIRECTORY, resolve_plant_id
+
+# Column types of the get_data_summary query
+DATA_SUMMARY_SCHEMA = {
+    'total_days': 'int64',
+    'first_date': 'datetime64',
+    'last_date': 'datetime64',
+    'total_generation': 'float64',
+    'total_consumption': 'float64',
+    'avg_generation': 'float64',
+    'avg_consumption': 'float64'
+}
 
 def get_plants() -> Dict[str, Dict[str, List[str]]]:
     """
-    Fetch all plants from the database and organize by client and type
-    
+    Fetch all plants from tbl_plants and organize by client and type
+
+    Served from the in-process plant directory, which reloads tbl_plants
+    once its TTL has expired.
+
     Returns:
         Dictionary with structure:
         {
@@ -22,39 +37,12 @@ def get_plants() -> Dict[str, Dict[str, List[str]]]:
             }
         }
     """
-    if CONN is None:
+    if not is_db_available():
         logging.error("Database connection not available")
         return {}
     
     try:
-        # Query to get all unique client names from settlement_data
-        query = """
-        SELECT DISTINCT client_name 
-        FROM settlement_data 
-        WHERE client_name IS NOT NULL 
-        ORDER BY client_name
-        """
-        
-        df = safe_read_sql(query, CONN)
-        
-        if df.empty:
-            logging.warning("No clients found in settlement_data table")
-            return {}
-        
-        # For now, we'll create a mock structure since we don't have plant type info
-        # In a real implementation, you would have a plants table with type information
-        client_data = {}
-        
-        for client in df['client_name'].tolist():
-            # Mock plant data - in reality, this would come from a plants table
-            client_data[client] = {
-                'solar': [f"{client}_Solar_Plant"],
-                'wind': [f"{client}_Wind_Plant"] if client != "Combined_Client" else []
-            }
-        
-        logging.info(f"Loaded {len(client_data)} clients")
-        return client_data
-        
+        return PLANT_DIRECTORY.clients()
     except Exception as e:
         logging.error(f"Error fetching plants: {str(e)}")
         return {}
@@ -69,8 +57,7 @@ def get_client_plants(client_name: str) -> Dict[str, List[str]]:
     Returns:
         Dictionary with solar and wind plant lists
     """
-    all_plants = get_plants()
-    return all_plants.get(client_name, {'solar': [], 'wind': []})
+    return PLANT_DIRECTORY.client_plants(client_name)
 
 def load_client_data() -> Dict[str, Dict[str, List[str]]]:
     """
@@ -96,9 +83,7 @@ def validate_client_plant_selection(client_name: str, plant_name: str) -> bool:
     Returns:
         True if valid, False otherwise
     """
-    client_plants = get_client_plants(client_name)
-    all_plants = client_plants['solar'] + client_plants['wind']
-    return plant_name in all_plants
+    return PLANT_DIRECTORY.plant_type(client_name, plant_name) is not None
 
 def get_plant_type(client_name: str, plant_name: str) -> Optional[str]:
     """
@@ -111,14 +96,7 @@ def get_plant_type(client_name: str, plant_name: str) -> Optional[str]:
     Returns:
         'solar', 'wind', or None if not found
     """
-    client_plants = get_client_plants(client_name)
-    
-    if plant_name in client_plants['solar']:
-        return 'solar'
-    elif plant_name in client_plants['wind']:
-        return 'wind'
-    else:
-        return None
+    return PLANT_DIRECTORY.plant_type(client_name, plant_name)
 
 def get_available_date_range(client_name: str, plant_name: str = None) -> Dict[str, str]:
     """
@@ -131,7 +109,7 @@ def get_available_date_range(client_name: str, plant_name: str = None) -> Dict[s
     Returns:
         Dictionary with 'min_date' and 'max_date'
     """
-    if CONN is None:
+    if not is_db_available():
         return {'min_date': None, 'max_date': None}
     
     try:
@@ -143,12 +121,14 @@ def get_available_date_range(client_name: str, plant_name: str = None) -> Dict[s
         params = [client_name]
         
         # If specific plant is provided, add it to the filter
-        # Note: This assumes you have a plant_name column in settlement_data
-        # Adjust based on your actual database schema
+        plant_id = resolve_plant_id(client_name, plant_name)
+        if plant_id is not None:
+            query += " AND plant_id = %s"
+            params.append(plant_id)
         
-        df = safe_read_sql(query, CONN, params)
+        df = safe_read_typed(query, CONN, params, {'min_date': 'datetime64', 'max_date': 'datetime64'})
         
-        if not df.empty and df.iloc[0]['min_date'] is not None:
+        if not df.empty and pd.notna(df.iloc[0]['min_date']):
             return {
                 'min_date': df.iloc[0]['min_date'].strftime('%Y-%m-%d'),
                 'max_date': df.iloc[0]['max_date'].strftime('%Y-%m-%d')
@@ -166,14 +146,14 @@ def check_data_availability(client_name: str, plant_name: str, start_date: str,
     
     Args:
         client_name: Name of the client
-        plant_name: Name of the plant
+        plant_name: Name of the plant, or None for all of the client's plants
         start_date: Start date (YYYY-MM-DD)
         end_date: End date (YYYY-MM-DD)
         
     Returns:
         True if data is available, False otherwise
     """
-    if CONN is None:
+    if not is_db_available():
         return False
     
     try:
@@ -183,8 +163,14 @@ def check_data_availability(client_name: str, plant_name: str, start_date: str,
         WHERE client_name = %s 
         AND date BETWEEN %s AND %s
         """
+        params = [client_name, start_date, end_date]
+        
+        plant_id = resolve_plant_id(client_name, plant_name)
+        if plant_id is not None:
+            query += " AND plant_id = %s"
+            params.append(plant_id)
         
-        df = safe_read_sql(query, CONN, [client_name, start_date, end_date])
+        df = safe_read_typed(query, CONN, params, {'count': 'int64'})
         
         return df.iloc[0]['count'] > 0 if not df.empty else False
         
@@ -192,17 +178,18 @@ def check_data_availability(client_name: str, plant_name: str, start_date: str,
         logging.error(f"Error checking data availability: {str(e)}")
         return False
 
-def get_data_summary(client_name: str) -> Dict:
+def get_data_summary(client_name: str, plant_name: str = None) -> Dict:
     """
-    Get summary statistics for a client
+    Get summary statistics for a client/plant
     
     Args:
         client_name: Name of the client
+        plant_name: Name of the plant (optional)
         
     Returns:
         Dictionary with summary statistics
     """
-    if CONN is None:
+    if not is_db_available():
         return {}
     
     try:
@@ -218,18 +205,26 @@ def get_data_summary(client_name: str) -> Dict:
         FROM settlement_data
         WHERE client_name = %s
         """
+        params = [client_name]
+        
+        plant_id = resolve_plant_id(client_name, plant_name)
+        if plant_id is not None:
+            query += " AND plant_id = %s"
+            params.append(plant_id)
         
-        df = safe_read_sql(query, CONN, [client_name])
+        df = safe_read_typed(query, CONN, params, DATA_SUMMARY_SCHEMA)
         
         if not df.empty:
+            row = df.iloc[0]
+            # Empty aggregates arrive as NaN / NaT
             return {
-                'total_days': int(df.iloc[0]['total_days']) if df.iloc[0]['total_days'] else 0,
-                'first_date': df.iloc[0]['first_date'].strftime('%Y-%m-%d') if df.iloc[0]['first_date'] else None,
-                'last_date': df.iloc[0]['last_date'].strftime('%Y-%m-%d') if df.iloc[0]['last_date'] else None,
-                'total_generation': float(df.iloc[0]['total_generation']) if df.iloc[0]['total_generation'] else 0,
-                'total_consumption': float(df.iloc[0]['total_consumption']) if df.iloc[0]['total_consumption'] else 0,
-                'avg_generation': float(df.iloc[0]['avg_generation']) if df.iloc[0]['avg_generation'] else 0,
-                'avg_consumption': float(df.iloc[0]['avg_consumption']) if df.iloc[0]['avg_consumption'] else 0
+                'total_days': int(row['total_days']),
+                'first_date': row['first_date'].strftime('%Y-%m-%d') if pd.notna(row['first_date']) else None,
+                'last_date': row['last_date'].strftime('%Y-%m-%d') if pd.notna(row['last_date']) else None,
+                'total_generation': float(row['total_generation']) if pd.notna(row['total_generation']) else 0,
+                'total_consumption': float(row['total_consumption']) if pd.notna(row['total_consumption']) else 0,
+                'avg_generation': float(row['avg_generation']) if pd.notna(row['avg_generation']) else 0,
+                'avg_consumption': float(row['avg_consumption']) if pd.notna(row['avg_consumption']) else 0
             }
         else:
             return {}
@@ -0,0 +1,234 @@
+"""
+Plant Directory
+In-process index of tbl_plants by client and by (client, plant name)
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from config.app_config import PLANT_DIRECTORY_CONFIG
+from db.db_setup import CONN
+from db.safe_db_utils import safe_read_typed
+from helper.utils import fetch_all_plants
+
+# Accepted tbl_plants column names, first match wins
+CLIENT_COLUMNS = ("client_name", "client")
+PLANT_COLUMNS = ("plant_name", "name")
+TYPE_COLUMNS = ("type", "plant_type")
+ID_COLUMNS = ("plant_id", "id")
+
+PLANT_TYPES = ("solar", "wind")
+
+# Plant views filter settlement_data by plant_id, added by `python -m db.migrations apply`
+PLANT_COLUMN_QUERY = """
+    SELECT COUNT(*) AS found FROM information_schema.columns
+    WHERE table_schema = DATABASE() AND table_name = 'settlement_data' AND column_name = 'plant_id'
+"""
+# The column alone is not enough: until the loader (or `python -m db.migrations backfill`)
+# fills it, filtering a client's rows by plant_id finds nothing
+PLANT_ROWS_QUERY = """
+    SELECT EXISTS (
+        SELECT 1 FROM settlement_data WHERE client_name = %s AND plant_id IS NOT NULL
+    ) AS found
+"""
+
+
+def _pick_column(df: pd.DataFrame, candidates: tuple) -> Optional[str]:
+    columns = {str(column).lower(): column for column in df.columns}
+    for candidate in candidates:
+        if candidate in columns:
+            return columns[candidate]
+    return None
+
+
+def _build_index(df: pd.DataFrame) -> tuple:
+    """
+    Index tbl_plants rows.
+
+    Returns:
+        (by_client, by_plant): client -> {type: [plant names]} and
+        (client, plant name) -> {'client_name', 'plant_name', 'type', 'plant_id'};
+        plant names are only unique within a client
+    """
+    client_column = _pick_column(df, CLIENT_COLUMNS)
+    plant_column = _pick_column(df, PLANT_COLUMNS)
+    if client_column is None or plant_column is None:
+        logging.error(f"tbl_plants has no client/plant name columns: {list(df.columns)}")
+        return {}, {}
+    type_column = _pick_column(df, TYPE_COLUMNS)
+    id_column = _pick_column(df, ID_COLUMNS)
+
+    by_client: Dict[str, Dict[str, List[str]]] = {}
+    by_plant: Dict[Tuple[str, str], dict] = {}
+    for row in df.to_dict("records"):
+        client, plant = row[client_column], row[plant_column]
+        if pd.isna(client) or pd.isna(plant):
+            continue
+        client, plant = str(client).strip(), str(plant).strip()
+        plant_type = str(row[type_column]).strip().lower() if type_column and not pd.isna(row[type_column]) else "solar"
+
+        plants = by_client.setdefault(client, {kind: [] for kind in PLANT_TYPES})
+        plants.setdefault(plant_type, []).append(plant)
+        by_plant[(client, plant)] = {
+            "client_name": client,
+            "plant_name": plant,
+            "type": plant_type,
+            "plant_id": row[id_column] if id_column else None
+        }
+
+    for plants in by_client.values():
+        for names in plants.values():
+            names.sort()
+    return by_client, by_plant
+
+
+class PlantDirectory:
+    """
+    Client and plant lookups served from memory, reloaded from tbl_plants after ttl seconds.
+    After a failed reload the previous index is served for retry_after seconds
+    before tbl_plants is queried again. Whether a client's settlement rows carry
+    a plant_id is checked once per client and reload.
+    """
+
+    def __init__(self, ttl: float, retry_after: float = 30):
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self._by_client: Dict[str, Dict[str, List[str]]] = {}
+        self._by_plant: Dict[Tuple[str, str], dict] = {}
+        self._loaded_at = None
+        self._failed_at = None
+        self._has_plant_column = True
+        self._client_has_plant_rows: Dict[str, bool] = {}
+        self._lock = threading.Lock()
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    def _backing_off(self) -> bool:
+        return self._failed_at is not None and time.monotonic() - self._failed_at < self.retry_after
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Reload tbl_plants if the directory is stale (or force is set).
+
+        A failed or empty reload keeps the previous index, which is served
+        until the reload is retried after retry_after seconds.
+
+        Returns:
+            True if the directory holds data afterwards
+        """
+        if not force and (self._is_fresh() or self._backing_off()):
+            return bool(self._by_plant)
+        with self._lock:
+            # Another thread may have reloaded (or failed to) while this one waited
+            if not force and (self._is_fresh() or self._backing_off()):
+                return bool(self._by_plant)
+            df = fetch_all_plants(CONN, use_cache=False)
+            if df.empty:
+                self._failed_at = time.monotonic()
+                logging.warning(f"No plants found in tbl_plants, retrying in {self.retry_after}s")
+                return bool(self._by_plant)
+
+            # Swap whole indexes so readers never see a half-built one
+            self._by_client, self._by_plant = _build_index(df)
+            self._has_plant_column = self._check_plant_column()
+            self._client_has_plant_rows = {}
+            self._loaded_at = time.monotonic()
+            self._failed_at = None
+            logging.info(f"Plant directory loaded {len(self._by_plant)} plants for {len(self._by_client)} clients")
+            return bool(self._by_plant)
+
+    @staticmethod
+    def _check_plant_column() -> bool:
+        df = safe_read_typed(PLANT_COLUMN_QUERY, CONN, schema={"found": "int64"}, use_cache=False)
+        # An unanswered check leaves plant filtering on; the plant queries report their own errors
+        if df.empty or df.iloc[0]["found"] > 0:
+            return True
+        logging.warning("settlement_data has no plant_id column, plant views show the whole client; "
+                        "run `python -m db.migrations apply`")
+        return False
+
+    def has_plant_column(self) -> bool:
+        """Whether settlement_data has the plant_id column."""
+        self.refresh()
+        return self._has_plant_column
+
+    def has_plant_rows(self, client_name: str) -> bool:
+        """Whether any of the client's settlement_data rows carry a plant_id, so they can be filtered by plant."""
+        if not self.has_plant_column():
+            return False
+        found = self._client_has_plant_rows.get(client_name)
+        if found is None:
+            df = safe_read_typed(PLANT_ROWS_QUERY, CONN, (client_name,), schema={"found": "int64"}, use_cache=False)
+            if df.empty:
+                # Not cached, so the check is retried on the next lookup
+                return False
+            found = bool(df.iloc[0]["found"])
+            if not found:
+                logging.warning(f"No settlement_data rows of client {client_name} have a plant_id, "
+                                "plant views show the whole client; run `python -m db.migrations backfill`")
+            self._client_has_plant_rows[client_name] = found
+        return found
+
+    def invalidate(self):
+        """Mark the directory stale, e.g. after tbl_plants changed; the next lookup reloads it."""
+        self._loaded_at = None
+        self._failed_at = None
+
+    def clients(self) -> Dict[str, Dict[str, List[str]]]:
+        """All clients with their plants by type: {client: {'solar': [...], 'wind': [...]}}."""
+        self.refresh()
+        return self._by_client
+
+    def client_plants(self, client_name: str) -> Dict[str, List[str]]:
+        self.refresh()
+        return self._by_client.get(client_name, {kind: [] for kind in PLANT_TYPES})
+
+    def plant(self, client_name: str, plant_name: str) -> Optional[dict]:
+        """The client's plant as client_name, plant_name, type and plant_id, or None."""
+        self.refresh()
+        return self._by_plant.get((client_name, plant_name))
+
+    def plant_type(self, client_name: str, plant_name: str) -> Optional[str]:
+        record = self.plant(client_name, plant_name)
+        return record["type"] if record is not None else None
+
+    def plant_id(self, client_name: str, plant_name: str):
+        """The tbl_plants id of one of client_name's plants, or None if it is not theirs or has no id."""
+        record = self.plant(client_name, plant_name)
+        return record["plant_id"] if record is not None else None
+
+
+# Shared directory for the whole Streamlit server process
+PLANT_DIRECTORY = PlantDirectory(PLANT_DIRECTORY_CONFIG["ttl"], PLANT_DIRECTORY_CONFIG["retry_after"])
+
+
+def invalidate_plant_directory():
+    """Reload tbl_plants on the next lookup."""
+    PLANT_DIRECTORY.invalidate()
+
+
+def resolve_plant_id(client_name: str, plant_name: Optional[str] = None):
+    """
+    The plant_id to filter a client's queries by.
+
+    Args:
+        client_name: Selected client
+        plant_name: Selected plant, or None for the combined view
+
+    Returns:
+        The plant's tbl_plants id, or None for the whole client. An unknown plant,
+        or a client whose settlement_data rows have no plant_id (column missing or
+        not filled yet), also falls back to the whole client rather than showing
+        an empty page.
+    """
+    if not plant_name or not PLANT_DIRECTORY.has_plant_rows(client_name):
+        return None
+    plant_id = PLANT_DIRECTORY.plant_id(client_name, plant_name)
+    if plant_id is None:
+        logging.warning(f"No plant_id for plant {plant_name} of client {client_name}, showing the whole client")
+    return plant_id
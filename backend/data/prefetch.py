@@ -0,0 +1,96 @@
+"""
+Background Prefetch
+Warms the query cache for dashboard views that are not currently displayed
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from backend.data.plant_directory import resolve_plant_id
+from config.app_config import PREFETCH_CONFIG
+from db.db_setup import CONN, connection_scope
+from db.fetch_summary_data import fetch_generation_consumption_data
+from db.fetch_tod_tab_data import fetch_combined_monthly_data
+from visualizations.resolution import choose_resolution
+from visualizations.power_cost_calculations import fetch_combined_monthly_data as fetch_power_cost_monthly_data
+
+_executor = ThreadPoolExecutor(
+    max_workers=PREFETCH_CONFIG["max_workers"],
+    thread_name_prefix="view-prefetch"
+)
+
+# Prefetch jobs currently queued or running, so reruns do not pile up duplicates
+_in_flight = set()
+_in_flight_lock = threading.Lock()
+
+
+def _to_date_str(value) -> str:
+    return value.strftime('%Y-%m-%d') if hasattr(value, 'strftime') else str(value)
+
+
+def _warm_summary(client_name: str, plant_id, start_date: str, end_date: str):
+    # Same resolution as the Summary tab picks, so the warmed query is the one it issues
+    fetch_generation_consumption_data(
+        CONN, client_name, start_date, end_date, choose_resolution(start_date, end_date), plant_id
+    )
+
+
+def _warm_tod(client_name: str, plant_id, start_date: str, end_date: str):
+    # The daily ToD fetchers bypass the query cache,
+    # so only the banking fetch is worth warming
+    fetch_combined_monthly_data(CONN, client_name, plant_id)
+
+
+def _warm_cost(client_name: str, plant_id, start_date: str, end_date: str):
+    fetch_power_cost_monthly_data(CONN, client_name, plant_id)
+
+
+# View key -> function that issues the view's queries through the query cache
+VIEW_WARMERS: Dict[str, Callable[[str, object, str, str], None]] = {
+    "summary": _warm_summary,
+    "tod": _warm_tod,
+    "cost": _warm_cost
+}
+
+
+def _run_warmer(key: tuple, warmer: Callable, client_name: str, plant_id, start_date: str, end_date: str):
+    try:
+        # All queries of one warmer share a single pooled connection
+        with connection_scope():
+            warmer(client_name, plant_id, start_date, end_date)
+    except Exception as e:
+        logging.warning(f"Prefetch of {key[0]} view failed: {str(e)}")
+    finally:
+        with _in_flight_lock:
+            _in_flight.discard(key)
+
+
+def prefetch_views(views: List[str], client_name: str, start_date, end_date=None, plant_name: str = None):
+    """
+    Fetch data for the given views in the background so switching to them is fast
+
+    Args:
+        views: View keys from VIEW_WARMERS ('summary', 'tod', 'cost')
+        client_name: Selected client
+        start_date: Start date (date or YYYY-MM-DD)
+        end_date: End date (date or YYYY-MM-DD), defaults to start_date
+        plant_name: Selected plant, or None for all of the client's plants
+    """
+    start_date_str = _to_date_str(start_date)
+    end_date_str = _to_date_str(end_date) if end_date is not None else start_date_str
+    plant_id = resolve_plant_id(client_name, plant_name)
+
+    for view in views:
+        warmer = VIEW_WARMERS.get(view)
+        if warmer is None:
+            continue
+
+        key = (view, client_name, plant_name, start_date_str, end_date_str)
+        with _in_flight_lock:
+            if key in _in_flight:
+                continue
+            _in_flight.add(key)
+
+        _executor.submit(_run_warmer, key, warmer, client_name, plant_id, start_date_str, end_date_str)
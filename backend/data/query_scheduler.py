@@ -0,0 +1,66 @@
+"""
+Query Scheduler
+Runs the independent fetches of a page concurrently, each on its own pooled connection
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterable
+
+from config.app_config import QUERY_SCHEDULER_CONFIG
+from db.db_setup import connection_scope
+from backend.data.data_bundle import Fetch, fetch_bundled, in_request_scope, is_bundled, put_bundled
+
+_executor = ThreadPoolExecutor(
+    max_workers=QUERY_SCHEDULER_CONFIG["max_workers"],
+    thread_name_prefix="page-query"
+)
+
+
+def _run_fetch(fetch: Fetch):
+    # A worker borrows its own connection for the fetch and returns it right after
+    with connection_scope():
+        return fetch.loader(*fetch.args)
+
+
+def run_fetches(fetches: Iterable[Fetch]) -> int:
+    """
+    Run a page's fetches concurrently and put the results in the data bundle.
+
+    Fetches with the same key run once, and keys already bundled in this request
+    are skipped. Returns after the slowest fetch, after which the page's panels
+    read every result from the bundle. A failed fetch is only logged; the panel
+    that needs it fetches it again itself and reports the error.
+
+    Args:
+        fetches: Fetch specs, e.g. from data_bundle.tod_view_fetches
+
+    Returns:
+        Number of fetches run
+    """
+    if not in_request_scope():
+        # Results could not be shared with the panels
+        return 0
+
+    pending = {}
+    for fetch in fetches:
+        if fetch.key not in pending and not is_bundled(fetch.key):
+            pending[fetch.key] = fetch
+
+    if len(pending) <= 1:
+        # Nothing to overlap; run it on this thread's own connection
+        for fetch in pending.values():
+            try:
+                fetch_bundled(fetch)
+            except Exception as e:
+                logging.warning(f"Fetch of {fetch.key[0]} failed: {str(e)}")
+        return len(pending)
+
+    futures = {_executor.submit(_run_fetch, fetch): fetch for fetch in pending.values()}
+    for future in as_completed(futures):
+        fetch = futures[future]
+        try:
+            put_bundled(fetch.key, future.result())
+        except Exception as e:
+            logging.warning(f"Scheduled fetch of {fetch.key[0]} failed: {str(e)}")
+    return len(pending)
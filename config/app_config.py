@@ -66,10 +66,99 @@ DATE_CONFIG = {
 }
 
 # Database Configuration
+# Any key can be overridden with a DASHBOARD_DB_<KEY> environment variable,
+# e.g. DASHBOARD_DB_HOST, DASHBOARD_DB_PASSWORD, DASHBOARD_DB_POOL_SIZE
 DB_CONFIG = {
-    "connection_timeout": 30,
-    "query_timeout": 60,
-    "max_retries": 3
+    "host": "localhost",
+    "port": 3306,
+    "user": "root",
+    "password": "test123",
+    "database": "energy_db",
+    "pool_name": "mypool",
+    "pool_size": 10,             # mysql.connector allows at most 32
+    "pool_reset_session": False, # skip the session reset on every checkout
+    "connection_timeout": 30,    # seconds to establish a connection
+    "query_timeout": 60,         # seconds a SELECT may run (max_execution_time)
+    "max_retries": 3,
+    "retry_backoff": 0.5,        # seconds, multiplied by the attempt number
+    "retry_after": 30            # seconds before connecting again after all retries failed
+}
+
+# Query Result Cache Configuration (TTLs in seconds)
+QUERY_CACHE_CONFIG = {
+    "enabled": True,
+    "max_entries": 512,
+    "max_bytes": 256 * 1024 * 1024,
+    "default_ttl": 300,
+    "ttl_by_family": {
+        "plants": 6 * 60 * 60,     # tbl_plants rarely changes
+        "rollups": 60,             # watermark lookups decide rollup freshness
+        "banking": 30 * 60,        # banking_settlement is posted monthly
+        "settlement": 5 * 60       # today's settlement_data keeps arriving
+    }
+}
+
+# Plant Directory Configuration (see backend/data/plant_directory.py)
+PLANT_DIRECTORY_CONFIG = {
+    "ttl": 10 * 60,       # seconds before tbl_plants is read again
+    "retry_after": 30     # seconds before a failed reload is retried; the old index is served meanwhile
+}
+
+# Rollup Tables Configuration (see db/rollups.py)
+ROLLUP_CONFIG = {
+    "enabled": False,            # Turn on once `python -m db.rollups build` has run
+    "max_staleness": 15 * 60,    # seconds since the last refresh before raw tables are used again
+    "lookback_days": 3,          # trailing days re-aggregated on every refresh for late corrections
+    "drift_days": 35             # trailing days checked for deleted rows on every refresh (`reconcile` checks all)
+}
+
+# Closed-Month Snapshot Configuration (see db/snapshots.py, needs pyarrow)
+SNAPSHOT_CONFIG = {
+    "enabled": False,          # Turn on once `python -m db.snapshots export` has run
+    "path": "snapshots",       # directory holding the Parquet files and manifest.json
+    "grace_days": 5            # days after a month ends before it is treated as closed
+}
+
+# Streaming Fetch Configuration (see db.safe_db_utils.safe_read_chunked)
+STREAMING_CONFIG = {
+    "chunk_rows": 5000         # rows read per fetchmany call by the full-history queries, folded into per-month sums
+}
+
+# Chart Resolution Configuration (see visualizations/resolution.py)
+RESOLUTION_CONFIG = {
+    "chart_width_px": 1200,    # assumed plot width when choosing day / week / month bins
+    "min_px_per_bar": 12,      # coarser bins are used once bars would get narrower than this
+    "max_line_points": 500     # line series longer than this are LTTB-decimated
+}
+
+# Chart Value Label Configuration (see visualizations/annotations.py)
+ANNOTATION_CONFIG = {
+    "min_bar_px": 4,           # bars shorter than this get no label on top
+    "gap_px": 2,               # minimum space between two neighbouring labels
+    "edge_headroom": 0.08      # y-axis margin kept free for labels on top of bars
+}
+
+# Chart Backend Configuration
+# "matplotlib" sends server-rendered images, "plotly" sends chart specs drawn in the browser.
+# DASHBOARD_CHART_BACKEND overrides the backend per deployment.
+CHART_CONFIG = {
+    "backend": "matplotlib"
+}
+
+# Rendered Chart Cache Configuration (see visualizations/figure_cache.py)
+FIGURE_CACHE_CONFIG = {
+    "enabled": True,
+    "max_bytes": 64 * 1024 * 1024,   # LRU eviction once rendered images exceed this
+    "format": "png",                 # "png" or "svg"
+    "dpi": 100
+}
+
+# Chart Render Pool Configuration (see visualizations/render_service.py)
+RENDER_POOL_CONFIG = {
+    "enabled": False,          # Render a page's matplotlib charts in worker processes
+    "max_workers": None,       # Worker processes, defaults to CPU count - 1
+    "start_method": "spawn",   # fork is unsafe once the server has started threads
+    "timeout": 120             # seconds to wait for a page's charts
 }
 
 # UI Messages
@@ -111,7 +200,20 @@ FEATURES = {
     "power_cost_analysis": False,  # Set to True when implemented
     "real_time_updates": False,
     "data_export": False,
-    "user_preferences": False
+    "user_preferences": False,
+    "lazy_tabs": True,             # Render only the selected view instead of every tab
+    "background_prefetch": False   # Warm the other views' data in the background (lazy_tabs only)
+}
+
+# Background Prefetch Configuration
+PREFETCH_CONFIG = {
+    "max_workers": 2
+}
+
+# Query Scheduler Configuration (see backend/data/query_scheduler.py)
+# Each worker holds one pooled connection while its fetch runs, keep below DB_CONFIG pool_size
+QUERY_SCHEDULER_CONFIG = {
+    "max_workers": 4
 }
 
 # Logging Configuration
@@ -1,88 +1,293 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
 import mysql.connector
 from mysql.connector import pooling
-import threading
 
-# Global connection pool
+from config.app_config import DB_CONFIG
+
+# Environment variables override DB_CONFIG, e.g. DASHBOARD_DB_HOST, DASHBOARD_DB_POOL_SIZE
+ENV_PREFIX = "DASHBOARD_DB_"
+
+# Global connection pool, created on first use
 _connection_pool = None
 _pool_lock = threading.Lock()
+# monotonic() time of the last failed pool creation
+_pool_failed_at = None
 
-def setup_db_connection_pool(host: str, user: str, password: str, database: str):
-    """Setup a MySQL connection pool."""
-    global _connection_pool
+# Legacy single connection, created on first use
+_legacy_conn = None
+_legacy_lock = threading.Lock()
+_legacy_failed_at = None
+
+# Connection borrowed by the request scope running on the current thread
+_scope = threading.local()
+
+# Pool checkout metrics
+_pool_stats = {
+    "checkouts": 0,
+    "returns": 0,
+    "failed_checkouts": 0,
+    "in_use": 0,
+    "wait_seconds_total": 0.0,
+    "wait_seconds_max": 0.0
+}
+_pool_stats_lock = threading.Lock()
+
+
+def get_db_config() -> dict:
+    """Return DB_CONFIG with any DASHBOARD_DB_* environment overrides applied."""
+    config = dict(DB_CONFIG)
+    for key, default in DB_CONFIG.items():
+        value = os.environ.get(f"{ENV_PREFIX}{key.upper()}")
+        if value is None:
+            continue
+        if isinstance(default, bool):
+            config[key] = value.strip().lower() in ("1", "true", "yes")
+        elif isinstance(default, (int, float)):
+            config[key] = type(default)(value)
+        else:
+            config[key] = value
+    return config
+
+
+def _connect_args(config: dict) -> dict:
+    return {
+        'host': config['host'],
+        'port': config['port'],
+        'user': config['user'],
+        'password': config['password'],
+        'database': config['database'],
+        'connection_timeout': config['connection_timeout'],
+        'autocommit': True,
+        'consume_results': True
+    }
+
+
+def _with_retries(action, description: str, config: dict):
+    """Run action, retrying mysql errors up to max_retries times with linear backoff."""
+    attempts = max(1, config['max_retries'])
+    for attempt in range(1, attempts + 1):
+        try:
+            return action()
+        except mysql.connector.Error as err:
+            if attempt == attempts:
+                print(f"❌ {description} failed after {attempts} attempts: {err}")
+                return None
+            time.sleep(config['retry_backoff'] * attempt)
+
+
+def _cooling_down(failed_at) -> bool:
+    """True while a failed connect attempt is younger than DB_CONFIG['retry_after'] seconds."""
+    return failed_at is not None and time.monotonic() - failed_at < get_db_config()['retry_after']
+
+
+def _apply_query_timeout(conn, seconds: int):
+    """Limit SELECT run time for this session (MySQL max_execution_time is in ms)."""
+    if not seconds:
+        return
+    # Without session resets the setting survives in the pooled connection,
+    # so only the first checkout of each physical connection pays for it
+    cnx = conn._cnx if isinstance(conn, pooling.PooledMySQLConnection) else conn
+    if getattr(cnx, '_query_timeout_applied', None) == seconds:
+        return
+    cursor = None
     try:
-        config = {
-            'user': user,
-            'password': password,
-            'host': host,
-            'database': database,
-            'pool_name': 'mypool',
-            'pool_size': 10,
-            'pool_reset_session': True,
-            'autocommit': True,
-            'consume_results': True
-        }
-        _connection_pool = mysql.connector.pooling.MySQLConnectionPool(**config)
-        print("✅ Database connection pool established")
-        return _connection_pool
-    except mysql.connector.Error as err:
-        print(f"❌ Database connection pool failed: {err}")
-        return None
+        cursor = conn.cursor()
+        cursor.execute(f"SET SESSION max_execution_time = {int(seconds * 1000)}")
+        if not get_db_config()['pool_reset_session']:
+            cnx._query_timeout_applied = seconds
+    except mysql.connector.Error:
+        # Servers without max_execution_time (e.g. MariaDB) run without the limit
+        pass
+    finally:
+        if cursor:
+            cursor.close()
 
-def get_db_connection():
-    """Get a connection from the pool."""
+
+def setup_db_connection_pool(host: str = None, user: str = None, password: str = None, database: str = None, pool_size: int = None):
+    """Setup a MySQL connection pool. Arguments left as None come from get_db_config()."""
     global _connection_pool
-    if _connection_pool is None:
+    config = get_db_config()
+    config.update({k: v for k, v in {
+        'host': host, 'user': user, 'password': password, 'database': database, 'pool_size': pool_size
+    }.items() if v is not None})
+
+    pool_config = dict(
+        _connect_args(config),
+        pool_name=config['pool_name'],
+        pool_size=config['pool_size'],
+        pool_reset_session=config['pool_reset_session']
+    )
+    pool = _with_retries(
+        lambda: mysql.connector.pooling.MySQLConnectionPool(**pool_config),
+        "Database connection pool",
+        config
+    )
+    if pool:
+        _connection_pool = pool
+        print(f"✅ Database connection pool established ({config['pool_size']} connections)")
+    return pool
+
+
+def get_connection_pool():
+    """
+    Return the connection pool, creating it on first use.
+
+    Creating the pool with the database down takes max_retries connect timeouts,
+    so after a failed attempt None is returned right away for retry_after seconds
+    instead of every caller trying again.
+    """
+    global _pool_failed_at
+    if _connection_pool is None and not _cooling_down(_pool_failed_at):
         with _pool_lock:
-            if _connection_pool is None:
-                setup_db_connection_pool(
-                    host="localhost",
-                    user="root",
-                    password="test123",
-                    database="energy_db"
-                )
-    
+            # Another thread may have created the pool (or failed to) while this one waited
+            if _connection_pool is None and not _cooling_down(_pool_failed_at):
+                _pool_failed_at = None if setup_db_connection_pool() else time.monotonic()
+    return _connection_pool
+
+
+def is_db_available() -> bool:
+    """True if the connection pool exists or can be created."""
+    return get_connection_pool() is not None
+
+
+def get_db_connection():
+    """
+    Check a connection out of the pool.
+
+    Prefer get_scoped_connection() inside a script run; connections taken here
+    must be handed back with release_db_connection().
+    """
+    pool = get_connection_pool()
+    if pool is None:
+        return None
+
+    config = get_db_config()
+    started = time.monotonic()
+    # Retries also cover a momentarily exhausted pool
+    conn = _with_retries(pool.get_connection, "Getting connection from pool", config)
+    waited = time.monotonic() - started
+
+    with _pool_stats_lock:
+        if conn is None:
+            _pool_stats["failed_checkouts"] += 1
+        else:
+            _pool_stats["checkouts"] += 1
+            _pool_stats["in_use"] += 1
+        _pool_stats["wait_seconds_total"] += waited
+        _pool_stats["wait_seconds_max"] = max(_pool_stats["wait_seconds_max"], waited)
+
+    if conn is not None:
+        conn.autocommit = True
+        _apply_query_timeout(conn, config['query_timeout'])
+    return conn
+
+
+def release_db_connection(conn):
+    """Return a pooled connection, discarding any unread results first."""
+    if conn is None:
+        return
     try:
-        if _connection_pool:
-            conn = _connection_pool.get_connection()
-            conn.autocommit = True
-            return conn
-    except mysql.connector.Error as err:
-        print(f"❌ Error getting connection from pool: {err}")
-    
-    return None
-
-def setup_db_connection(host: str, user: str, password: str, database: str):
-    """Establish and return a MySQL connection."""
+        if hasattr(conn, '_cnx') and conn._cnx:
+            conn._cnx.consume_results()
+        conn.close()
+    except Exception as e:
+        print(f"Error returning connection to pool: {e}")
+    finally:
+        with _pool_stats_lock:
+            _pool_stats["returns"] += 1
+            _pool_stats["in_use"] -= 1
+
+
+def get_pool_stats() -> dict:
+    """Pool checkout counts and wait times since process start."""
+    with _pool_stats_lock:
+        stats = dict(_pool_stats)
+    stats["wait_seconds_avg"] = stats["wait_seconds_total"] / stats["checkouts"] if stats["checkouts"] else 0.0
+    return stats
+
+
+@contextmanager
+def connection_scope():
+    """
+    Share one pooled connection between every query on this thread, e.g. one
+    Streamlit script run. The connection is borrowed on the first query and
+    returned when the scope exits. Nested scopes reuse the outer connection.
+    """
+    if getattr(_scope, "active", False):
+        yield
+        return
+
+    _scope.active = True
+    _scope.conn = None
     try:
-        conn = mysql.connector.connect(
-            host=host, 
-            user=user, 
-            password=password, 
-            database=database,
-            autocommit=True,
-            consume_results=True
-        )
-        return conn
-    except mysql.connector.Error as err:
-        print(f"❌ Database connection failed: {err}")
+        yield
+    finally:
+        conn, _scope.conn = _scope.conn, None
+        _scope.active = False
+        release_db_connection(conn)
+
+
+def get_scoped_connection():
+    """
+    Return the current scope's connection, borrowing it on first use.
+
+    Returns:
+        Pooled connection, or None when no scope is active or the pool is unavailable
+    """
+    if not getattr(_scope, "active", False):
         return None
+    if _scope.conn is None:
+        _scope.conn = get_db_connection()
+    return _scope.conn
+
+
+def setup_db_connection(host: str = None, user: str = None, password: str = None, database: str = None):
+    """Establish and return a MySQL connection. Arguments left as None come from get_db_config()."""
+    config = get_db_config()
+    config.update({k: v for k, v in {
+        'host': host, 'user': user, 'password': password, 'database': database
+    }.items() if v is not None})
+
+    conn = _with_retries(
+        lambda: mysql.connector.connect(**_connect_args(config)),
+        "Database connection",
+        config
+    )
+    if conn is not None:
+        _apply_query_timeout(conn, config['query_timeout'])
+    return conn
+
 
+def get_legacy_connection():
+    """
+    Return the shared single connection, (re)connecting on first use or after a drop.
+    Like the pool, a failed connect is not retried for retry_after seconds.
+    """
+    global _legacy_conn, _legacy_failed_at
+    with _legacy_lock:
+        if (_legacy_conn is None or not _legacy_conn.is_connected()) and not _cooling_down(_legacy_failed_at):
+            _legacy_conn = setup_db_connection()
+            _legacy_failed_at = None if _legacy_conn is not None else time.monotonic()
+        return _legacy_conn
 
 
+class _ScopedConnection:
+    """
+    Stand-in for the legacy CONN. Inside a connection_scope() it resolves to the
+    scope's pooled connection, so sessions never share a connection; outside a
+    scope it falls back to the lazily created single connection.
+    """
 
+    def __getattr__(self, name):
+        conn = get_scoped_connection() or get_legacy_connection()
+        if conn is None:
+            raise mysql.connector.Error("Database connection not available")
+        return getattr(conn, name)
 
-# Setup DB - Initialize the connection pool
-setup_db_connection_pool(
-    host="localhost",
-    user="root",
-    password="test123",
-    database="energy_db"
-)
 
-# Legacy single connection for backward compatibility
-CONN = setup_db_connection(
-    host="localhost",
-    user="root",
-    password="test123",
-    database="energy_db"
-)
\ No newline at end of file
+# Legacy connection handle kept for backward compatibility, connects lazily
+CONN = _ScopedConnection()
@@ -1,33 +1,48 @@
 import pandas as pd
-from db.safe_db_utils import safe_read_sql
+from db.safe_db_utils import safe_read_typed
+from db.rollups import rollup_is_fresh
+from db.snapshots import merge_periods, read_settlement, settlement_totals, split_range
+from visualizations.resolution import bin_sql
 
+# Column types of the Summary queries ('datetime' single day, 'date' otherwise)
+SUMMARY_SCHEMA = {
+    "datetime": "datetime64",
+    "date": "datetime64",
+    "generation": "float64",
+    "consumption": "float64",
+    "deficit": "float64",
+    "surplus_demand": "float64",
+    "surplus_generation": "float64",
+    "settled": "float64"
+}
 
 
-def fetch_generation_consumption_data(
-    conn,
+def build_generation_consumption_query(
     client_name: str,
     start_date: str,
-    end_date: str
-) -> pd.DataFrame:
+    end_date: str,
+    use_rollup: bool = False,
+    resolution: str = "day",
+    plant_id=None
+):
     """
-    Fetch enriched generation and consumption data from settlement_data.
+    Build the Summary tab query for a client (or one of its plants) and date range.
+    The rollups are client-level, so a plant_id always reads settlement_data.
 
-    - Single day: return raw slot-wise rows without aggregation
-    - Multi-day: return daily aggregated totals
+    Args:
+        resolution: Bin of the multi-day totals ('day', 'week' or 'month');
+            'date' is the first day of each bin
+        plant_id: tbl_plants id to restrict the rows to one plant
 
     Returns:
-        pd.DataFrame with:
-        - datetime (for single day) or date (for multi-day)
-        - generation, consumption, deficit, surplus_demand, surplus_generation, settled
+        Tuple of (query, params)
     """
-    if conn is None:
-        return pd.DataFrame()
-
-    is_single_day = start_date == end_date
+    plant_filter = " AND plant_id = %s" if plant_id is not None else ""
+    plant_params = (plant_id,) if plant_id is not None else ()
 
-    if is_single_day:
+    if start_date == end_date:
         # No aggregation, raw records per slot
-        query = """
+        query = f"""
             SELECT datetime,
                    allocated_generation AS generation,
                    consumption,
@@ -36,16 +51,46 @@ def fetch_generation_consumption_data(
                    surplus_generation,
                    settled
             FROM settlement_data
-            WHERE client_name = %s AND date = %s
+            WHERE client_name = %s AND date = %s{plant_filter}
             ORDER BY datetime;
         """
-        df = safe_read_sql(query, conn, (client_name, start_date))
-        df['datetime'] = pd.to_datetime(df['datetime'])
+        return query, (client_name, start_date) + plant_params
 
-    else:
-        # Aggregate for each date
+    date_bin = bin_sql(resolution)
+
+    if use_rollup and plant_id is None and resolution == "day":
+        # Daily totals are already kept in the client x date rollup
         query = """
             SELECT date,
+                   generation,
+                   consumption,
+                   deficit,
+                   surplus_demand,
+                   surplus_generation,
+                   settled
+            FROM settlement_daily_rollup
+            WHERE client_name = %s AND date BETWEEN %s AND %s
+            ORDER BY date;
+        """
+    elif use_rollup and plant_id is None:
+        # Week/month totals from the daily rollup
+        query = f"""
+            SELECT {date_bin} AS date,
+                   SUM(generation) AS generation,
+                   SUM(consumption) AS consumption,
+                   SUM(deficit) AS deficit,
+                   SUM(surplus_demand) AS surplus_demand,
+                   SUM(surplus_generation) AS surplus_generation,
+                   SUM(settled) AS settled
+            FROM settlement_daily_rollup
+            WHERE client_name = %s AND date BETWEEN %s AND %s
+            GROUP BY {date_bin}
+            ORDER BY {date_bin};
+        """
+    else:
+        # Aggregate for each date (or week/month bin)
+        query = f"""
+            SELECT {date_bin} AS date,
                    SUM(allocated_generation) AS generation,
                    SUM(consumption) AS consumption,
                    SUM(deficit) AS deficit,
@@ -53,11 +98,56 @@ def fetch_generation_consumption_data(
                    SUM(surplus_generation) AS surplus_generation,
                    SUM(settled) AS settled
             FROM settlement_data
-            WHERE client_name = %s AND date BETWEEN %s AND %s
-            GROUP BY date
-            ORDER BY date;
+            WHERE client_name = %s AND date BETWEEN %s AND %s{plant_filter}
+            GROUP BY {date_bin}
+            ORDER BY {date_bin};
         """
-        df = safe_read_sql(query, conn, (client_name, start_date, end_date))
-        df['date'] = pd.to_datetime(df['date'])
+        return query, (client_name, start_date, end_date) + plant_params
+
+    return query, (client_name, start_date, end_date)
+
+
+def fetch_generation_consumption_data(
+    conn,
+    client_name: str,
+    start_date: str,
+    end_date: str,
+    resolution: str = "day",
+    plant_id=None
+) -> pd.DataFrame:
+    """
+    Fetch enriched generation and consumption data from settlement_data.
+    With a plant_id only that plant's rows are read.
+
+    - Single day: return raw slot-wise rows without aggregation
+    - Multi-day: return daily (or weekly / monthly, per resolution) aggregated
+      totals; closed months come from the Parquet snapshots, the rest from the
+      daily rollup when fresh
+
+    Returns:
+        pd.DataFrame with:
+        - datetime (for single day) or date (for multi-day)
+        - generation, consumption, deficit, surplus_demand, surplus_generation, settled
+    """
+    if conn is None:
+        return pd.DataFrame()
+
+    is_single_day = start_date == end_date
+    if is_single_day:
+        # Snapshots hold daily totals, the single-day view needs the raw slots
+        snapshot_end, db_start = None, start_date
+    else:
+        snapshot_end, db_start = split_range(client_name, start_date, end_date)
+
+    frames = []
+    if snapshot_end is not None:
+        snapshot_df = read_settlement(client_name, start_date, snapshot_end, plant_id=plant_id)
+        frames.append(settlement_totals(snapshot_df, ['date'], resolution))
+
+    if db_start is not None:
+        use_rollup = not is_single_day and plant_id is None and rollup_is_fresh(client_name, end_date)
+        query, params = build_generation_consumption_query(client_name, db_start, end_date, use_rollup, resolution, plant_id)
+        frames.append(safe_read_typed(query, conn, params, SUMMARY_SCHEMA))
 
-    return df
+    # Both parts arrive as datetime64 / float64 columns, no re-parsing needed
+    return merge_periods(frames, ['date']) if len(frames) > 1 else frames[0]
@@ -1,80 +1,235 @@
+from datetime import timedelta
+
 import pandas as pd
-from db.safe_db_utils import safe_read_sql
+from db.safe_db_utils import read_chunked, safe_read_chunked, safe_read_typed
+from db.rollups import rollup_is_fresh
+from db.snapshots import covered_until, merge_periods, read_banking, read_settlement, settlement_totals, split_range
+from visualizations.tod_config import normalize_slot_series
+from visualizations.resolution import bin_sql
 
 
-##ToD Generation vs Consumption
-def fetch_tod_binned_data(conn, client_name: str, start_date: str, end_date: str = None) -> pd.DataFrame:
+def add_month_column(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Fetch ToD-binned generation and consumption data from MySQL using mysql.connector.
+    Build the 'YYYY-MM' month label from the year/month_num columns returned by
+    the server-side monthly GROUP BY queries, and drop the helper columns.
+    """
+    df['month'] = (
+        df['year'].astype(int).astype(str)
+        + '-'
+        + df['month_num'].astype(int).astype(str).str.zfill(2)
+    )
+    return df.drop(columns=['year', 'month_num'])
+
+
+TOD_COLUMNS = ["date", "slot", "generation_kwh", "consumption_kwh"]
+BANKING_COLUMNS = [
+    "month", "total_matched_settled_sum", "total_intra_settlement",
+    "total_inter_settlement", "surplus_demand_sum"
+]
+
+# Column types of the ToD and monthly queries, decoded by safe_read_typed and safe_read_chunked
+TOD_SCHEMA = {
+    "date": "datetime64",
+    "slot": "category",
+    "generation_kwh": "float64",
+    "consumption_kwh": "float64"
+}
+MONTHLY_CONSUMPTION_SCHEMA = {
+    "year": "int64",
+    "month_num": "int64",
+    "total_consumption_sum": "float64",
+    "total_generation_sum": "float64"
+}
+BANKING_SCHEMA = {
+    "month": "datetime64",
+    **{column: "float64" for column in BANKING_COLUMNS[1:]}
+}
+
+
+def _normalize_slots(df: pd.DataFrame) -> pd.DataFrame:
+    df['slot'] = normalize_slot_series(df['slot'])
+    return df
+
+
+def _read_rows(conn, query: str, params, empty_columns=None, chunked: bool = False) -> pd.DataFrame:
+    """
+    Run a ToD query on a pooled connection and decode it column-wise (see TOD_SCHEMA),
+    with 'slot' normalized to the ordered slot categorical. chunked streams a
+    full-history date x slot query and sums it per date bin and slot chunk by
+    chunk (see safe_read_chunked).
+    """
+    # Tuple cursor and one NumPy array per column instead of a dict per row
+    if chunked:
+        df = safe_read_chunked(query, conn, ['date', 'slot'], params, TOD_SCHEMA, prepare=_normalize_slots, use_cache=False)
+    else:
+        df = safe_read_typed(query, conn, params, TOD_SCHEMA, use_cache=False)
+    if df.columns.empty:
+        return pd.DataFrame(columns=empty_columns)
+    if 'slot' in df.columns:
+        df = _normalize_slots(df)
+    if chunked and not df.empty:
+        # The folded sums come back in alphabetical slot order
+        df = df.sort_values(['date', 'slot'], ignore_index=True)
+    return df
+
+
+def _snapshot_tod_rows(
+    client_name: str,
+    keys: list,
+    start_date=None,
+    end_date=None,
+    plant_type: str = None,
+    plant_id=None,
+    resolution: str = "day"
+) -> pd.DataFrame:
+    """
+    ToD totals of the snapshot months, in the shape of the ToD queries
+    (slot, generation_kwh, consumption_kwh plus 'date' when grouped by date).
+    """
+    df = read_settlement(client_name, start_date, end_date, plant_type, plant_id, columns=['generation', 'consumption'])
+    df = settlement_totals(df, keys, resolution).rename(columns={
+        'slot_name': 'slot', 'generation': 'generation_kwh', 'consumption': 'consumption_kwh'
+    })
+    df['slot'] = normalize_slot_series(df['slot'])
+    return df
 
-    Args:
-        conn: mysql.connector connection object.
-        plant_id (str): Plant ID to filter on.
-        start_date (str): Start date (YYYY-MM-DD).
-        end_date (str, optional): End date (YYYY-MM-DD). If None, uses only start_date.
 
-    Returns:
-        pd.DataFrame: Data grouped by slot_name.
-    """
-    cursor = None
-    try:
-        cursor = conn.cursor(dictionary=True)
+def _merge_tod_rows(frames: list, keys: list) -> pd.DataFrame:
+    """Sum the snapshot and MySQL parts of a ToD result per date/slot."""
+    if len(frames) == 1:
+        return frames[0]
+    df = merge_periods(frames, keys)
+    if 'slot' in df.columns:
+        df['slot'] = normalize_slot_series(df['slot'])
+    return df
 
-        if not end_date:
-            end_date = start_date
 
+##ToD Generation vs Consumption
+def build_tod_binned_query(client_name: str, start_date: str, end_date: str, use_rollup: bool = False, plant_id=None):
+    """
+    Build the slot-level totals query used by fetch_tod_binned_data.
+
+    Returns:
+        Tuple of (query, params)
+    """
+    if use_rollup and plant_id is None:
         query = """
-            SELECT 
+            SELECT
+                slot_name AS slot,
+                SUM(generation_kwh) AS generation_kwh,
+                SUM(consumption_kwh) AS consumption_kwh
+            FROM
+                settlement_slot_rollup
+            WHERE
+                client_name = %s
+                AND date BETWEEN %s AND %s
+            GROUP BY
+                slot_name
+            ORDER BY
+                slot_name;
+        """
+    else:
+        query = f"""
+            SELECT
                 slot_name AS slot,
                 SUM(allocated_generation) AS generation_kwh,
                 SUM(consumption) AS consumption_kwh
-            FROM 
+            FROM
                 settlement_data
-            WHERE 
+            WHERE
                 client_name = %s
                 AND date BETWEEN %s AND %s
-            GROUP BY 
+                {"AND plant_id = %s" if plant_id is not None else ""}
+            GROUP BY
                 slot_name
-            ORDER BY 
+            ORDER BY
                 slot_name;
         """
 
-        cursor.execute(query, (client_name, start_date, end_date))
-        results = cursor.fetchall()
-        
-        # Consume all results to avoid "Unread result found" error
-        while cursor.nextset():
-            pass
-            
-        return pd.DataFrame(results)
-        
-    except Exception as e:
-        print(f"Error in fetch_tod_binned_data: {e}")
-        return pd.DataFrame()
-    finally:
-        if cursor:
-            cursor.close()
+        if plant_id is not None:
+            return query, (client_name, start_date, end_date, plant_id)
+
+    return query, (client_name, start_date, end_date)
+
+
+def fetch_tod_binned_data(conn, client_name: str, start_date: str, end_date: str = None, plant_id=None) -> pd.DataFrame:
+    """
+    Fetch ToD-binned generation and consumption data from MySQL using mysql.connector.
+
+    Args:
+        conn: mysql.connector connection object.
+        client_name (str): Client to filter on.
+        start_date (str): Start date (YYYY-MM-DD).
+        end_date (str, optional): End date (YYYY-MM-DD). If None, uses only start_date.
+        plant_id (optional): tbl_plants id to restrict the rows to one plant.
+
+    Returns:
+        pd.DataFrame: Data grouped by slot_name.
+    """
+    if not end_date:
+        end_date = start_date
+
+    snapshot_end, db_start = split_range(client_name, start_date, end_date)
+    frames = []
+    if snapshot_end is not None:
+        frames.append(_snapshot_tod_rows(client_name, ['slot_name'], start_date, snapshot_end, plant_id=plant_id))
+    if db_start is not None:
+        query, params = build_tod_binned_query(
+            client_name, db_start, end_date,
+            use_rollup=plant_id is None and rollup_is_fresh(client_name, end_date),
+            plant_id=plant_id
+        )
+        frames.append(_read_rows(conn, query, params))
+    return _merge_tod_rows(frames, ['slot'])
 
 
 
 
 ##ToD Generation AND Consumption
-def fetch_daily_tod_data(
-    conn,
+def build_daily_tod_query(
     client_name: str,
     start_date: str,
     end_date: str,
-    plant_type: str = None
-) -> pd.DataFrame:
+    plant_type: str = None,
+    use_rollup: bool = False,
+    resolution: str = "day",
+    plant_id=None
+):
     """
-    Fetch daily ToD-binned generation and consumption data using slot_name and date directly.
+    Build the date x slot totals query used by fetch_daily_tod_data.
+    The rollup carries no plant type or plant, so plant_type and plant_id
+    always read settlement_data.
+
+    Args:
+        resolution: 'day', 'week' or 'month'; 'date' is the first day of each bin
+        plant_id: tbl_plants id to restrict the rows to one plant
 
     Returns:
-        pd.DataFrame with columns: date, slot, generation_kwh, consumption_kwh
+        Tuple of (query, params)
     """
-    query = """
+    params = [client_name, start_date, end_date]
+    date_bin = bin_sql(resolution)
+
+    if use_rollup and not plant_type and plant_id is None:
+        query = f"""
+            SELECT
+                {date_bin} AS date,
+                slot_name AS slot,
+                SUM(generation_kwh) AS generation_kwh,
+                SUM(consumption_kwh) AS consumption_kwh
+            FROM
+                settlement_slot_rollup
+            WHERE
+                client_name = %s
+                AND date BETWEEN %s AND %s
+            GROUP BY {date_bin}, slot_name
+            ORDER BY {date_bin}, slot_name;
+        """
+        return query, params
+
+    query = f"""
         SELECT
-            date,
+            {date_bin} AS date,
             slot_name AS slot,
             SUM(allocated_generation) AS generation_kwh,
             SUM(consumption) AS consumption_kwh
@@ -85,132 +240,246 @@ def fetch_daily_tod_data(
             AND date BETWEEN %s AND %s
     """
 
-    params = [client_name, start_date, end_date]
-
     if plant_type:
         query += " AND type = %s"
         params.append(plant_type)
 
-    query += """
-        GROUP BY date, slot_name
-        ORDER BY date, slot_name;
+    if plant_id is not None:
+        query += " AND plant_id = %s"
+        params.append(plant_id)
+
+    query += f"""
+        GROUP BY {date_bin}, slot_name
+        ORDER BY {date_bin}, slot_name;
     """
 
-    cursor = None
-    try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        
-        # Consume all results to avoid "Unread result found" error
-        while cursor.nextset():
-            pass
+    return query, params
 
-        return pd.DataFrame(rows)
 
-    except Exception as e:
-        print(f"Error in fetch_daily_tod_data: {e}")
-        return pd.DataFrame(columns=["date", "slot", "generation_kwh", "consumption_kwh"])
-    finally:
-        if cursor:
-            cursor.close()
+def fetch_daily_tod_data(
+    conn,
+    client_name: str,
+    start_date: str,
+    end_date: str = None,
+    plant_type: str = None,
+    resolution: str = "day",
+    plant_id=None
+) -> pd.DataFrame:
+    """
+    Fetch daily ToD-binned generation and consumption data using slot_name and date directly.
+    With a plant_id only that plant's rows are read.
 
+    Closed months are read from the Parquet snapshots, the rest from the
+    client x date x slot rollup when it is fresh. With a 'week' or 'month'
+    resolution each slot is summed per bin.
 
+    Returns:
+        pd.DataFrame with columns: date, slot, generation_kwh, consumption_kwh
+    """
+    if not end_date:
+        end_date = start_date
+
+    snapshot_end, db_start = split_range(client_name, start_date, end_date)
+    frames = []
+    if snapshot_end is not None:
+        frames.append(_snapshot_tod_rows(
+            client_name, ['date', 'slot_name'], start_date, snapshot_end, plant_type, plant_id, resolution
+        ))
+    if db_start is not None:
+        query, params = build_daily_tod_query(
+            client_name, db_start, end_date, plant_type,
+            use_rollup=not plant_type and plant_id is None and rollup_is_fresh(client_name, end_date),
+            resolution=resolution,
+            plant_id=plant_id
+        )
+        frames.append(_read_rows(conn, query, params, TOD_COLUMNS))
+    return _merge_tod_rows(frames, ['date', 'slot'])
 
 
-##Monthly ToD Before Banking
 
 
-def fetch_all_daily_tod_data(
-    conn,
+##Monthly ToD Before Banking
+def build_all_daily_tod_query(
     client_name: str,
-    plant_type: str = None
-) -> pd.DataFrame:
+    plant_type: str = None,
+    use_rollup: bool = False,
+    resolution: str = "day",
+    plant_id=None,
+    since=None
+):
     """
-    Fetch all available daily ToD-binned generation and consumption data
-    grouped by date and slot_name, without any date filtering.
+    Build the full-history date x slot totals query used by fetch_all_daily_tod_data.
+
+    Args:
+        since: Only dates from this one on (the months after the snapshots)
 
     Returns:
-        pd.DataFrame with columns: date, slot, generation_kwh, consumption_kwh
+        Tuple of (query, params)
     """
-    query = """
+    params = [client_name]
+    date_bin = bin_sql(resolution)
+    slot_order = "FIELD(slot_name, 'Morning Peak', 'Day (Normal)', 'Evening Peak', 'Off-Peak')"
+    since_filter = " AND date >= %s" if since is not None else ""
+    if since is not None:
+        params.append(since)
+
+    if use_rollup and not plant_type and plant_id is None:
+        query = f"""
+            SELECT
+                {date_bin} AS date,
+                slot_name AS slot,
+                SUM(generation_kwh) AS generation_kwh,
+                SUM(consumption_kwh) AS consumption_kwh
+            FROM
+                settlement_slot_rollup
+            WHERE
+                client_name = %s{since_filter}
+            GROUP BY {date_bin}, slot_name
+            ORDER BY {date_bin}, {slot_order};
+        """
+        return query, params
+
+    query = f"""
         SELECT
-            date,
+            {date_bin} AS date,
             slot_name AS slot,
             SUM(allocated_generation) AS generation_kwh,
             SUM(consumption) AS consumption_kwh
         FROM
             settlement_data
         WHERE
-            client_name = %s
+            client_name = %s{since_filter}
     """
 
-    params = [client_name]
-
     if plant_type:
         query += " AND type = %s"
         params.append(plant_type)
 
-    query += """
-        GROUP BY date, slot_name
-        ORDER BY date, FIELD(slot_name, 'Morning Peak', 'Day (Normal)', 'Evening Peak', 'Off-Peak');
+    if plant_id is not None:
+        query += " AND plant_id = %s"
+        params.append(plant_id)
+
+    query += f"""
+        GROUP BY {date_bin}, slot_name
+        ORDER BY {date_bin}, {slot_order};
     """
 
-    cursor = None
-    try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        
-        # Consume all results to avoid "Unread result found" error
-        while cursor.nextset():
-            pass
+    return query, params
 
-        return pd.DataFrame(rows)
 
-    except Exception as e:
-        print("⚠️ Error fetching data:", e)
-        return pd.DataFrame(columns=["date", "slot", "generation_kwh", "consumption_kwh"])
-    finally:
-        if cursor:
-            cursor.close()
+def fetch_all_daily_tod_data(
+    conn,
+    client_name: str,
+    plant_type: str = None,
+    resolution: str = "month",
+    plant_id=None
+) -> pd.DataFrame:
+    """
+    Fetch all available daily ToD-binned generation and consumption data
+    grouped by date and slot_name, without any date filtering.
+
+    Closed months are read from the Parquet snapshots and only the months after
+    them are queried, from the client x date x slot rollup when it is fresh.
+    The query is streamed in chunks that are summed per bin and slot as they
+    arrive, so memory stays at one row per month and slot however long the
+    history is; pass resolution='day' or 'week' for finer (larger) results.
+
+    Returns:
+        pd.DataFrame with columns: date, slot, generation_kwh, consumption_kwh
+    """
+    cutoff = covered_until(client_name)
+    frames = []
+    if cutoff is not None:
+        frames.append(_snapshot_tod_rows(
+            client_name, ['date', 'slot_name'], plant_type=plant_type, plant_id=plant_id, resolution=resolution
+        ))
+
+    query, params = build_all_daily_tod_query(
+        client_name, plant_type,
+        use_rollup=not plant_type and plant_id is None and rollup_is_fresh(client_name),
+        resolution=resolution,
+        plant_id=plant_id,
+        since=cutoff + timedelta(days=1) if cutoff is not None else None
+    )
+    frames.append(_read_rows(conn, query, params, TOD_COLUMNS, chunked=True))
+    return _merge_tod_rows(frames, ['date', 'slot'])
 
 
 
 
 ##Monthly Banking Settlement
-def fetch_combined_monthly_data(
-    conn,
-    plant_name: str = None
-) -> pd.DataFrame:
+def build_monthly_consumption_query(client_name: str = None, use_rollup: bool = False, plant_id=None, since=None):
     """
-    Fetch monthly aggregated data for both consumption and banking settlement.
+    Build the month-wise consumption/generation totals query, grouped server-side.
 
     Args:
-        conn: MySQL connection object
-        plant_name (str, optional): Filter by plant name
+        client_name (str, optional): Filter by client; required for the rollup
+        use_rollup (bool): Read settlement_monthly_rollup instead of settlement_data
+        plant_id (optional): tbl_plants id of one of the client's plants; reads settlement_data
+        since (date, optional): Only months from this date's month on (the months after the snapshots)
 
     Returns:
-        pd.DataFrame: Merged DataFrame with month-wise consumption and settlement data
+        Tuple of (query, params); rows carry year, month_num,
+        total_consumption_sum and total_generation_sum
     """
+    if use_rollup and client_name and plant_id is None:
+        query = """
+            SELECT
+                year,
+                month_num,
+                total_consumption_sum,
+                total_generation_sum
+            FROM
+                settlement_monthly_rollup
+            WHERE
+                client_name = %s
+                {since_filter}
+            ORDER BY
+                year, month_num;
+        """
+        if since is not None:
+            since_filter = "AND year * 100 + month_num >= %s"
+            return query.format(since_filter=since_filter), (client_name, since.year * 100 + since.month)
+        return query.format(since_filter=""), (client_name,)
 
-    # --- Fetch Daily Consumption ---
-    consumption_query = """
+    query = """
         SELECT
-            date,
-            consumption,
-            allocated_generation AS generation
+            YEAR(date) AS year,
+            MONTH(date) AS month_num,
+            SUM(consumption) AS total_consumption_sum,
+            SUM(allocated_generation) AS total_generation_sum
         FROM
             settlement_data
         WHERE
             date IS NOT NULL
             {plant_filter}
+        GROUP BY
+            YEAR(date), MONTH(date)
         ORDER BY
-            date;
+            year, month_num;
     """
 
-    # --- Fetch Monthly Banking Settlement ---
-    settlement_query = """
+    plant_filter, params = "", ()
+    if client_name:
+        plant_filter, params = "AND client_name = %s", (client_name,)
+    if client_name and plant_id is not None:
+        plant_filter, params = plant_filter + " AND plant_id = %s", params + (plant_id,)
+    if since is not None:
+        plant_filter, params = plant_filter + " AND date >= %s", params + (since,)
+    return query.format(plant_filter=plant_filter), params
+
+
+def build_banking_settlement_query(client_name: str = None, since=None):
+    """
+    Build the banking settlement totals query (banking_settlement is already monthly).
+
+    Args:
+        since (date, optional): Only months from this date on (the months after the snapshots)
+
+    Returns:
+        Tuple of (query, params)
+    """
+    query = """
         SELECT
             date AS month,
             SUM(matched_settled_sum) AS total_matched_settled_sum,
@@ -228,46 +497,101 @@ def fetch_combined_monthly_data(
             date;
     """
 
-    # Prepare query and params
-    params = ()
-    if plant_name:
-        consumption_query = consumption_query.format(plant_filter="AND client_name = %s")
-        settlement_query = settlement_query.format(plant_filter="AND client_name = %s")
-        params = (plant_name,)
-    else:
-        consumption_query = consumption_query.format(plant_filter="")
-        settlement_query = settlement_query.format(plant_filter="")
+    plant_filter, params = "", ()
+    if client_name:
+        plant_filter, params = "AND client_name = %s", (client_name,)
+    if since is not None:
+        plant_filter, params = plant_filter + " AND date >= %s", params + (since,)
+    return query.format(plant_filter=plant_filter), params
+
+
+def read_monthly_consumption(conn, client_name: str = None, plant_id=None, raise_errors: bool = False) -> pd.DataFrame:
+    """
+    Read month-wise consumption and generation totals. Closed months come from the
+    Parquet snapshots, later months from the monthly rollup when fresh, streamed
+    and summed per month in chunks. With a plant_id only that plant's rows are summed.
+    Query errors give an empty result, or raise with raise_errors.
 
+    Returns:
+        pd.DataFrame with columns: month, total_consumption_sum, total_generation_sum
+    """
+    cutoff = covered_until(client_name)
+    frames = []
+    if cutoff is not None:
+        snapshot_df = read_settlement(client_name, plant_id=plant_id, columns=['consumption', 'generation'])
+        frames.append(settlement_totals(snapshot_df, ['month']).rename(columns={
+            'consumption': 'total_consumption_sum', 'generation': 'total_generation_sum'
+        }))
+
+    query, params = build_monthly_consumption_query(
+        client_name,
+        use_rollup=bool(client_name) and plant_id is None and rollup_is_fresh(client_name),
+        plant_id=plant_id,
+        since=cutoff + timedelta(days=1) if cutoff is not None else None
+    )
+    read = read_chunked if raise_errors else safe_read_chunked
+    frames.append(read(query, conn, ['year', 'month_num'], params, MONTHLY_CONSUMPTION_SCHEMA))
+    df = merge_periods(frames, ['year', 'month_num'])
+    if df.empty:
+        return pd.DataFrame(columns=['month', 'total_consumption_sum', 'total_generation_sum'])
+
+    df = add_month_column(df)
+    return df[['month', 'total_consumption_sum', 'total_generation_sum']]
+
+
+def read_banking_settlement(conn, client_name: str = None, raise_errors: bool = False) -> pd.DataFrame:
+    """
+    Read month-wise banking settlement totals, streamed and summed per month in chunks.
+    Query errors give an empty result, or raise with raise_errors.
+
+    Returns:
+        pd.DataFrame with columns: month, total_matched_settled_sum, total_intra_settlement,
+        total_inter_settlement, surplus_demand_sum
+    """
+    cutoff = covered_until(client_name, "banking")
+    frames = [read_banking(client_name)] if cutoff is not None else []
+
+    query, params = build_banking_settlement_query(
+        client_name, since=cutoff + timedelta(days=1) if cutoff is not None else None
+    )
+    read = read_chunked if raise_errors else safe_read_chunked
+    frames.append(read(query, conn, ['month'], params, BANKING_SCHEMA))
+    df = merge_periods(frames, ['month'])
+    if df.empty:
+        return pd.DataFrame(columns=BANKING_COLUMNS)
+
+    df['month'] = df['month'].dt.strftime('%Y-%m')
+    return df
+
+
+def fetch_combined_monthly_data(
+    conn,
+    plant_name: str = None,
+    plant_id=None
+) -> pd.DataFrame:
+    """
+    Fetch monthly aggregated data for both consumption and banking settlement.
+
+    Args:
+        conn: MySQL connection object
+        plant_name (str, optional): Filter by plant name
+        plant_id (optional): tbl_plants id; narrows consumption and generation to one plant,
+            banking_settlement has no plant column and stays client-wide
+
+    Returns:
+        pd.DataFrame: Merged DataFrame with month-wise consumption and settlement data
+    """
     try:
-        # Read consumption data and group by month using safe database utility
-        df_consumption = safe_read_sql(consumption_query, conn, params)
-        
-        if df_consumption.empty:
+        # Read monthly consumption totals using safe database utility
+        df_consumption_monthly = read_monthly_consumption(conn, plant_name, plant_id)
+
+        if df_consumption_monthly.empty:
             print("Warning: No consumption data found")
             return pd.DataFrame()
-            
-        df_consumption['date'] = pd.to_datetime(df_consumption['date'])
-        df_consumption['month'] = df_consumption['date'].dt.to_period('M').astype(str)
-        # df_consumption_monthly = (
-        #     df_consumption.groupby('month', as_index=False)['consumption']
-        #     .sum()
-        #     .rename(columns={'consumption': 'total_consumption_sum'})
-        # )
-
-        df_consumption_monthly = (
-            df_consumption
-            .groupby('month', as_index=False)[['consumption', 'generation']]
-            .sum()
-            .rename(columns={
-                'consumption': 'total_consumption_sum',
-                'generation': 'total_generation_sum'
-            })
-        )
-
 
         # Read banking settlement data (already monthly) using safe database utility
-        df_settlement = safe_read_sql(settlement_query, conn, params)
-        
+        df_settlement = read_banking_settlement(conn, plant_name)
+
         if df_settlement.empty:
             print("Warning: No settlement data found")
             # Return consumption data only with zeros for settlement columns
@@ -275,8 +599,6 @@ def fetch_combined_monthly_data(
             df_consumption_monthly['total_intra_settlement'] = 0
             df_consumption_monthly['total_inter_settlement'] = 0
             return df_consumption_monthly
-            
-        df_settlement['month'] = pd.to_datetime(df_settlement['month']).dt.to_period('M').astype(str)
 
         # Merge both on 'month'
         df_combined = pd.merge(
@@ -287,7 +609,7 @@ def fetch_combined_monthly_data(
         ).sort_values('month').reset_index(drop=True)
 
         return df_combined
-        
+
     except Exception as e:
         print(f"Error in fetch_combined_monthly_data: {e}")
         return pd.DataFrame()
@@ -297,76 +619,33 @@ def fetch_combined_monthly_data(
 
 def fetch_monthly_banking_calculations(
     conn,
-    plant_name: str = None
+    plant_name: str = None,
+    plant_id=None
 ) -> pd.DataFrame:
     """
     Fetch monthly aggregated data for consumption, banking settlement, and surplus demand.
+    Query errors raise instead of giving empty months.
 
     Args:
         conn: MySQL connection object
         plant_name (str, optional): Filter by plant name
+        plant_id (optional): tbl_plants id; narrows consumption and generation to one plant,
+            banking_settlement has no plant column and stays client-wide
 
     Returns:
         pd.DataFrame: DataFrame with month-wise merged metrics including surplus_demand_after_banking
     """
-
-    # --- Fetch Daily Consumption ---
-    consumption_query = """
-        SELECT
-            date,
-            consumption
-        FROM
-            settlement_data
-        WHERE
-            date IS NOT NULL
-            {plant_filter}
-        ORDER BY
-            date;
-    """
-
-    # --- Fetch Monthly Banking Settlement (with surplus_demand_sum) ---
-    settlement_query = """
-        SELECT
-            date AS month,
-            SUM(matched_settled_sum) AS matched_settled_sum,
-            SUM(intra_settlement) AS intra_settlement,
-            SUM(inter_settlement) AS inter_settlement,
-            SUM(surplus_demand_sum) AS surplus_demand_sum
-        FROM
-            banking_settlement
-        WHERE
-            date IS NOT NULL
-            {plant_filter}
-        GROUP BY
-            date
-        ORDER BY
-            date;
-    """
-
-    # Prepare queries and parameters
-    params = ()
-    if plant_name:
-        filter_clause = "AND client_name = %s"
-        params = (plant_name,)
-    else:
-        filter_clause = ""
-
-    consumption_query = consumption_query.format(plant_filter=filter_clause)
-    settlement_query = settlement_query.format(plant_filter=filter_clause)
-
     # --- Fetch and process consumption ---
-    df_consumption = pd.read_sql(consumption_query, con=conn, params=params)
-    df_consumption['date'] = pd.to_datetime(df_consumption['date'])
-    df_consumption['month'] = df_consumption['date'].dt.to_period('M').astype(str)
-    df_consumption_monthly = (
-        df_consumption.groupby('month', as_index=False)['consumption']
-        .sum()
-        .rename(columns={'consumption': 'total_consumption_sum'})
-    )
+    df_consumption_monthly = read_monthly_consumption(
+        conn, plant_name, plant_id, raise_errors=True
+    )[['month', 'total_consumption_sum']]
 
     # --- Fetch and process settlement data ---
-    df_settlement = pd.read_sql(settlement_query, con=conn, params=params)
-    df_settlement['month'] = pd.to_datetime(df_settlement['month']).dt.to_period('M').astype(str)
+    df_settlement = read_banking_settlement(conn, plant_name, raise_errors=True).rename(columns={
+        'total_matched_settled_sum': 'matched_settled_sum',
+        'total_intra_settlement': 'intra_settlement',
+        'total_inter_settlement': 'inter_settlement'
+    })
 
     # --- Merge and calculate surplus_demand_after_banking ---
     df_combined = pd.merge(df_consumption_monthly, df_settlement, on='month', how='outer')
@@ -379,4 +658,4 @@ def fetch_monthly_banking_calculations(
     - df_combined['inter_settlement'].fillna(0)
     ).clip(lower=0)
 
-    return df_combined
\ No newline at end of file
+    return df_combined
@@ -0,0 +1,348 @@
+"""
+Schema migrations for the dashboard's read paths.
+
+Every dashboard query filters settlement_data / banking_settlement by
+client_name and a date range, then sums a handful of measure columns. The
+indexes below lead with (client_name, date) and carry the summed columns, so
+MySQL answers those queries from the index alone instead of scanning the table.
+Plant views filter on settlement_data.plant_id, which is added as a column
+first, filled from tbl_plants where a row's plant is unambiguous, and get their
+own (client_name, plant_id, date) indexes:
+
+    python -m db.migrations apply                                   create missing indexes
+    python -m db.migrations backfill                                fill plant_id of newly loaded rows
+    python -m db.migrations check CLIENT [START END [PLANT_ID]]     EXPLAIN the dashboard queries
+
+Applied migrations are recorded in schema_migrations, and each column and index
+is checked against information_schema first, so running apply twice is harmless.
+"""
+import sys
+from datetime import date, timedelta
+
+from db.db_setup import get_db_connection, release_db_connection
+from db.fetch_summary_data import build_generation_consumption_query
+from db.fetch_tod_tab_data import (
+    build_daily_tod_query,
+    build_all_daily_tod_query,
+    build_monthly_consumption_query,
+    build_banking_settlement_query
+)
+
+SCHEMA_MIGRATIONS_DDL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        name VARCHAR(128) NOT NULL PRIMARY KEY,
+        applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+# (migration name, table, column, definition), applied before the indexes.
+# plant_id is the tbl_plants id of the row's plant; rows left NULL only show in
+# the client-wide views.
+COLUMN_MIGRATIONS = [
+    ("006a_settlement_plant_id_column", "settlement_data", "plant_id", "VARCHAR(50) NULL AFTER client_name")
+]
+
+PLANT_ID_BACKFILL_MIGRATION = "006b_settlement_plant_id_backfill"
+
+# settlement_data has no plant name, so a row's plant is only known when its client
+# has a single tbl_plants plant of the row's type (or a single plant at all, when
+# either table has no type column). Rows of other clients keep plant_id NULL until
+# the loader that writes settlement_data fills it.
+PLANT_ID_BACKFILL_BY_TYPE = """
+    UPDATE settlement_data s
+    JOIN (
+        SELECT client_name, LOWER(type) AS plant_type, MIN(plant_id) AS plant_id
+        FROM tbl_plants
+        WHERE type IS NOT NULL
+        GROUP BY client_name, LOWER(type)
+        HAVING COUNT(*) = 1
+    ) p ON p.client_name = s.client_name AND p.plant_type = LOWER(s.type)
+    SET s.plant_id = p.plant_id
+    WHERE s.plant_id IS NULL
+"""
+
+PLANT_ID_BACKFILL_BY_CLIENT = """
+    UPDATE settlement_data s
+    JOIN (
+        SELECT client_name, MIN(plant_id) AS plant_id
+        FROM tbl_plants
+        GROUP BY client_name
+        HAVING COUNT(*) = 1
+    ) p ON p.client_name = s.client_name
+    SET s.plant_id = p.plant_id
+    WHERE s.plant_id IS NULL
+"""
+
+# (migration name, table, index name, columns), applied in order
+MIGRATIONS = [
+    (
+        "001_settlement_client_date_summary", "settlement_data", "idx_sd_client_date_summary",
+        ["client_name", "date", "allocated_generation", "consumption", "deficit",
+         "surplus_demand", "surplus_generation", "settled"]
+    ),
+    (
+        "002_settlement_client_date_slot", "settlement_data", "idx_sd_client_date_slot",
+        ["client_name", "date", "slot_name", "allocated_generation", "consumption"]
+    ),
+    (
+        "003_settlement_client_date_datetime", "settlement_data", "idx_sd_client_date_datetime",
+        ["client_name", "date", "datetime"]
+    ),
+    (
+        "004_settlement_client_id", "settlement_data", "idx_sd_client_id",
+        ["client_name", "id"]
+    ),
+    (
+        "005_settlement_client_type_date_slot", "settlement_data", "idx_sd_client_type_date_slot",
+        ["client_name", "type", "date", "slot_name", "allocated_generation", "consumption"]
+    ),
+    (
+        "006_banking_client_date", "banking_settlement", "idx_bs_client_date",
+        ["client_name", "date", "matched_settled_sum", "intra_settlement",
+         "inter_settlement", "surplus_demand_sum"]
+    ),
+    (
+        "007_settlement_client_plant_date_summary", "settlement_data", "idx_sd_client_plant_date_summary",
+        ["client_name", "plant_id", "date", "allocated_generation", "consumption", "deficit",
+         "surplus_demand", "surplus_generation", "settled"]
+    ),
+    (
+        "008_settlement_client_plant_date_slot", "settlement_data", "idx_sd_client_plant_date_slot",
+        ["client_name", "plant_id", "date", "slot_name", "allocated_generation", "consumption"]
+    )
+]
+
+
+def _fetchall(cursor, query: str, params=()):
+    cursor.execute(query, params)
+    if cursor.with_rows:
+        return cursor.fetchall()
+    return []
+
+
+def _index_exists(cursor, table: str, index_name: str) -> bool:
+    rows = _fetchall(cursor, """
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        LIMIT 1
+    """, (table, index_name))
+    return bool(rows)
+
+
+def column_exists(cursor, table: str, column: str) -> bool:
+    rows = _fetchall(cursor, """
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+        LIMIT 1
+    """, (table, column))
+    return bool(rows)
+
+
+def backfill_plant_ids(cursor) -> int:
+    """
+    Fill settlement_data.plant_id from tbl_plants for rows whose plant is unambiguous.
+
+    Returns:
+        Number of rows updated
+    """
+    by_type = column_exists(cursor, "settlement_data", "type") and column_exists(cursor, "tbl_plants", "type")
+    cursor.execute(PLANT_ID_BACKFILL_BY_TYPE if by_type else PLANT_ID_BACKFILL_BY_CLIENT)
+    return cursor.rowcount
+
+
+def run_backfill():
+    """
+    Fill plant_id of settlement_data rows loaded without one, see backfill_plant_ids.
+
+    Returns:
+        Number of rows updated, or None if the backfill failed
+    """
+    conn = get_db_connection()
+    if conn is None:
+        print("❌ Backfill skipped: database connection not available")
+        return None
+
+    cursor = None
+    try:
+        cursor = conn.cursor()
+        return backfill_plant_ids(cursor)
+    except Exception as e:
+        print(f"Error filling plant_id: {e}")
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+        release_db_connection(conn)
+
+
+def _add_column(cursor, table: str, column: str, definition: str):
+    if not column_exists(cursor, table, column):
+        print(f"Adding {column} to {table} ({definition})")
+        _fetchall(cursor, f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def _fill_plant_ids(cursor):
+    print(f"Filled plant_id of {backfill_plant_ids(cursor)} settlement_data rows from tbl_plants")
+
+
+def _create_index(cursor, table: str, index_name: str, columns: list):
+    if not _index_exists(cursor, table, index_name):
+        print(f"Creating {index_name} on {table} ({', '.join(columns)})")
+        _fetchall(cursor, f"CREATE INDEX {index_name} ON {table} ({', '.join(columns)})")
+
+
+def migration_steps() -> list:
+    """
+    Every migration in the order apply_migrations runs them.
+
+    Returns:
+        List of (name, function, args); function(cursor, *args) applies the migration
+    """
+    return (
+        [(name, _add_column, (table, column, definition)) for name, table, column, definition in COLUMN_MIGRATIONS]
+        + [(PLANT_ID_BACKFILL_MIGRATION, _fill_plant_ids, ())]
+        + [(name, _create_index, (table, index_name, columns)) for name, table, index_name, columns in MIGRATIONS]
+    )
+
+
+def apply_migrations() -> tuple:
+    """
+    Add any missing columns from COLUMN_MIGRATIONS, fill settlement_data.plant_id
+    from tbl_plants, then create any missing indexes from MIGRATIONS.
+
+    Each migration runs on its own: one that fails is reported, left out of
+    schema_migrations (so the next run retries it) and the later ones still run.
+
+    Returns:
+        Tuple (applied, failed) of the names of the migrations applied and failed
+        by this run; failed is ['schema_migrations'] when no migration could run
+    """
+    conn = get_db_connection()
+    if conn is None:
+        print("❌ Migrations skipped: database connection not available")
+        return [], ["schema_migrations"]
+
+    cursor = None
+    applied, failed = [], []
+    try:
+        cursor = conn.cursor()
+        _fetchall(cursor, SCHEMA_MIGRATIONS_DDL)
+        done = {row[0] for row in _fetchall(cursor, "SELECT name FROM schema_migrations")}
+
+        for name, migrate, args in migration_steps():
+            if name in done:
+                continue
+            try:
+                migrate(cursor, *args)
+                _fetchall(cursor, "INSERT INTO schema_migrations (name) VALUES (%s)", (name,))
+                applied.append(name)
+            except Exception as e:
+                print(f"❌ Migration {name} failed: {e}")
+                failed.append(name)
+    except Exception as e:
+        print(f"Error applying migrations: {e}")
+        failed.append("schema_migrations")
+    finally:
+        if cursor:
+            cursor.close()
+        release_db_connection(conn)
+
+    return applied, failed
+
+
+def dashboard_queries(client_name: str, start_date: str, end_date: str, plant_id=None) -> dict:
+    """
+    The raw-table queries issued by the dashboard fetchers for one client and range.
+
+    Args:
+        plant_id: tbl_plants id of one of the client's plants; adds the plant view's queries
+
+    Returns:
+        Dictionary of label -> (query, params)
+    """
+    queries = {
+        "summary_single_day": build_generation_consumption_query(client_name, start_date, start_date),
+        "summary_daily": build_generation_consumption_query(client_name, start_date, end_date),
+        "summary_weekly": build_generation_consumption_query(client_name, start_date, end_date, resolution="week"),
+        "tod_daily": build_daily_tod_query(client_name, start_date, end_date),
+        "tod_daily_by_type": build_daily_tod_query(client_name, start_date, end_date, plant_type="Solar"),
+        "tod_all_daily": build_all_daily_tod_query(client_name),
+        "tod_all_monthly": build_all_daily_tod_query(client_name, resolution="month"),
+        "monthly_consumption": build_monthly_consumption_query(client_name),
+        "banking_settlement": build_banking_settlement_query(client_name)
+    }
+    if plant_id is not None:
+        queries.update({
+            "plant_summary_daily": build_generation_consumption_query(client_name, start_date, end_date, plant_id=plant_id),
+            "plant_tod_daily": build_daily_tod_query(client_name, start_date, end_date, plant_id=plant_id),
+            "plant_tod_all_monthly": build_all_daily_tod_query(client_name, resolution="month", plant_id=plant_id),
+            "plant_monthly_consumption": build_monthly_consumption_query(client_name, plant_id=plant_id)
+        })
+    return queries
+
+
+def check_query_plans(client_name: str, start_date: str = None, end_date: str = None, plant_id=None) -> list:
+    """
+    EXPLAIN every dashboard query and report the ones that scan a whole table.
+
+    Args:
+        client_name: Client to plug into the queries
+        start_date: Range start (YYYY-MM-DD), defaults to 30 days ago
+        end_date: Range end (YYYY-MM-DD), defaults to today
+        plant_id: Also check the plant view's queries for this tbl_plants id
+
+    Returns:
+        List of (label, table, key) for plan rows with access type ALL
+    """
+    end_date = end_date or date.today().isoformat()
+    start_date = start_date or (date.fromisoformat(end_date) - timedelta(days=30)).isoformat()
+
+    conn = get_db_connection()
+    if conn is None:
+        print("❌ Plan check skipped: database connection not available")
+        return []
+
+    cursor = None
+    full_scans = []
+    try:
+        cursor = conn.cursor(dictionary=True)
+        for label, (query, params) in dashboard_queries(client_name, start_date, end_date, plant_id).items():
+            for row in _fetchall(cursor, "EXPLAIN " + query.strip().rstrip(";"), params):
+                plan = {k.lower(): v for k, v in row.items()}
+                print(f"{label:22} table={plan.get('table')} type={plan.get('type')} "
+                      f"key={plan.get('key')} rows={plan.get('rows')} extra={plan.get('extra')}")
+                if plan.get('type') == 'ALL':
+                    full_scans.append((label, plan.get('table'), plan.get('key')))
+    except Exception as e:
+        print(f"Error checking query plans: {e}")
+    finally:
+        if cursor:
+            cursor.close()
+        release_db_connection(conn)
+
+    return full_scans
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ("apply", "backfill", "check") or (sys.argv[1] == "check" and len(sys.argv) < 3):
+        print("Usage: python -m db.migrations apply | backfill | check CLIENT_NAME [START_DATE END_DATE [PLANT_ID]]")
+        sys.exit(1)
+
+    if sys.argv[1] == "apply":
+        applied, failed = apply_migrations()
+        print(f"✅ Applied {len(applied)} migrations")
+        if failed:
+            print(f"❌ {len(failed)} migrations failed: {', '.join(failed)}")
+            sys.exit(1)
+    elif sys.argv[1] == "backfill":
+        updated = run_backfill()
+        if updated is None:
+            sys.exit(1)
+        print(f"✅ Filled plant_id of {updated} settlement_data rows")
+    else:
+        scans = check_query_plans(*sys.argv[2:6])
+        if scans:
+            for label, table, _ in scans:
+                print(f"❌ Full table scan: {label} on {table}")
+            sys.exit(1)
+        print("✅ No full table scans")
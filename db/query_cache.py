@@ -0,0 +1,181 @@
+"""
+Process-wide query result cache used by safe_read_sql.
+
+Results are keyed by normalized SQL text and parameters, expire after a TTL that
+depends on the query family (the main table a query reads) and are evicted in
+least-recently-used order once the entry or byte budget is exceeded.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from config.app_config import QUERY_CACHE_CONFIG
+
+# Query family -> table that identifies it, checked in order
+FAMILY_TABLES = [
+    ("rollups", "rollup_watermarks"),
+    ("rollups", "_rollup"),
+    ("plants", "tbl_plants"),
+    ("banking", "banking_settlement"),
+    ("settlement", "settlement_data"),
+]
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace and drop the trailing semicolon so equivalent SQL shares a key."""
+    return " ".join(query.split()).rstrip(";").strip()
+
+
+def normalize_params(params) -> tuple:
+    """Turn query parameters into a hashable tuple, with dates in ISO form."""
+    if params is None:
+        return ()
+    if isinstance(params, dict):
+        params = sorted(params.items())
+    return tuple(
+        p.isoformat() if hasattr(p, "isoformat") else p
+        for p in params
+    )
+
+
+def detect_family(query: str) -> str:
+    """Return the query family of a normalized query, or 'default'."""
+    lowered = query.lower()
+    for family, table in FAMILY_TABLES:
+        if table in lowered:
+            return family
+    return "default"
+
+
+class QueryCache:
+    """Thread-safe TTL + LRU cache of query result DataFrames."""
+
+    def __init__(self, max_entries: int, max_bytes: int, default_ttl: float, ttl_by_family: dict = None, enabled: bool = True):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttl_by_family = dict(ttl_by_family or {})
+
+        self._entries = OrderedDict()  # key -> (df, expires_at, nbytes, family, params)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    @classmethod
+    def from_config(cls, config: dict) -> "QueryCache":
+        return cls(
+            max_entries=config.get("max_entries", 512),
+            max_bytes=config.get("max_bytes", 256 * 1024 * 1024),
+            default_ttl=config.get("default_ttl", 300),
+            ttl_by_family=config.get("ttl_by_family", {}),
+            enabled=config.get("enabled", True),
+        )
+
+    def make_key(self, query: str, params=None, family: str = None) -> tuple:
+        """
+        Build the cache key for a query.
+
+        Returns:
+            (family, normalized_query, normalized_params)
+        """
+        normalized = normalize_query(query)
+        return (family or detect_family(normalized), normalized, normalize_params(params))
+
+    def ttl_for(self, family: str) -> float:
+        return self.ttl_by_family.get(family, self.default_ttl)
+
+    def get(self, key: tuple):
+        """Return a copy of the cached frame for key, or None on a miss."""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+
+            df, expires_at = entry[0], entry[1]
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+
+        # Hand out copies so callers can add columns without touching the cache
+        return df.copy()
+
+    def put(self, key: tuple, df: pd.DataFrame, ttl: float = None):
+        """Store a query result, evicting least recently used entries if over budget."""
+        if not self.enabled:
+            return
+
+        family, _, params = key
+        ttl = self.ttl_for(family) if ttl is None else ttl
+        if ttl <= 0:
+            return
+
+        nbytes = int(df.memory_usage(deep=True).sum())
+        if nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (df, time.monotonic() + ttl, nbytes, family, params)
+            self._total_bytes += nbytes
+
+            while self._entries and (len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, family: str = None, client_name: str = None) -> int:
+        """
+        Drop cached results.
+
+        Args:
+            family: Only drop results of this query family (e.g. 'settlement')
+            client_name: Only drop results whose parameters include this client
+
+        Returns:
+            Number of entries removed. With no arguments the whole cache is cleared.
+        """
+        with self._lock:
+            doomed = [
+                key for key, entry in self._entries.items()
+                if (family is None or entry[3] == family)
+                and (client_name is None or client_name in entry[4])
+            ]
+            for key in doomed:
+                self._remove(key)
+            self._stats["invalidations"] += len(doomed)
+            return len(doomed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), bytes=self._total_bytes)
+
+    def _remove(self, key: tuple):
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry[2]
+
+
+# Shared cache for the whole Streamlit server process
+QUERY_CACHE = QueryCache.from_config(QUERY_CACHE_CONFIG)
+
+
+def invalidate_query_cache(family: str = None, client_name: str = None) -> int:
+    """Invalidate cached query results, see QueryCache.invalidate."""
+    return QUERY_CACHE.invalidate(family=family, client_name=client_name)
+
+
+def get_query_cache_stats() -> dict:
+    """Get hit/miss/eviction counters and current size of the query cache."""
+    return QUERY_CACHE.stats()
@@ -0,0 +1,379 @@
+"""
+Pre-aggregated rollups of settlement_data.
+
+Three summary tables are kept per client:
+    settlement_daily_rollup    client x date            (Summary tab)
+    settlement_slot_rollup     client x date x slot     (ToD tab)
+    settlement_monthly_rollup  client x month           (banking / power cost)
+
+rollup_watermarks records, per client, the highest settlement_data id already
+folded in. A refresh re-aggregates only the dates that received rows above the
+watermark, plus a short trailing window to pick up late corrections and any
+recent date whose row count no longer matches (rows deleted), so it can run
+every few minutes from cron. Deletes older than ROLLUP_CONFIG['drift_days'] are
+picked up by a reconcile (e.g. nightly), updates in place to rows older than the
+trailing window only by a build:
+
+    python -m db.rollups build     [client_name]
+    python -m db.rollups refresh   [client_name]
+    python -m db.rollups reconcile [client_name]
+
+Fetchers read the rollups instead of settlement_data when ROLLUP_CONFIG is
+enabled and the client's watermark is fresh (see rollup_is_fresh).
+"""
+import sys
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from config.app_config import ROLLUP_CONFIG
+from db.db_setup import get_db_connection, release_db_connection
+from db.safe_db_utils import safe_read_typed
+
+ROLLUP_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS settlement_daily_rollup (
+        client_name VARCHAR(255) NOT NULL,
+        date DATE NOT NULL,
+        generation {measure},
+        consumption {measure},
+        deficit {measure},
+        surplus_demand {measure},
+        surplus_generation {measure},
+        settled {measure},
+        row_count INT NOT NULL,
+        PRIMARY KEY (client_name, date)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS settlement_slot_rollup (
+        client_name VARCHAR(255) NOT NULL,
+        date DATE NOT NULL,
+        slot_name VARCHAR(64) NOT NULL,
+        generation_kwh {measure},
+        consumption_kwh {measure},
+        row_count INT NOT NULL,
+        PRIMARY KEY (client_name, date, slot_name)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS settlement_monthly_rollup (
+        client_name VARCHAR(255) NOT NULL,
+        year SMALLINT NOT NULL,
+        month_num TINYINT NOT NULL,
+        total_consumption_sum {measure},
+        total_generation_sum {measure},
+        row_count INT NOT NULL,
+        PRIMARY KEY (client_name, year, month_num)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS rollup_watermarks (
+        client_name VARCHAR(255) NOT NULL PRIMARY KEY,
+        max_source_id BIGINT NOT NULL,
+        max_date DATE,
+        refreshed_at DATETIME NOT NULL
+    )
+    """
+]
+
+# Rollup columns holding sums, per table
+ROLLUP_MEASURES = {
+    "settlement_daily_rollup": ["generation", "consumption", "deficit", "surplus_demand", "surplus_generation", "settled"],
+    "settlement_slot_rollup": ["generation_kwh", "consumption_kwh"],
+    "settlement_monthly_rollup": ["total_consumption_sum", "total_generation_sum"]
+}
+SOURCE_MEASURES = ("allocated_generation", "consumption", "deficit", "surplus_demand", "surplus_generation", "settled")
+
+# Dates are re-aggregated in batches to keep IN (...) lists bounded
+DATE_BATCH_SIZE = 200
+
+
+def rollup_is_fresh(client_name: str, end_date=None) -> bool:
+    """
+    Check whether the rollups can stand in for settlement_data for a client.
+
+    Args:
+        client_name: Name of the client
+        end_date: Last date the caller needs (YYYY-MM-DD), optional
+
+    Returns:
+        True if rollups are enabled, were refreshed within max_staleness and
+        cover end_date; False means the caller should query the raw table.
+    """
+    if not ROLLUP_CONFIG.get("enabled", False) or not client_name:
+        return False
+
+    df = safe_read_typed(
+        "SELECT max_date, refreshed_at FROM rollup_watermarks WHERE client_name = %s",
+        None,
+        (client_name,),
+        {"max_date": "datetime64", "refreshed_at": "datetime64"}
+    )
+    if df.empty or pd.isna(df.iloc[0]['refreshed_at']):
+        return False
+
+    refreshed_at = pd.Timestamp(df.iloc[0]['refreshed_at'])
+    if refreshed_at < pd.Timestamp.now() - pd.Timedelta(seconds=ROLLUP_CONFIG["max_staleness"]):
+        return False
+
+    if end_date is not None:
+        max_date = df.iloc[0]['max_date']
+        if pd.isna(max_date) or pd.Timestamp(max_date) < pd.Timestamp(end_date):
+            return False
+
+    return True
+
+
+def _execute(cursor, query: str, params=()):
+    cursor.execute(query, params)
+    if cursor.with_rows:
+        return cursor.fetchall()
+    return []
+
+
+def _measure_type(cursor) -> str:
+    """
+    Column type of the rollup sums: settlement_data's own scale, so rollup-backed
+    totals match the raw-table path exactly, with room for any number of rows.
+    """
+    placeholders = ", ".join(["%s"] * len(SOURCE_MEASURES))
+    rows = _execute(cursor, f"""
+        SELECT data_type, numeric_scale FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = 'settlement_data' AND column_name IN ({placeholders})
+    """, SOURCE_MEASURES)
+    if any(str(data_type).lower() in ("float", "double") for data_type, _ in rows):
+        return "DOUBLE"
+    scale = max((scale for _, scale in rows if scale is not None), default=2)
+    return f"DECIMAL(65,{min(int(scale), 30)})"
+
+
+def _create_tables(cursor, full: bool = False):
+    """Create the rollup tables; a full build also widens existing measure columns."""
+    measure = _measure_type(cursor)
+    for statement in ROLLUP_DDL:
+        _execute(cursor, statement.format(measure=measure))
+    if full:
+        for table, columns in ROLLUP_MEASURES.items():
+            modify = ", ".join(f"MODIFY {column} {measure}" for column in columns)
+            _execute(cursor, f"ALTER TABLE {table} {modify}")
+
+
+def _refresh_dates(cursor, client_name: str, dates: list):
+    """Recompute the daily and slot rollups of one client for the given dates."""
+    for start in range(0, len(dates), DATE_BATCH_SIZE):
+        batch = dates[start:start + DATE_BATCH_SIZE]
+        placeholders = ", ".join(["%s"] * len(batch))
+        params = [client_name] + batch
+
+        _execute(cursor, f"DELETE FROM settlement_daily_rollup WHERE client_name = %s AND date IN ({placeholders})", params)
+        _execute(cursor, f"DELETE FROM settlement_slot_rollup WHERE client_name = %s AND date IN ({placeholders})", params)
+
+        _execute(cursor, f"""
+            INSERT INTO settlement_daily_rollup
+                (client_name, date, generation, consumption, deficit,
+                 surplus_demand, surplus_generation, settled, row_count)
+            SELECT
+                client_name, date,
+                SUM(allocated_generation), SUM(consumption), SUM(deficit),
+                SUM(surplus_demand), SUM(surplus_generation), SUM(settled), COUNT(*)
+            FROM settlement_data
+            WHERE client_name = %s AND date IN ({placeholders})
+            GROUP BY client_name, date
+        """, params)
+
+        _execute(cursor, f"""
+            INSERT INTO settlement_slot_rollup
+                (client_name, date, slot_name, generation_kwh, consumption_kwh, row_count)
+            SELECT
+                client_name, date, slot_name,
+                SUM(allocated_generation), SUM(consumption), COUNT(*)
+            FROM settlement_data
+            WHERE client_name = %s AND date IN ({placeholders}) AND slot_name IS NOT NULL
+            GROUP BY client_name, date, slot_name
+        """, params)
+
+
+def _refresh_months(cursor, client_name: str, months: set):
+    """Recompute monthly rollups of one client from its daily rollup."""
+    for year, month_num in sorted(months):
+        params = (client_name, year, month_num)
+        _execute(cursor, "DELETE FROM settlement_monthly_rollup WHERE client_name = %s AND year = %s AND month_num = %s", params)
+        _execute(cursor, """
+            INSERT INTO settlement_monthly_rollup
+                (client_name, year, month_num, total_consumption_sum, total_generation_sum, row_count)
+            SELECT
+                client_name, YEAR(date), MONTH(date),
+                SUM(consumption), SUM(generation), SUM(row_count)
+            FROM settlement_daily_rollup
+            WHERE client_name = %s AND YEAR(date) = %s AND MONTH(date) = %s
+            GROUP BY client_name, YEAR(date), MONTH(date)
+        """, params)
+
+
+def _drifted_dates(cursor, client_name: str, since=None) -> list:
+    """Rollup dates (from since on, or all) whose settlement_data row count changed."""
+    if since is None:
+        source_filter, rollup_filter, params = "", "", (client_name, client_name)
+    else:
+        source_filter, rollup_filter = " AND date >= %s", " AND r.date >= %s"
+        params = (client_name, since, client_name, since)
+
+    rows = _execute(cursor, f"""
+        SELECT r.date
+        FROM settlement_daily_rollup r
+        LEFT JOIN (
+            SELECT date, COUNT(*) AS row_count
+            FROM settlement_data
+            WHERE client_name = %s{source_filter}
+            GROUP BY date
+        ) s ON s.date = r.date
+        WHERE r.client_name = %s{rollup_filter}
+            AND (s.row_count IS NULL OR s.row_count <> r.row_count)
+    """, params)
+    return [row[0] for row in rows]
+
+
+def refresh_client_rollups(cursor, client_name: str, full: bool = False, reconcile: bool = False) -> int:
+    """
+    Bring one client's rollups up to date.
+
+    Args:
+        cursor: Cursor on a connection with an open transaction
+        client_name: Name of the client
+        full: Re-aggregate every date instead of only new or changed ones
+        reconcile: Check the row counts of every date for deletes, not only the last drift_days
+
+    Returns:
+        Number of dates re-aggregated
+    """
+    watermark = _execute(cursor, "SELECT max_source_id, max_date FROM rollup_watermarks WHERE client_name = %s", (client_name,))
+    last_id, last_date = (watermark[0] if watermark and not full else (0, None))
+
+    current = _execute(cursor, "SELECT MAX(id), MAX(date) FROM settlement_data WHERE client_name = %s", (client_name,))
+    max_id, max_date = current[0] if current else (None, None)
+    if max_id is None:
+        return 0
+
+    # Dates that received rows since the last refresh...
+    changed = _execute(cursor, "SELECT DISTINCT date FROM settlement_data WHERE client_name = %s AND id > %s AND date IS NOT NULL", (client_name, last_id))
+    dates = {row[0] for row in changed}
+
+    # ...plus a trailing window, since late corrections update rows in place
+    if last_date is not None:
+        window_start = last_date - timedelta(days=ROLLUP_CONFIG["lookback_days"])
+        recent = _execute(cursor, "SELECT DISTINCT date FROM settlement_data WHERE client_name = %s AND date >= %s", (client_name, window_start))
+        dates.update(row[0] for row in recent)
+
+        # ...plus dates whose row count changed, i.e. rows deleted. Counting every date
+        # reads all of the client's rows, so only a reconcile looks past drift_days
+        drift_start = None if reconcile else last_date - timedelta(days=ROLLUP_CONFIG["drift_days"])
+        dates.update(_drifted_dates(cursor, client_name, drift_start))
+
+    dates = sorted(dates)
+    if full:
+        for table in ("settlement_daily_rollup", "settlement_slot_rollup", "settlement_monthly_rollup"):
+            _execute(cursor, f"DELETE FROM {table} WHERE client_name = %s", (client_name,))
+
+    _refresh_dates(cursor, client_name, dates)
+    _refresh_months(cursor, client_name, {(d.year, d.month) for d in dates})
+
+    _execute(cursor, """
+        INSERT INTO rollup_watermarks (client_name, max_source_id, max_date, refreshed_at)
+        VALUES (%s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            max_source_id = VALUES(max_source_id),
+            max_date = VALUES(max_date),
+            refreshed_at = VALUES(refreshed_at)
+    """, (client_name, max_id, max_date, datetime.now()))
+
+    return len(dates)
+
+
+def _run(client_name: str = None, full: bool = False, reconcile: bool = False) -> dict:
+    conn = get_db_connection()
+    if conn is None:
+        print("❌ Rollup refresh skipped: database connection not available")
+        return {}
+
+    cursor = None
+    refreshed = {}
+    try:
+        cursor = conn.cursor()
+        _create_tables(cursor, full=full)
+
+        if client_name:
+            clients = [client_name]
+        else:
+            clients = [row[0] for row in _execute(cursor, "SELECT DISTINCT client_name FROM settlement_data WHERE client_name IS NOT NULL")]
+
+        # One transaction per client keeps each client's rollups consistent
+        for client in clients:
+            conn.start_transaction()
+            try:
+                refreshed[client] = refresh_client_rollups(cursor, client, full=full, reconcile=reconcile)
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"Error refreshing rollups for {client}: {e}")
+    except Exception as e:
+        print(f"Error in rollup refresh: {e}")
+    finally:
+        if cursor:
+            cursor.close()
+        release_db_connection(conn)
+
+    return refreshed
+
+
+def build_rollups(client_name: str = None) -> dict:
+    """
+    Create the rollup tables if needed and rebuild them from scratch.
+
+    Args:
+        client_name: Only rebuild this client (default: every client)
+
+    Returns:
+        Dictionary of client -> number of dates aggregated
+    """
+    return _run(client_name, full=True)
+
+
+def refresh_rollups(client_name: str = None) -> dict:
+    """
+    Incrementally refresh rollups, re-processing only new or changed dates.
+
+    Args:
+        client_name: Only refresh this client (default: every client)
+
+    Returns:
+        Dictionary of client -> number of dates re-aggregated
+    """
+    return _run(client_name, full=False)
+
+
+def reconcile_rollups(client_name: str = None) -> dict:
+    """
+    Refresh rollups like refresh_rollups, also re-aggregating dates of any age whose rows were deleted.
+    Reads every settlement_data row of the client, so run it rarely (e.g. nightly).
+
+    Args:
+        client_name: Only reconcile this client (default: every client)
+
+    Returns:
+        Dictionary of client -> number of dates re-aggregated
+    """
+    return _run(client_name, full=False, reconcile=True)
+
+
+ACTIONS = {"build": build_rollups, "refresh": refresh_rollups, "reconcile": reconcile_rollups}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ACTIONS:
+        print("Usage: python -m db.rollups build|refresh|reconcile [client_name]")
+        sys.exit(1)
+
+    action = ACTIONS[sys.argv[1]]
+    result = action(sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"✅ Rollups {sys.argv[1]} finished for {len(result)} clients, {sum(result.values())} dates")
@@ -1,38 +1,56 @@
 """
 Safe database utility functions to handle MySQL connection issues
 """
+import numpy as np
 import pandas as pd
 import mysql.connector
 from contextlib import contextmanager
-from db.db_setup import get_db_connection, CONN
+from config.app_config import STREAMING_CONFIG
+from db.db_setup import CONN, get_db_connection, get_scoped_connection, release_db_connection
+from db.query_cache import QUERY_CACHE
 
 @contextmanager
-def safe_db_connection():
-    """Context manager for safe database connections"""
-    conn = None
-    try:
-        conn = get_db_connection()
-        if conn is None:
-            conn = CONN  # Fallback to global connection
+def safe_db_connection(conn=None):
+    """
+    Context manager for safe database connections.
+
+    An explicit connection passed by the caller is used as is. The shared CONN
+    handle (or None) resolves to the connection borrowed for the current
+    request scope; outside a scope a pooled connection is borrowed for this
+    block only and returned afterwards.
+    """
+    if conn is not None and conn is not CONN:
         yield conn
-    except Exception as e:
-        print(f"Database connection error: {e}")
-        yield None
+        return
+
+    scoped_conn = get_scoped_connection()
+    if scoped_conn is not None:
+        yield scoped_conn
+        return
+
+    own_conn = get_db_connection()
+    try:
+        yield own_conn
     finally:
-        if conn and hasattr(conn, 'close'):
-            try:
-                # Ensure all results are consumed before closing
-                if hasattr(conn, '_cnx') and conn._cnx:
-                    conn._cnx.consume_results()
-                conn.close()
-            except:
-                pass
+        release_db_connection(own_conn)
+
+def safe_read_sql(query, conn, params=None, cache_family=None, use_cache=True):
+    """
+    Safely execute SQL query and return DataFrame.
+
+    Results are served from the process-wide query cache when a fresh entry
+    exists. cache_family overrides the TTL family detected from the query.
+    Failed queries are never cached.
+    """
+    cache_key = QUERY_CACHE.make_key(query, params, cache_family) if use_cache else None
+    if cache_key is not None:
+        cached = QUERY_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
 
-def safe_read_sql(query, conn, params=None):
-    """Safely execute SQL query and return DataFrame"""
     try:
-        # Create a new connection for this specific query to avoid conflicts
-        with safe_db_connection() as safe_conn:
+        # Reuse the request's connection instead of a fresh checkout per query
+        with safe_db_connection(conn) as safe_conn:
             if safe_conn is None:
                 return pd.DataFrame()
             
@@ -42,12 +60,240 @@ def safe_read_sql(query, conn, params=None):
             else:
                 df = pd.read_sql(query, safe_conn)
             
-            return df
-            
     except Exception as e:
         print(f"Error in safe_read_sql: {e}")
         return pd.DataFrame()
 
+    if cache_key is not None:
+        QUERY_CACHE.put(cache_key, df)
+        return df.copy()
+    return df
+
+def _decode_float(values) -> np.ndarray:
+    try:
+        # float() per value beats numpy's own Decimal conversion
+        return np.fromiter(map(float, values), dtype=np.float64, count=len(values))
+    except TypeError:
+        # NULLs present: numpy turns None into NaN
+        return np.array(values, dtype=np.float64)
+
+
+# Declared column type -> decoder of one column of Python values (None becomes NaN / NaT)
+COLUMN_DECODERS = {
+    "float64": _decode_float,
+    "int64": lambda values: np.array(values, dtype=np.int64),
+    # pandas parses date / datetime objects far faster than a numpy datetime64 cast
+    "datetime64": lambda values: pd.to_datetime(np.array(values, dtype=object)).astype("datetime64[ns]"),
+    "category": lambda values: pd.Categorical(values),
+}
+
+
+def rows_to_frame(columns, rows, schema=None) -> pd.DataFrame:
+    """
+    Build a DataFrame column by column from tuple rows.
+
+    Args:
+        columns: Column names, in row order
+        rows: Sequence of row tuples from a cursor
+        schema: Column name -> 'float64', 'int64', 'datetime64' or 'category';
+            other columns are kept as Python objects
+
+    Returns:
+        pd.DataFrame with the declared dtypes, also when rows is empty
+    """
+    schema = schema or {}
+    values = list(zip(*rows)) if rows else [()] * len(columns)
+    data = {}
+    for name, column in zip(columns, values):
+        decoder = COLUMN_DECODERS.get(schema.get(name))
+        data[name] = decoder(column) if decoder else np.array(column, dtype=object)
+    return pd.DataFrame(data, columns=list(columns), copy=False)
+
+
+def _fetch_rows(conn, query, params=None):
+    """Run query on a tuple cursor and return (column names, row tuples)."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, params or ())
+        rows = cursor.fetchall()
+        columns = [column[0] for column in cursor.description]
+
+        # Consume all results to avoid "Unread result found" error
+        while cursor.nextset():
+            pass
+    finally:
+        cursor.close()
+    return columns, rows
+
+
+def read_typed(query, conn, params=None, schema=None) -> pd.DataFrame:
+    """
+    Execute SQL query and decode the rows like safe_read_typed, but raise on errors.
+
+    For batch jobs such as the snapshot export, where a failed query must not be
+    mistaken for an empty result.
+    """
+    with safe_db_connection(conn) as safe_conn:
+        if safe_conn is None:
+            raise ConnectionError("Database connection not available")
+
+        columns, rows = _fetch_rows(safe_conn, query, params)
+
+    return rows_to_frame(columns, rows, schema)
+
+
+def safe_read_typed(query, conn, params=None, schema=None, cache_family=None, use_cache=True):
+    """
+    Safely execute SQL query and decode the rows straight into typed columns.
+
+    Unlike safe_read_sql, which goes through pd.read_sql and leaves DECIMAL sums,
+    dates and strings as object columns, the rows are fetched with a tuple cursor
+    and each column is converted once with the dtype declared in schema. Results
+    share the query cache with safe_read_sql; failed queries are never cached.
+    Database errors are printed and give an empty DataFrame, decoding errors raise.
+    """
+    cache_key = QUERY_CACHE.make_key(query, params, cache_family) if use_cache else None
+    if cache_key is not None:
+        cached = QUERY_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
+    with safe_db_connection(conn) as safe_conn:
+        if safe_conn is None:
+            return pd.DataFrame()
+
+        try:
+            columns, rows = _fetch_rows(safe_conn, query, params)
+        except Exception as e:
+            print(f"Error in safe_read_typed: {e}")
+            return pd.DataFrame()
+
+    # Outside the except: a schema / decoder mismatch is a bug, not "no data"
+    df = rows_to_frame(columns, rows, schema)
+
+    if cache_key is not None:
+        QUERY_CACHE.put(cache_key, df)
+        return df.copy()
+    return df
+
+
+class RunningSums:
+    """
+    Sums of measure columns per key, folded in one frame (e.g. one fetchmany chunk) at a time.
+
+    Memory grows with the number of distinct keys, such as months x slots, not with
+    the number of rows folded in.
+    """
+
+    def __init__(self, keys, measures):
+        self.keys = list(keys)
+        self.measures = list(measures)
+        self._sums = {}  # key tuple -> float array of the running measure sums
+
+    def __len__(self) -> int:
+        return len(self._sums)
+
+    def add(self, df: pd.DataFrame):
+        """Fold the rows of df (key and measure columns) into the running sums."""
+        if df.empty:
+            return
+        grouped = df.groupby(self.keys, observed=True, sort=False, dropna=False)[self.measures].sum()
+        for key, values in zip(grouped.index, grouped.to_numpy(dtype=np.float64)):
+            key = tuple(None if pd.isna(value) else value for value in (key if isinstance(key, tuple) else (key,)))
+            running = self._sums.get(key)
+            if running is None:
+                # A copy, so the sums do not keep the chunk's grouped array alive
+                self._sums[key] = values.copy()
+            else:
+                running += values
+
+    def frame(self) -> pd.DataFrame:
+        """The sums as a DataFrame of the key and measure columns, sorted by the keys."""
+        keys = list(zip(*self._sums)) if self._sums else [[] for _ in self.keys]
+        values = np.array(list(self._sums.values()), dtype=np.float64).reshape(len(self._sums), len(self.measures))
+        df = pd.DataFrame({
+            **{name: list(column) for name, column in zip(self.keys, keys)},
+            **{measure: values[:, i] for i, measure in enumerate(self.measures)}
+        })
+        return df.sort_values(self.keys, ignore_index=True, kind="stable")
+
+
+def read_chunked(query, conn, keys, params=None, schema=None, prepare=None, chunk_rows=None) -> pd.DataFrame:
+    """
+    Stream a query into per-key sums, raising on errors.
+
+    The cursor is unbuffered, so MySQL streams the result set while it is read.
+    Rows are fetched with fetchmany; each chunk is decoded (see rows_to_frame),
+    passed through prepare and folded into RunningSums before the next one is
+    read. At most chunk_rows row tuples plus one sum per key are held at once,
+    however long the history is.
+
+    Args:
+        keys: Columns to group by; every other column is summed
+        prepare: Optional function applied to each decoded chunk before it is
+            folded, e.g. to normalize slot names so aliases share a key
+        chunk_rows: Rows per fetchmany call (default: STREAMING_CONFIG)
+
+    Returns:
+        pd.DataFrame of the keys and summed columns, sorted by the keys
+    """
+    chunk_rows = chunk_rows or STREAMING_CONFIG["chunk_rows"]
+    with safe_db_connection(conn) as safe_conn:
+        if safe_conn is None:
+            raise ConnectionError("Database connection not available")
+
+        cursor = safe_conn.cursor()
+        try:
+            cursor.execute(query, params or ())
+            columns = [column[0] for column in cursor.description]
+
+            sums = RunningSums(keys, [column for column in columns if column not in keys])
+            while True:
+                rows = cursor.fetchmany(chunk_rows)
+                if not rows:
+                    break
+                chunk = rows_to_frame(columns, rows, schema)
+                sums.add(prepare(chunk) if prepare else chunk)
+
+            # Consume all results to avoid "Unread result found" error
+            while cursor.nextset():
+                pass
+        finally:
+            cursor.close()
+
+    return sums.frame() if len(sums) else rows_to_frame(columns, [], schema)
+
+
+def safe_read_chunked(query, conn, keys, params=None, schema=None, prepare=None, chunk_rows=None,
+                      cache_family=None, use_cache=True):
+    """
+    Safely stream a query into per-key sums, see read_chunked.
+
+    Returns:
+        pd.DataFrame like read_chunked. Results share the query cache with
+        safe_read_typed unless prepare is given. Database errors are printed and
+        give an empty DataFrame, decoding errors raise.
+    """
+    use_cache = use_cache and prepare is None
+    # The keys change the result, so they are part of the cache key
+    cache_key = QUERY_CACHE.make_key(query, tuple(params or ()) + tuple(keys), cache_family) if use_cache else None
+    if cache_key is not None:
+        cached = QUERY_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
+    try:
+        df = read_chunked(query, conn, keys, params, schema, prepare, chunk_rows)
+    except (mysql.connector.Error, ConnectionError) as e:
+        print(f"Error in safe_read_chunked: {e}")
+        return pd.DataFrame()
+
+    if cache_key is not None:
+        QUERY_CACHE.put(cache_key, df)
+        return df.copy()
+    return df
+
+
 def safe_execute_query(query, params=None):
     """Safely execute query with cursor and return results"""
     with safe_db_connection() as conn:
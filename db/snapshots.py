@@ -0,0 +1,490 @@
+"""
+Local Parquet snapshots of closed settlement months.
+
+Rows of past months no longer change, so they are exported once per client
+and month to Parquet files and read from local disk instead of MySQL:
+
+    <path>/settlement/client=<client>/month=YYYY-MM.parquet
+        date x plant_id x type x slot_name sums of settlement_data
+    <path>/banking/client=<client>/month=YYYY-MM.parquet
+        banking_settlement sums of the month
+    <path>/manifest.json
+        client -> dataset -> month -> {rows, file, exported_at}
+
+A month is closed once SNAPSHOT_CONFIG['grace_days'] have passed since its
+last day. Export writes every closed month of a client from its first month
+on, so the exported months of a client are contiguous, and fetchers read
+dates up to covered_until() from the snapshots and only later dates from MySQL:
+
+    python -m db.snapshots export  [client_name]    export new closed months
+    python -m db.snapshots rebuild [client_name]    re-export every closed month
+
+pyarrow is optional; without it (or with SNAPSHOT_CONFIG disabled) every
+fetcher reads MySQL as before.
+"""
+import json
+import os
+import sys
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import quote
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+from config.app_config import SNAPSHOT_CONFIG
+from db.db_setup import get_db_connection, release_db_connection
+from db.safe_db_utils import read_typed
+from visualizations.resolution import bin_start
+
+SETTLEMENT_MEASURES = [
+    "generation", "consumption", "deficit",
+    "surplus_demand", "surplus_generation", "settled"
+]
+BANKING_MEASURES = [
+    "total_matched_settled_sum", "total_intra_settlement",
+    "total_inter_settlement", "surplus_demand_sum"
+]
+
+SETTLEMENT_EXPORT_SCHEMA = {"date": "datetime64", **{measure: "float64" for measure in SETTLEMENT_MEASURES}}
+BANKING_EXPORT_SCHEMA = {"month": "datetime64", **{measure: "float64" for measure in BANKING_MEASURES}}
+
+# Closed months are exported at the finest grain any multi-day fetcher groups by
+SETTLEMENT_EXPORT_QUERY = """
+    SELECT
+        date,
+        plant_id,
+        type,
+        slot_name,
+        SUM(allocated_generation) AS generation,
+        SUM(consumption) AS consumption,
+        SUM(deficit) AS deficit,
+        SUM(surplus_demand) AS surplus_demand,
+        SUM(surplus_generation) AS surplus_generation,
+        SUM(settled) AS settled
+    FROM
+        settlement_data
+    WHERE
+        client_name = %s
+        AND date BETWEEN %s AND %s
+    GROUP BY
+        date, plant_id, type, slot_name
+    ORDER BY
+        date;
+"""
+
+BANKING_EXPORT_QUERY = """
+    SELECT
+        date AS month,
+        SUM(matched_settled_sum) AS total_matched_settled_sum,
+        SUM(intra_settlement) AS total_intra_settlement,
+        SUM(inter_settlement) AS total_inter_settlement,
+        SUM(surplus_demand_sum) AS surplus_demand_sum
+    FROM
+        banking_settlement
+    WHERE
+        client_name = %s
+        AND date BETWEEN %s AND %s
+    GROUP BY
+        date
+    ORDER BY
+        date;
+"""
+
+_manifest = None
+_manifest_mtime = None
+_manifest_lock = threading.Lock()
+
+
+def snapshots_enabled() -> bool:
+    return pq is not None and SNAPSHOT_CONFIG.get("enabled", False)
+
+
+def _root() -> str:
+    return SNAPSHOT_CONFIG["path"]
+
+
+def _manifest_path() -> str:
+    return os.path.join(_root(), "manifest.json")
+
+
+def _month_file(dataset: str, client_name: str, month: str) -> str:
+    return os.path.join(dataset, f"client={quote(client_name, safe='')}", f"month={month}.parquet")
+
+
+def _month_label(day: date) -> str:
+    return f"{day.year:04d}-{day.month:02d}"
+
+
+def _month_bounds(month: str):
+    first = date.fromisoformat(f"{month}-01")
+    last = (first.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    return first, last
+
+
+def _to_date(value) -> date:
+    return pd.Timestamp(value).date()
+
+
+def load_manifest() -> dict:
+    """The manifest, re-read only when the file changed on disk."""
+    global _manifest, _manifest_mtime
+    path = _manifest_path()
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return {"clients": {}}
+
+    with _manifest_lock:
+        if _manifest is None or mtime != _manifest_mtime:
+            with open(path, encoding="utf-8") as f:
+                _manifest = json.load(f)
+            _manifest_mtime = mtime
+        return _manifest
+
+
+def _write_manifest(manifest: dict):
+    os.makedirs(_root(), exist_ok=True)
+    tmp_path = _manifest_path() + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    # Readers see the old or the new manifest, never half of one
+    os.replace(tmp_path, _manifest_path())
+
+
+def covered_until(client_name: str, dataset: str = "settlement") -> Optional[date]:
+    """
+    Last date of a client's data that can be read from the snapshots.
+
+    Returns:
+        Last day of the newest exported month, or None when the client has no
+        snapshots (or snapshots are disabled)
+    """
+    if not snapshots_enabled() or not client_name:
+        return None
+    months = load_manifest().get("clients", {}).get(client_name, {}).get(dataset)
+    if not months:
+        return None
+    return _month_bounds(max(months))[1]
+
+
+def split_range(client_name: str, start_date, end_date, dataset: str = "settlement"):
+    """
+    Split [start_date, end_date] into the part served by snapshots and the part left to MySQL.
+
+    Returns:
+        Tuple (snapshot_end, db_start): snapshot_end is the last date to read from
+        the snapshots (None if none), db_start the first date to query (None if none)
+    """
+    start, end = _to_date(start_date), _to_date(end_date)
+    cutoff = covered_until(client_name, dataset)
+    if cutoff is None or start > cutoff:
+        return None, start
+    if end <= cutoff:
+        return end, None
+    return cutoff, cutoff + timedelta(days=1)
+
+
+def _read_months(dataset: str, client_name: str, months: Sequence[str], columns: List[str], filters=None) -> pd.DataFrame:
+    entries = load_manifest().get("clients", {}).get(client_name, {}).get(dataset, {})
+    tables = []
+    for month in months:
+        entry = entries.get(month)
+        if not entry or not entry.get("file"):
+            continue
+        # Memory-mapped so repeated reads of a month come from the page cache
+        tables.append(pq.read_table(
+            os.path.join(_root(), entry["file"]), columns=columns, filters=filters, memory_map=True
+        ))
+    if not tables:
+        return pd.DataFrame(columns=columns)
+    return pa.concat_tables(tables).to_pandas()
+
+
+def _months_between(start: date, end: date) -> List[str]:
+    return [period.strftime("%Y-%m") for period in pd.period_range(start, end, freq="M")]
+
+
+def read_settlement(
+    client_name: str,
+    start_date=None,
+    end_date=None,
+    plant_type: str = None,
+    plant_id=None,
+    columns: List[str] = None
+) -> pd.DataFrame:
+    """
+    Read the exported date x plant x slot sums of a client.
+
+    Args:
+        start_date, end_date: Date range, defaults to every exported month
+        plant_type: Only rows of this plant type
+        plant_id: Only rows of this tbl_plants id
+        columns: Measure columns to read, defaults to all of them
+
+    Returns:
+        pd.DataFrame with date (datetime64), slot_name and the measure columns as float
+    """
+    months = sorted(load_manifest().get("clients", {}).get(client_name, {}).get("settlement", {}))
+    if start_date is not None:
+        start = _to_date(start_date)
+        months = [m for m in months if m >= _month_label(start)]
+    if end_date is not None:
+        end = _to_date(end_date)
+        months = [m for m in months if m <= _month_label(end)]
+
+    filters = []
+    if start_date is not None:
+        filters.append(("date", ">=", pd.Timestamp(start_date)))
+    if end_date is not None:
+        filters.append(("date", "<=", pd.Timestamp(end_date)))
+    if plant_id is not None:
+        filters.append(("plant_id", "=", str(plant_id)))
+
+    measures = columns or SETTLEMENT_MEASURES
+    read_columns = ["date", "slot_name"] + (["type"] if plant_type else []) + measures
+    df = _read_months("settlement", client_name, months, read_columns, filters or None)
+    if plant_type:
+        # MySQL compares type case-insensitively, so match it the same way
+        df = df[df["type"].str.lower() == plant_type.lower()]
+    df = df[["date", "slot_name"] + measures]
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+
+def read_banking(client_name: str) -> pd.DataFrame:
+    """
+    Read the exported banking settlement months of a client.
+
+    Returns:
+        pd.DataFrame with month (datetime64) and the banking sums as float
+    """
+    months = sorted(load_manifest().get("clients", {}).get(client_name, {}).get("banking", {}))
+    df = _read_months("banking", client_name, months, ["month"] + BANKING_MEASURES)
+    df["month"] = pd.to_datetime(df["month"])
+    return df
+
+
+def settlement_totals(df: pd.DataFrame, keys: List[str], resolution: str = "day") -> pd.DataFrame:
+    """
+    Group snapshot rows like the dashboard queries do.
+
+    Args:
+        df: Output of read_settlement
+        keys: 'date', 'slot_name' and/or 'month' (adds year and month_num)
+        resolution: Bin of the 'date' key, see BIN_SQL
+
+    Returns:
+        pd.DataFrame with one row per key combination and the summed measures
+    """
+    measures = [column for column in df.columns if column not in ("date", "slot_name")]
+    df = df.copy()
+    if "date" in keys:
+        df["date"] = bin_start(df["date"], resolution)
+    group_keys = list(keys)
+    if "month" in keys:
+        df["year"] = df["date"].dt.year
+        df["month_num"] = df["date"].dt.month
+        group_keys = [key for key in keys if key != "month"] + ["year", "month_num"]
+    return (
+        df.groupby(group_keys, dropna=False, sort=True)[measures]
+        .sum()
+        .reset_index()
+    )
+
+
+def merge_periods(frames: List[pd.DataFrame], keys: List[str]) -> pd.DataFrame:
+    """
+    Combine the snapshot and MySQL parts of one result.
+
+    Bins that straddle the snapshot cutoff appear in both parts and are summed.
+    SUM over DECIMAL columns arrives as Decimal objects, so measures become float first.
+    """
+    frames = [frame for frame in frames if frame is not None and not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0]
+
+    parts = []
+    for frame in frames:
+        frame = frame.copy()
+        measures = [column for column in frame.columns if column not in keys]
+        frame[measures] = frame[measures].astype(float)
+        for key in ("date", "month"):
+            if key in keys:
+                frame[key] = pd.to_datetime(frame[key])
+        parts.append(frame)
+    return (
+        pd.concat(parts, ignore_index=True)
+        .groupby(keys, dropna=False, sort=True)
+        .sum()
+        .reset_index()
+    )
+
+
+def closed_months(first_date, today: date = None) -> List[str]:
+    """Months from first_date's month up to the newest month past its grace period."""
+    today = today or date.today()
+    last_closed = today - timedelta(days=SNAPSHOT_CONFIG["grace_days"])
+    # The month containing last_closed is still open unless last_closed is its last day
+    last_month_end = last_closed.replace(day=1) - timedelta(days=1)
+    if _month_bounds(_month_label(last_closed))[1] == last_closed:
+        last_month_end = last_closed
+    first = _to_date(first_date)
+    if first > last_month_end:
+        return []
+    return _months_between(first, last_month_end)
+
+
+def _write_month(dataset: str, client_name: str, month: str, df: pd.DataFrame) -> dict:
+    relative = _month_file(dataset, client_name, month)
+    path = os.path.join(_root(), relative)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path)
+    os.replace(tmp_path, path)
+    return {"file": relative, "rows": len(df), "exported_at": datetime.now().isoformat(timespec="seconds")}
+
+
+def _export_settlement_month(conn, client_name: str, month: str) -> pd.DataFrame:
+    first, last = _month_bounds(month)
+    df = read_typed(SETTLEMENT_EXPORT_QUERY, conn, (client_name, first, last), SETTLEMENT_EXPORT_SCHEMA)
+    if df.empty:
+        return pd.DataFrame({
+            "date": pd.Series(dtype="datetime64[ns]"), "plant_id": pd.Series(dtype=str),
+            "type": pd.Series(dtype=str), "slot_name": pd.Series(dtype=str),
+            **{measure: pd.Series(dtype=float) for measure in SETTLEMENT_MEASURES}
+        })
+    # plant_id is matched as text, whatever its column type
+    df["plant_id"] = df["plant_id"].map(lambda value: None if pd.isna(value) else str(value))
+    return df
+
+
+def _export_banking_month(conn, client_name: str, month: str) -> pd.DataFrame:
+    first, last = _month_bounds(month)
+    df = read_typed(BANKING_EXPORT_QUERY, conn, (client_name, first, last), BANKING_EXPORT_SCHEMA)
+    if df.empty:
+        return pd.DataFrame({
+            "month": pd.Series(dtype="datetime64[ns]"),
+            **{measure: pd.Series(dtype=float) for measure in BANKING_MEASURES}
+        })
+    return df
+
+
+EXPORTERS = {
+    "settlement": (_export_settlement_month, "SELECT MIN(date) AS first_date FROM settlement_data WHERE client_name = %s"),
+    "banking": (_export_banking_month, "SELECT MIN(date) AS first_date FROM banking_settlement WHERE client_name = %s")
+}
+
+
+def export_client(conn, client_name: str, manifest: dict, full: bool = False) -> int:
+    """
+    Export a client's closed months that are missing from the manifest.
+
+    A month enters the manifest only after its query and file write succeeded;
+    errors propagate, leaving the months exported so far recorded.
+
+    Args:
+        conn: Connection to read from
+        client_name: Name of the client
+        manifest: Manifest to record the exported months in (updated in place)
+        full: Re-export every closed month
+
+    Returns:
+        Number of month files written
+    """
+    written = 0
+    client_entry = manifest.setdefault("clients", {}).setdefault(client_name, {})
+    for dataset, (exporter, first_date_query) in EXPORTERS.items():
+        # read_typed raises on errors, so a failed query is never recorded as an empty month
+        first = read_typed(first_date_query, conn, (client_name,), {"first_date": "datetime64"})
+        if first.empty or pd.isna(first.iloc[0]["first_date"]):
+            continue
+
+        months = client_entry.setdefault(dataset, {})
+        for month in closed_months(first.iloc[0]["first_date"]):
+            if month in months and not full:
+                continue
+            df = exporter(conn, client_name, month)
+            months[month] = _write_month(dataset, client_name, month, df)
+            written += 1
+    return written
+
+
+def _run(client_name: str = None, full: bool = False) -> Dict[str, int]:
+    if pq is None:
+        print("❌ Snapshot export skipped: pyarrow is not installed")
+        return {}
+
+    conn = get_db_connection()
+    if conn is None:
+        print("❌ Snapshot export skipped: database connection not available")
+        return {}
+
+    exported = {}
+    manifest = json.loads(json.dumps(load_manifest()))
+    try:
+        if client_name:
+            clients = [client_name]
+        else:
+            clients_df = read_typed(
+                "SELECT DISTINCT client_name FROM settlement_data WHERE client_name IS NOT NULL", conn
+            )
+            clients = clients_df["client_name"].tolist() if not clients_df.empty else []
+
+        for client in clients:
+            try:
+                exported[client] = export_client(conn, client, manifest, full=full)
+            except Exception as e:
+                print(f"Error exporting snapshots for {client}: {e}")
+            # Record each client as it finishes, so an interrupted run keeps its work
+            _write_manifest(manifest)
+    except Exception as e:
+        print(f"Error in snapshot export: {e}")
+    finally:
+        release_db_connection(conn)
+
+    return exported
+
+
+def export_snapshots(client_name: str = None) -> Dict[str, int]:
+    """
+    Export closed months that have no snapshot yet.
+
+    Args:
+        client_name: Only export this client (default: every client)
+
+    Returns:
+        Dictionary of client -> number of month files written
+    """
+    return _run(client_name, full=False)
+
+
+def rebuild_snapshots(client_name: str = None) -> Dict[str, int]:
+    """
+    Re-export every closed month, e.g. after corrections to old settlement rows.
+
+    Args:
+        client_name: Only rebuild this client (default: every client)
+
+    Returns:
+        Dictionary of client -> number of month files written
+    """
+    return _run(client_name, full=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ("export", "rebuild"):
+        print("Usage: python -m db.snapshots export|rebuild [client_name]")
+        sys.exit(1)
+
+    action = export_snapshots if sys.argv[1] == "export" else rebuild_snapshots
+    result = action(sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"✅ Snapshot {sys.argv[1]} finished for {len(result)} clients, {sum(result.values())} month files")
@@ -0,0 +1,131 @@
+import inspect
+import os
+import threading
+from concurrent.futures import TimeoutError, as_completed
+from contextlib import contextmanager
+
+import streamlit as st
+from config.app_config import CHART_CONFIG, RENDER_POOL_CONFIG
+from visualizations.chart_specs import build_chart_spec
+from visualizations.figure_cache import FIGURE_CACHE, render_cached
+from visualizations.render_service import is_registered, submit_chart
+
+CHART_BACKENDS = ("matplotlib", "plotly")
+
+# Charts queued by show_chart inside chart_batch(), per script thread
+_batch = threading.local()
+
+# st.image takes use_container_width from Streamlit 1.40, use_column_width before
+_IMAGE_WIDTH = (
+    {"use_container_width": True} if "use_container_width" in inspect.signature(st.image).parameters
+    else {"use_column_width": True}
+)
+
+
+def get_chart_backend() -> str:
+    """Chart backend of this deployment: DASHBOARD_CHART_BACKEND, else CHART_CONFIG['backend']."""
+    backend = os.environ.get("DASHBOARD_CHART_BACKEND", CHART_CONFIG.get("backend", "matplotlib")).strip().lower()
+    return backend if backend in CHART_BACKENDS else "matplotlib"
+
+
+def _show_image(container, image: bytes):
+    if FIGURE_CACHE.format == "svg":
+        container.image(image.decode("utf-8"), **_IMAGE_WIDTH)
+    else:
+        container.image(image, **_IMAGE_WIDTH)
+
+
+def show_chart(plot_func, df, *args, **kwargs) -> bool:
+    """
+    Display plot_func(df, *args, **kwargs) with the configured chart backend.
+
+    With the plotly backend the matching chart spec is sent to the browser, which
+    handles zoom, pan and hover without a rerun. Otherwise the chart is rendered
+    through the figure cache, so reruns with the same data and parameters are
+    served from cached image bytes without building the matplotlib figure again.
+    Inside chart_batch() a cache miss only reserves the chart's place on the page
+    and the chart is rendered with the rest of the batch.
+
+    Returns:
+        True if a chart was displayed or queued, False if no chart was produced
+    """
+    if get_chart_backend() == "plotly":
+        spec = build_chart_spec(plot_func, df, *args, **kwargs)
+        if spec is not None:
+            st.plotly_chart(spec, use_container_width=True)
+            return True
+
+    jobs = getattr(_batch, "jobs", None)
+    if jobs is not None and is_registered(plot_func):
+        key = FIGURE_CACHE.make_key(plot_func, df, args, kwargs)
+        image = FIGURE_CACHE.get(key)
+        placeholder = st.empty()
+        if image is not None:
+            _show_image(placeholder, image)
+        else:
+            placeholder.caption("Rendering chart...")
+            jobs.append((placeholder, key, plot_func, df, args, kwargs))
+        return True
+
+    image = render_cached(plot_func, df, *args, **kwargs)
+    if image is None:
+        return False
+
+    _show_image(st, image)
+    return True
+
+
+def _render_batch(jobs: list):
+    """Render queued charts in the render pool and fill their placeholders as they finish."""
+    futures = {
+        submit_chart(plot_func, df, args, kwargs, FIGURE_CACHE.format, FIGURE_CACHE.dpi): (placeholder, key)
+        for placeholder, key, plot_func, df, args, kwargs in jobs
+    }
+    try:
+        for future in as_completed(futures, timeout=RENDER_POOL_CONFIG.get("timeout")):
+            placeholder, key = futures[future]
+            try:
+                image = future.result()
+            except Exception as e:
+                placeholder.error("❌ Chart could not be rendered.")
+                print(f"[chart_batch] Error: {e}")
+                continue
+
+            if image is None:
+                placeholder.warning("⚠️ No chart generated for the selected data.")
+                continue
+            FIGURE_CACHE.put(key, image)
+            _show_image(placeholder, image)
+    except TimeoutError:
+        for future, (placeholder, _) in futures.items():
+            if not future.done():
+                future.cancel()
+                placeholder.warning("⚠️ Chart rendering timed out.")
+
+
+@contextmanager
+def chart_batch():
+    """
+    Render the matplotlib charts shown inside the block in parallel.
+
+    Charts are queued while the page is laid out and rendered in worker processes
+    when the block exits normally; each one appears in its place as soon as it
+    is ready.
+    Does nothing unless RENDER_POOL_CONFIG['enabled'] is set and the matplotlib
+    backend is in use.
+    """
+    if not RENDER_POOL_CONFIG.get("enabled", False) or get_chart_backend() != "matplotlib" \
+            or getattr(_batch, "jobs", None) is not None:
+        yield
+        return
+
+    _batch.jobs = []
+    try:
+        yield
+    except BaseException:
+        # Rerun/stop requests and errors abandon the page, its queued charts are dropped
+        _batch.jobs = None
+        raise
+    jobs, _batch.jobs = _batch.jobs, None
+    if jobs:
+        _render_batch(jobs)
@@ -1,9 +1,12 @@
 import streamlit as st
+from backend.data.plant_directory import resolve_plant_id
 from db.fetch_tod_tab_data import fetch_combined_monthly_data
 from db.db_setup import CONN
 from visualizations.power_cost_calculations import calculate_monthly_power_costs, summarize_costs_table, calculate_monthly_costs_without_banking, summarize_costs_table_without_banking
 from visualizations.power_cost_visual import plot_costs_with_banking, plot_costs_without_banking
-def display_power_cost_analysis(selected_plant):
+from frontend.display_plots.chart_output import show_chart
+def display_power_cost_analysis(client_name, plant_name=None):
+    selected_plant = plant_name or client_name
     
     # Power cost input section with right-aligned input
     col_left, col_right = st.columns([3, 1])
@@ -51,7 +54,7 @@ def display_power_cost_analysis(selected_plant):
             return
             
         # Fetch data with error handling
-        main_df = fetch_combined_monthly_data(CONN, selected_plant)
+        main_df = fetch_combined_monthly_data(CONN, client_name, resolve_plant_id(client_name, plant_name))
         
         if main_df is None or main_df.empty:
             st.warning("No data available for the selected plant")
@@ -109,10 +112,7 @@ def display_power_cost_analysis(selected_plant):
                 )
 
             # Plot chart
-            fig = plot_costs_with_banking(df_calculated, selected_plant)
-            if fig:
-                st.pyplot(fig)
-            else:
+            if not show_chart(plot_costs_with_banking, df_calculated, selected_plant):
                 st.warning("⚠️ No chart generated for the selected data.")
             
             # Display the detailed table
@@ -169,10 +169,7 @@ def display_power_cost_analysis(selected_plant):
                 )
 
             # Plot chart
-            fig = plot_costs_without_banking(df_calculated_without_banking, selected_plant)
-            if fig:
-                st.pyplot(fig)
-            else:
+            if not show_chart(plot_costs_without_banking, df_calculated_without_banking, selected_plant):
                 st.warning("⚠️ No chart generated for the selected data.")
             
             # Display the detailed table without banking
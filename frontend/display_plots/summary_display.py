@@ -1,11 +1,14 @@
 
 import streamlit as st
-from db.db_setup import CONN
-from db.fetch_summary_data import fetch_generation_consumption_data
+from backend.data.data_bundle import get_summary_data
 from visualizations.summary_tab_visual import plot_generation_vs_consumption, create_generation_only_plot, create_consumption_plot
+from visualizations.summary_calculations import summarize_generation_consumption
+from visualizations.resolution import choose_resolution
+from frontend.display_plots.chart_output import show_chart
 
 
-def display_generation_vs_consumption(selected_plant, start_date, end_date=None):
+def display_generation_vs_consumption(client_name, start_date, end_date=None, plant_name=None):
+    selected_plant = plant_name or client_name
     # Convert dates to string format if they're date objects
     if hasattr(start_date, 'strftime'):
         start_date_str = start_date.strftime('%Y-%m-%d')
@@ -22,41 +25,31 @@ def display_generation_vs_consumption(selected_plant, start_date, end_date=None)
    
 
     try:
-        df = fetch_generation_consumption_data(CONN, selected_plant, start_date_str, end_date_str)
+        resolution = choose_resolution(start_date_str, end_date_str)
+        df = get_summary_data(client_name, start_date_str, end_date_str, resolution, plant_name)
         
         
         if df is not None and not df.empty:
 
-            fig = plot_generation_vs_consumption(
-                df=df,
+            if not show_chart(
+                plot_generation_vs_consumption,
+                df,
                 plant_display_name=selected_plant,
                 start_date=start_date_str,
-                end_date=end_date_str
-            )
-            if fig:
-                st.pyplot(fig)
-            else:
+                end_date=end_date_str,
+                resolution=resolution
+            ):
                 st.warning("⚠️ No chart generated for the selected data.")
 
                 
-            # Calculate metrics
-            total_generation_kwh = df['generation'].sum()
-            total_consumption_kwh = df['consumption'].sum()
-            total_settled_kwh = df['settled'].sum()
-            total_surplus_demand_kwh = df['surplus_demand'].sum()
-            
-            # Convert to MWh
-            total_generation_mwh = total_generation_kwh / 1000
-            total_consumption_mwh = total_consumption_kwh / 1000
-            total_settled_mwh = total_settled_kwh / 1000
-            surplus_demand_mwh = total_surplus_demand_kwh / 1000
-            
-            # Calculate generation after loss (2.8% loss)
-            loss_percentage = 2.8
-            total_generation_after_loss_mwh = total_generation_mwh * (1 - loss_percentage / 100)
-            
-            # Calculate replacement percentage (without Banking)
-            replacement_percentage = (total_settled_mwh / total_consumption_mwh * 100) if total_consumption_mwh > 0 else 0
+            # Calculate metrics (MWh)
+            metrics = summarize_generation_consumption(df)
+            total_generation_mwh = metrics['total_generation_mwh']
+            total_generation_after_loss_mwh = metrics['total_generation_after_loss_mwh']
+            total_consumption_mwh = metrics['total_consumption_mwh']
+            surplus_demand_mwh = metrics['surplus_demand_mwh']
+            replacement_percentage = metrics['replacement_percentage']
+            loss_percentage = metrics['loss_percentage']
             
             # Add CSS to style metric containers
             st.markdown("""
@@ -112,7 +105,8 @@ def display_generation_vs_consumption(selected_plant, start_date, end_date=None)
 
 
     
-def display_generation_only(selected_plant, start_date, end_date=None):
+def display_generation_only(client_name, start_date, end_date=None, plant_name=None):
+    selected_plant = plant_name or client_name
     # Convert dates to string format if they're date objects
     if hasattr(start_date, 'strftime'):
         start_date_str = start_date.strftime('%Y-%m-%d')
@@ -127,18 +121,18 @@ def display_generation_only(selected_plant, start_date, end_date=None):
         end_date_str = str(end_date)
 
     try:
-        df = fetch_generation_consumption_data(CONN, selected_plant, start_date_str, end_date_str)
+        resolution = choose_resolution(start_date_str, end_date_str)
+        df = get_summary_data(client_name, start_date_str, end_date_str, resolution, plant_name)
         
         if df is not None and not df.empty:
-            fig = create_generation_only_plot(
-                df=df,
+            if not show_chart(
+                create_generation_only_plot,
+                df,
                 plant_name=selected_plant,
                 start_date=start_date_str,
-                end_date=end_date_str
-            )
-            if fig:
-                st.pyplot(fig)
-            else:
+                end_date=end_date_str,
+                resolution=resolution
+            ):
                 st.warning("⚠️ No generation chart generated for the selected data.")
         else:
             st.warning("⚠️ No generation data available for the selected plant and date range.")
@@ -149,7 +143,8 @@ def display_generation_only(selected_plant, start_date, end_date=None):
 
 
 
-def display_consumption_only(selected_plant, start_date, end_date=None):
+def display_consumption_only(client_name, start_date, end_date=None, plant_name=None):
+    selected_plant = plant_name or client_name
     # Convert dates to string format if they're date objects
     if hasattr(start_date, 'strftime'):
         start_date_str = start_date.strftime('%Y-%m-%d')
@@ -164,18 +159,18 @@ def display_consumption_only(selected_plant, start_date, end_date=None):
         end_date_str = str(end_date)
 
     try:
-        df = fetch_generation_consumption_data(CONN, selected_plant, start_date_str, end_date_str)
+        resolution = choose_resolution(start_date_str, end_date_str)
+        df = get_summary_data(client_name, start_date_str, end_date_str, resolution, plant_name)
         
         if df is not None and not df.empty:
-            fig = create_consumption_plot(
-                df=df,
+            if not show_chart(
+                create_consumption_plot,
+                df,
                 plant_name=selected_plant,
                 start_date=start_date_str,
-                end_date=end_date_str
-            )
-            if fig:
-                st.pyplot(fig)
-            else:
+                end_date=end_date_str,
+                resolution=resolution
+            ):
                 st.warning("⚠️ No consumption chart generated for the selected data.")
         else:
             st.warning("⚠️ No consumption data available for the selected plant and date range.")
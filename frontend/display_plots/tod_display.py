@@ -1,51 +1,49 @@
 import streamlit as st
-from db.fetch_tod_tab_data import (
-    fetch_tod_binned_data, 
-    fetch_combined_monthly_data,
-    fetch_all_daily_tod_data,
-    fetch_daily_tod_data
+from backend.data.data_bundle import (
+    fetch_bundled,
+    combined_monthly_fetch,
+    all_daily_tod_fetch,
+    get_tod_daily_pivots,
+    get_tod_slot_totals
 )
 from visualizations.tod_tab_visual import (
     create_monthly_before_banking_plot, 
     create_monthly_banking_settlement_chart, 
     create_tod_binned_plot,
-    create_tod_generation_plot,
-    create_tod_consumption_plot
+    create_tod_stacked_plot
 )
-from db.db_setup import CONN
+from visualizations.resolution import choose_resolution
+from frontend.display_plots.chart_output import show_chart
 
 
-def display_monthly_tod_before_banking(selected_plant):
+def display_monthly_tod_before_banking(client_name, plant_name=None):
+    selected_plant = plant_name or client_name
     try:
-        df = fetch_all_daily_tod_data(CONN, selected_plant)
+        # The chart sums by month, so let the database do it
+        df = fetch_bundled(all_daily_tod_fetch(client_name, resolution="month", plant_name=plant_name))
         if df.empty:
             st.warning("No data available for the selected plant.")
             return
 
-        fig = create_monthly_before_banking_plot(df, selected_plant)
-        if fig:
-            st.pyplot(fig)
-        else:
+        if not show_chart(create_monthly_before_banking_plot, df, selected_plant):
             st.warning("Failed to generate plot.")
     except Exception as e:
         st.error("❌ Error displaying monthly ToD before banking.")
         print(f"[display_monthly_tod_before_banking] Error: {e}")
 
 
-def display_monthly_banking_settlement(selected_plant):
+def display_monthly_banking_settlement(client_name, plant_name=None):
+    selected_plant = plant_name or client_name
     try:
-        df = fetch_combined_monthly_data(CONN, selected_plant)
+        df = fetch_bundled(combined_monthly_fetch(client_name, plant_name))
         if df.empty:
             st.warning("No monthly banking settlement data found.")
             return
 
-        fig, summary_df = create_monthly_banking_settlement_chart(df, selected_plant)
-        if fig:
-            st.pyplot(fig)
-        else:
+        if not show_chart(create_monthly_banking_settlement_chart, df, selected_plant):
             st.warning("Failed to generate banking settlement chart.")
 
-        if not summary_df.empty:
+        if not df.empty:
             # Calculate additional metrics for banking settlement
             summary_df = df.copy()
             
@@ -145,17 +143,16 @@ def display_monthly_banking_settlement(selected_plant):
         print(f"[display_monthly_banking_settlement] Error: {e}")
 
 
-def display_tod_generation_vs_consumptiont(selected_plant, start_date, end_date=None):
+def display_tod_generation_vs_consumptiont(client_name, start_date, end_date=None, plant_name=None):
+    selected_plant = plant_name or client_name
     try:
-        df = fetch_tod_binned_data(CONN, selected_plant, start_date, end_date)
+        # Column sums of the daily ToD tables, no separate query
+        df = get_tod_slot_totals(client_name, start_date, end_date, choose_resolution(start_date, end_date), plant_name)
         if df.empty:
             st.warning("No ToD generation vs consumption data found.")
             return
 
-        fig = create_tod_binned_plot(df, selected_plant, start_date, end_date)
-        if fig:
-            st.pyplot(fig)
-        else:
+        if not show_chart(create_tod_binned_plot, df, selected_plant, start_date, end_date):
             st.warning("Plot could not be generated.")
 
     except Exception as e:
@@ -163,10 +160,13 @@ def display_tod_generation_vs_consumptiont(selected_plant, start_date, end_date=
         print(f"[display_tod_generation_vs_consumptiont] Error: {e}")
 
 
-def display_tod_generation(selected_plant, start_date, end_date=None):
+def display_tod_generation(client_name, start_date, end_date=None, plant_name=None):
+    selected_plant = plant_name or client_name
     try:
-        df = fetch_daily_tod_data(CONN, selected_plant, start_date, end_date)
-        if df.empty:
+        resolution = choose_resolution(start_date, end_date)
+        # Shared with the other ToD panel: fetched and pivoted once per run
+        pivot_df = get_tod_daily_pivots(client_name, start_date, end_date, resolution, plant_name)["generation"]
+        if pivot_df.empty:
             st.warning("No generation data found for the selected period.")
             return
 
@@ -204,10 +204,7 @@ def display_tod_generation(selected_plant, start_date, end_date=None):
         
         
 
-        fig = create_tod_generation_plot(df, selected_plant, start_date, end_date)
-        if fig:
-            st.pyplot(fig)
-        else:
+        if not show_chart(create_tod_stacked_plot, pivot_df, "generation", selected_plant, start_date, end_date, resolution=resolution):
             st.warning("Failed to generate generation plot.")
 
         # Display the summary table
@@ -218,10 +215,13 @@ def display_tod_generation(selected_plant, start_date, end_date=None):
         print(f"[display_tod_generation] Error: {e}")
 
 
-def display_tod_consumption(selected_plant, start_date, end_date=None):
+def display_tod_consumption(client_name, start_date, end_date=None, plant_name=None):
+    selected_plant = plant_name or client_name
     try:
-        df = fetch_daily_tod_data(CONN, selected_plant, start_date, end_date)
-        if df.empty:
+        resolution = choose_resolution(start_date, end_date)
+        # Shared with the other ToD panel: fetched and pivoted once per run
+        pivot_df = get_tod_daily_pivots(client_name, start_date, end_date, resolution, plant_name)["consumption"]
+        if pivot_df.empty:
             st.warning("No consumption data available.")
             return
 
@@ -259,10 +259,7 @@ def display_tod_consumption(selected_plant, start_date, end_date=None):
         
         
 
-        fig = create_tod_consumption_plot(df, selected_plant, start_date, end_date)
-        if fig:
-            st.pyplot(fig)
-        else:
+        if not show_chart(create_tod_stacked_plot, pivot_df, "consumption", selected_plant, start_date, end_date, resolution=resolution):
             st.warning("Failed to generate consumption plot.")
 
         # Display the summary table
@@ -2,18 +2,19 @@ import pandas as pd
 from db.safe_db_utils import safe_read_sql
 
 
-def fetch_all_plants(conn) -> pd.DataFrame:
+def fetch_all_plants(conn, use_cache: bool = True) -> pd.DataFrame:
     """
     Fetch all rows from the tbl_plants table.
 
     Args:
         conn: MySQL connection object.
+        use_cache (bool): Serve the rows from the query cache when fresh.
 
     Returns:
         pd.DataFrame: All plant records.
     """
     query = "SELECT * FROM tbl_plants"
-    return safe_read_sql(query, conn)
+    return safe_read_sql(query, conn, use_cache=use_cache)
 
 
 
@@ -40,18 +40,18 @@ def check_dependencies():
 
 def check_database_config():
     """Check if database configuration exists"""
-    db_setup_path = Path("db/db_setup.py")
+    config_path = Path("config/app_config.py")
     
-    if not db_setup_path.exists():
-        print("❌ Database setup file not found: db/db_setup.py")
+    if not config_path.exists():
+        print("❌ Configuration file not found: config/app_config.py")
         return False
     
     try:
-        with open(db_setup_path, 'r') as f:
+        with open(config_path, 'r', encoding='utf-8') as f:
             content = f.read()
-            if 'localhost' in content and 'test123' in content:
+            if 'test123' in content and not os.environ.get("DASHBOARD_DB_PASSWORD"):
                 print("⚠️  Using default database configuration.")
-                print("   Update db/db_setup.py with your database credentials.")
+                print("   Update DB_CONFIG in config/app_config.py or set DASHBOARD_DB_* environment variables.")
     except Exception as e:
         print(f"❌ Error reading database config: {e}")
         return False
@@ -0,0 +1,89 @@
+"""
+Shared fixtures: small frames in the shape the fetchers return.
+"""
+import os
+import sys
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Run from anywhere: the packages live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SLOTS = ["Morning Peak", "Day (Normal)", "Evening Peak", "Off-Peak"]
+
+
+def pytest_addoption(parser):
+    parser.addoption("--run-slow", action="store_true", default=False, help="also run the long memory tests")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: long-running test, only run with --run-slow")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-slow"):
+        return
+    skip_slow = pytest.mark.skip(reason="needs --run-slow")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
+
+@pytest.fixture
+def tod_frame():
+    """date x slot rows of two weeks, raw 'Off-Peak' slot names as stored in settlement_data."""
+    dates = pd.date_range("2025-01-01", periods=14, freq="D")
+    rng = np.random.default_rng(0)
+    rows = [(day, slot) for day in dates for slot in SLOTS]
+    return pd.DataFrame({
+        "date": [day for day, _ in rows],
+        "slot": [slot for _, slot in rows],
+        "generation_kwh": rng.uniform(100, 900, len(rows)),
+        "consumption_kwh": rng.uniform(100, 900, len(rows))
+    })
+
+
+@pytest.fixture
+def summary_frame():
+    """Daily Summary tab totals of one month."""
+    dates = pd.date_range("2025-01-01", periods=31, freq="D")
+    rng = np.random.default_rng(1)
+    return pd.DataFrame({
+        "date": dates,
+        "generation": rng.uniform(1000, 5000, len(dates)),
+        "consumption": rng.uniform(1000, 5000, len(dates))
+    })
+
+
+@pytest.fixture
+def single_day_frame():
+    """15-minute Summary tab rows of one day."""
+    times = pd.date_range("2025-01-01", periods=96, freq="15min")
+    rng = np.random.default_rng(2)
+    return pd.DataFrame({
+        "datetime": times,
+        "generation": rng.uniform(0, 200, len(times)),
+        "consumption": rng.uniform(0, 200, len(times))
+    })
+
+
+@pytest.fixture
+def monthly_frame():
+    """Output of fetch_combined_monthly_data for one year."""
+    months = [f"2024-{month:02d}" for month in range(1, 13)]
+    rng = np.random.default_rng(3)
+    return pd.DataFrame({
+        "month": months,
+        "total_consumption_sum": rng.uniform(50000, 90000, 12),
+        "total_generation_sum": rng.uniform(40000, 80000, 12),
+        "total_matched_settled_sum": rng.uniform(20000, 30000, 12),
+        "total_intra_settlement": rng.uniform(5000, 10000, 12),
+        "total_inter_settlement": rng.uniform(1000, 5000, 12),
+        "surplus_demand_sum": rng.uniform(1000, 5000, 12)
+    })
@@ -0,0 +1,26 @@
+import numpy as np
+
+from visualizations.annotations import cull_overlapping
+
+
+def test_cull_overlapping_keeps_labels_that_fit():
+    keep = cull_overlapping(np.array([10.0, 40.0, 70.0]), np.array([20.0, 20.0, 20.0]), gap_px=5)
+
+    assert keep.tolist() == [True, True, True]
+
+
+def test_cull_overlapping_drops_labels_too_close_to_the_last_kept_one():
+    # 0-20 kept, 15-35 overlaps, 25-45 clears 0-20 by 5 px
+    keep = cull_overlapping(np.array([10.0, 25.0, 35.0]), np.array([20.0, 20.0, 20.0]), gap_px=5)
+
+    assert keep.tolist() == [True, False, True]
+
+
+def test_cull_overlapping_works_in_screen_order():
+    keep = cull_overlapping(np.array([35.0, 10.0, 25.0]), np.array([20.0, 20.0, 20.0]), gap_px=5)
+
+    assert keep.tolist() == [True, True, False]
+
+
+def test_cull_overlapping_of_no_labels():
+    assert cull_overlapping(np.array([]), np.array([]), gap_px=5).tolist() == []
@@ -0,0 +1,145 @@
+"""
+Memory regression tests for the chart builders.
+
+Every chart is built on a pyplot-free Figure and closed after it is rendered
+(see visualizations/figures.py). A figure left registered with pyplot, or a
+cache that keeps growing, shows up as memory that grows with the number of
+renders instead of levelling off.
+
+The 1000-render tracemalloc test takes a long time (tracing slows matplotlib
+down several times) and only runs with `pytest --run-slow`; the default run
+checks that rendered figures do not pile up.
+"""
+import gc
+import os
+import tracemalloc
+
+import pytest
+from matplotlib.figure import Figure
+
+from visualizations.figure_cache import figure_to_bytes
+from visualizations.power_cost_calculations import (
+    calculate_monthly_costs_without_banking,
+    calculate_monthly_power_costs
+)
+from visualizations.power_cost_visual import plot_costs_with_banking, plot_costs_without_banking
+from visualizations.summary_tab_visual import (
+    create_consumption_plot,
+    create_generation_only_plot,
+    plot_generation_vs_consumption
+)
+from visualizations.tod_calculations import pivot_tod_measures, slot_totals
+from visualizations.tod_tab_visual import (
+    create_monthly_banking_settlement_chart,
+    create_monthly_before_banking_plot,
+    create_tod_binned_plot,
+    create_tod_stacked_plot
+)
+
+# Renders per chart in the slow test; DASHBOARD_TEST_RENDERS overrides it
+RENDERS = int(os.environ.get("DASHBOARD_TEST_RENDERS", 1000))
+# Renders per chart in the default run
+QUICK_RENDERS = 5
+# Renders before the baseline snapshot, so font and tick caches are already filled
+WARMUP = 20
+# Allowed growth between the baseline and the last render
+MAX_GROWTH_BYTES = 512 * 1024
+# Low DPI keeps the renders cheap; the figure lifecycle is the same
+DPI = 20
+
+
+def _chart_cases(tod_frame, summary_frame, single_day_frame, monthly_frame):
+    """(name, plot function, args) of every chart the dashboard draws."""
+    pivots = pivot_tod_measures(tod_frame)
+    return [
+        ("monthly_before_banking", create_monthly_before_banking_plot, (tod_frame, "Plant")),
+        ("monthly_banking_settlement", create_monthly_banking_settlement_chart, (monthly_frame, "Plant")),
+        ("tod_binned", create_tod_binned_plot, (slot_totals(pivots), "Plant", "2025-01-01", "2025-01-14")),
+        ("tod_generation", create_tod_stacked_plot,
+         (pivots["generation"], "generation", "Plant", "2025-01-01", "2025-01-14")),
+        ("tod_consumption", create_tod_stacked_plot,
+         (pivots["consumption"], "consumption", "Plant", "2025-01-01", "2025-01-14")),
+        ("generation_vs_consumption", plot_generation_vs_consumption,
+         (summary_frame, "Plant", "2025-01-01", "2025-01-31")),
+        ("generation_vs_consumption_single_day", plot_generation_vs_consumption,
+         (single_day_frame, "Plant", "2025-01-01", "2025-01-01")),
+        ("generation_only", create_generation_only_plot, (summary_frame, "Plant", "2025-01-01", "2025-01-31")),
+        ("consumption", create_consumption_plot, (summary_frame, "Plant", "2025-01-01", "2025-01-31")),
+        ("costs_with_banking", plot_costs_with_banking, (calculate_monthly_power_costs(monthly_frame), "Plant")),
+        ("costs_without_banking", plot_costs_without_banking,
+         (calculate_monthly_costs_without_banking(monthly_frame), "Plant"))
+    ]
+
+
+def _build(plot_func, args):
+    result = plot_func(*args)
+    # The banking chart returns (fig, summary frame)
+    return result[0] if isinstance(result, tuple) else result
+
+
+def _render(plot_func, args) -> bytes:
+    return figure_to_bytes(_build(plot_func, args), dpi=DPI)
+
+
+@pytest.fixture
+def chart_cases(tod_frame, summary_frame, single_day_frame, monthly_frame):
+    return {
+        name: (plot_func, args)
+        for name, plot_func, args in _chart_cases(tod_frame, summary_frame, single_day_frame, monthly_frame)
+    }
+
+
+CHART_NAMES = [
+    "monthly_before_banking", "monthly_banking_settlement", "tod_binned", "tod_generation",
+    "tod_consumption", "generation_vs_consumption", "generation_vs_consumption_single_day",
+    "generation_only", "consumption", "costs_with_banking", "costs_without_banking"
+]
+
+
+def _collect():
+    # Figures sit in reference cycles with finalizers, freeing them can take several passes
+    while gc.collect():
+        pass
+
+
+def _live_figures() -> int:
+    _collect()
+    return sum(isinstance(obj, Figure) for obj in gc.get_objects())
+
+
+@pytest.mark.parametrize("name", CHART_NAMES)
+def test_rendered_figures_are_released(chart_cases, name):
+    import matplotlib.pyplot as plt
+
+    plot_func, args = chart_cases[name]
+    before = set(plt.get_fignums())
+
+    for _ in range(QUICK_RENDERS):
+        assert _render(plot_func, args)
+
+    assert _live_figures() == 0, f"{name}: figures survive rendering"
+    assert set(plt.get_fignums()) == before
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("name", CHART_NAMES)
+def test_repeated_renders_keep_memory_bounded(chart_cases, name):
+    plot_func, args = chart_cases[name]
+
+    for _ in range(WARMUP):
+        assert _render(plot_func, args)
+
+    _collect()
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        for _ in range(RENDERS):
+            _render(plot_func, args)
+        _collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    growth = current - baseline
+    assert growth < MAX_GROWTH_BYTES, f"{name}: {growth / 1024:.0f} KiB retained after {RENDERS} renders"
+
@@ -0,0 +1,43 @@
+from types import SimpleNamespace
+
+import pytest
+
+from db import db_setup
+
+
+@pytest.fixture
+def pool_attempts(monkeypatch):
+    """Pool creation that fails until .pool is set; counts the attempts."""
+    state = SimpleNamespace(calls=0, pool=None, clock=1000.0)
+
+    def setup_db_connection_pool():
+        state.calls += 1
+        db_setup._connection_pool = state.pool
+        return state.pool
+
+    monkeypatch.setattr(db_setup, "setup_db_connection_pool", setup_db_connection_pool)
+    monkeypatch.setattr(db_setup, "time", SimpleNamespace(monotonic=lambda: state.clock))
+    monkeypatch.setattr(db_setup, "_connection_pool", None)
+    monkeypatch.setattr(db_setup, "_pool_failed_at", None)
+    monkeypatch.setitem(db_setup.DB_CONFIG, "retry_after", 30)
+    return state
+
+
+def test_failed_pool_creation_is_not_retried_during_the_cool_down(pool_attempts):
+    assert not db_setup.is_db_available()
+    pool_attempts.clock += 29
+    assert not db_setup.is_db_available()
+    assert db_setup.get_db_connection() is None
+
+    assert pool_attempts.calls == 1
+
+
+def test_pool_creation_is_retried_after_the_cool_down(pool_attempts):
+    assert not db_setup.is_db_available()
+
+    pool_attempts.pool = object()
+    pool_attempts.clock += 31
+
+    assert db_setup.is_db_available()
+    assert pool_attempts.calls == 2
+    assert db_setup._pool_failed_at is None
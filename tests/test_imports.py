@@ -0,0 +1,21 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize("module", [
+    "db.fetch_summary_data", "db.fetch_tod_tab_data", "db.migrations", "db.rollups", "db.snapshots"
+])
+def test_db_modules_do_not_load_plotting_libraries(module):
+    # A fresh interpreter: this test session has matplotlib loaded already
+    code = (
+        f"import sys, {module}; "
+        "print(sorted({name.split('.')[0] for name in sys.modules} & {'matplotlib', 'seaborn'}))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "[]"
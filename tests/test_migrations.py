@@ -0,0 +1,52 @@
+import mysql.connector
+import pytest
+
+from db import migrations
+
+
+class FakeCursor:
+    """Answers every information_schema lookup with 'missing' and fails the statements containing fail_on."""
+
+    def __init__(self, fail_on):
+        self.fail_on = fail_on
+        self.statements = []
+        self.with_rows = False
+        self.rowcount = 0
+
+    def execute(self, query, params=()):
+        if any(marker in query for marker in self.fail_on):
+            raise mysql.connector.Error(f"cannot run {query.split()[0]}")
+        self.statements.append((" ".join(query.split()), params))
+        self.with_rows = query.lstrip().upper().startswith("SELECT")
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def cursor(monkeypatch):
+    cursor = FakeCursor(fail_on=["idx_sd_client_type_date_slot"])
+    conn = type("Connection", (), {"cursor": lambda self: cursor})()
+    monkeypatch.setattr(migrations, "get_db_connection", lambda: conn)
+    monkeypatch.setattr(migrations, "release_db_connection", lambda conn: None)
+    return cursor
+
+
+def test_a_failed_migration_does_not_stop_the_later_ones(cursor, capsys):
+    applied, failed = migrations.apply_migrations()
+
+    names = [name for name, _, _ in migrations.migration_steps()]
+    assert failed == ["005_settlement_client_type_date_slot"]
+    assert applied == [name for name in names if name not in failed]
+    recorded = [params[0] for statement, params in cursor.statements if statement.startswith("INSERT INTO schema_migrations")]
+    assert recorded == applied
+    assert "005_settlement_client_type_date_slot failed" in capsys.readouterr().out
+
+
+def test_no_connection_fails_every_migration(monkeypatch):
+    monkeypatch.setattr(migrations, "get_db_connection", lambda: None)
+
+    assert migrations.apply_migrations() == ([], ["schema_migrations"])
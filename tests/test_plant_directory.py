@@ -0,0 +1,102 @@
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from backend.data import plant_directory
+from backend.data.plant_directory import PlantDirectory
+
+PLANTS = pd.DataFrame({
+    "client_name": ["Acme", "Acme", "Beta"],
+    "plant_name": ["North", "Ridge", "North"],
+    "type": ["Solar", "wind", None],
+    "plant_id": ["P1", "P2", "P3"]
+})
+
+
+@pytest.fixture
+def plants(monkeypatch):
+    """tbl_plants as fetch_all_plants returns it; replace .frame to change it, set it to None to fail."""
+    source = type("Source", (), {"frame": PLANTS, "calls": 0})()
+
+    def fetch_all_plants(conn, use_cache=True):
+        source.calls += 1
+        return pd.DataFrame() if source.frame is None else source.frame
+
+    monkeypatch.setattr(plant_directory, "fetch_all_plants", fetch_all_plants)
+    monkeypatch.setattr(PlantDirectory, "_check_plant_column", staticmethod(lambda: True))
+    return source
+
+
+def test_plants_with_the_same_name_stay_apart_per_client(plants):
+    directory = PlantDirectory(ttl=600)
+
+    assert directory.plant_id("Acme", "North") == "P1"
+    assert directory.plant_id("Beta", "North") == "P3"
+    assert directory.plant_id("Beta", "Ridge") is None
+
+
+def test_plants_are_grouped_by_client_and_type(plants):
+    directory = PlantDirectory(ttl=600)
+
+    assert directory.client_plants("Acme") == {"solar": ["North"], "wind": ["Ridge"]}
+    # Plants without a type count as solar
+    assert directory.plant_type("Beta", "North") == "solar"
+    assert directory.client_plants("Gamma") == {"solar": [], "wind": []}
+
+
+def test_failed_reload_serves_the_previous_index_until_retry(plants, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(plant_directory, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    directory = PlantDirectory(ttl=60, retry_after=30)
+    assert directory.plant_id("Acme", "North") == "P1"
+
+    plants.frame = None
+    clock[0] += 61
+    assert directory.plant_id("Acme", "North") == "P1"
+    calls = plants.calls
+
+    # Backing off: no query until retry_after has passed
+    clock[0] += 29
+    directory.clients()
+    assert plants.calls == calls
+
+    plants.frame = PLANTS.assign(plant_id=["P9", "P2", "P3"])
+    clock[0] += 2
+    assert directory.plant_id("Acme", "North") == "P9"
+
+
+def test_invalidate_reloads_on_next_lookup(plants):
+    directory = PlantDirectory(ttl=600)
+    directory.clients()
+
+    directory.invalidate()
+    directory.clients()
+
+    assert plants.calls == 2
+
+
+def test_plant_views_fall_back_to_the_client_until_its_rows_have_plant_ids(plants, monkeypatch):
+    found = {"Acme": 1, "Beta": 0}
+    queries = []
+
+    def safe_read_typed(query, conn, params=None, schema=None, use_cache=True):
+        queries.append(params)
+        return pd.DataFrame({"found": [found[params[0]]]})
+
+    monkeypatch.setattr(plant_directory, "safe_read_typed", safe_read_typed)
+    monkeypatch.setattr(plant_directory, "PLANT_DIRECTORY", PlantDirectory(ttl=600))
+
+    assert plant_directory.resolve_plant_id("Acme", "North") == "P1"
+    assert plant_directory.resolve_plant_id("Beta", "North") is None
+    assert plant_directory.resolve_plant_id("Acme", "Ridge") == "P2"
+    assert plant_directory.resolve_plant_id("Acme") is None
+    # Checked once per client
+    assert queries == [("Acme",), ("Beta",)]
+
+
+def test_plant_views_fall_back_to_the_client_without_the_plant_id_column(plants, monkeypatch):
+    monkeypatch.setattr(PlantDirectory, "_check_plant_column", staticmethod(lambda: False))
+    monkeypatch.setattr(plant_directory, "PLANT_DIRECTORY", PlantDirectory(ttl=600))
+
+    assert plant_directory.resolve_plant_id("Acme", "North") is None
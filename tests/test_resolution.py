@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from visualizations.resolution import (
+    bar_width_days,
+    bin_sql,
+    bin_start,
+    choose_resolution,
+    decimate_lines,
+    lttb_indices
+)
+
+
+@pytest.mark.parametrize("start, end, expected", [
+    ("2025-01-01", None, "day"),
+    ("2025-01-01", "2025-01-01", "day"),
+    ("2025-01-01", "2025-03-31", "day"),
+    ("2025-01-01", "2025-12-31", "week"),
+    ("2020-01-01", "2025-12-31", "month"),
+])
+def test_choose_resolution_follows_range_length(start, end, expected):
+    # 1200 px / 12 px per bar = at most 100 bars
+    assert choose_resolution(start, end, width_px=1200) == expected
+
+
+def test_choose_resolution_uses_finer_bins_on_wider_plots():
+    assert choose_resolution("2025-01-01", "2025-06-30", width_px=1200) == "week"
+    assert choose_resolution("2025-01-01", "2025-06-30", width_px=2400) == "day"
+
+
+def test_bin_sql_falls_back_to_day():
+    assert bin_sql("week") != bin_sql("day")
+    assert bin_sql("quarter") == bin_sql("day")
+
+
+def test_bin_start_matches_sql_bins():
+    dates = pd.Series(pd.to_datetime(["2025-01-01", "2025-01-05", "2025-01-06", "2025-02-28"]))
+
+    assert bin_start(dates, "day").tolist() == dates.tolist()
+    # Weeks start on Monday, as WEEKDAY() in MySQL
+    assert bin_start(dates, "week").tolist() == list(pd.to_datetime(
+        ["2024-12-30", "2024-12-30", "2025-01-06", "2025-02-24"]))
+    assert bin_start(dates, "month").tolist() == list(pd.to_datetime(
+        ["2025-01-01", "2025-01-01", "2025-01-01", "2025-02-01"]))
+
+
+def test_bin_start_day_drops_time_of_day():
+    times = pd.Series(pd.date_range("2025-01-01 06:00", periods=3, freq="12h"))
+
+    assert bin_start(times, "day").tolist() == list(pd.to_datetime(["2025-01-01", "2025-01-01", "2025-01-02"]))
+
+
+def test_bar_width_days_scales_with_bin():
+    assert bar_width_days("day") == pytest.approx(0.8)
+    assert bar_width_days("week") == pytest.approx(5.6)
+    assert bar_width_days("month", fill=0.5) == pytest.approx(15)
+
+
+def test_lttb_keeps_short_series_whole():
+    x = np.arange(10)
+    assert lttb_indices(x, x, 10).tolist() == list(range(10))
+    assert lttb_indices(x, x, 50).tolist() == list(range(10))
+    assert lttb_indices(x, x, 2).tolist() == list(range(10))
+
+
+def test_lttb_keeps_endpoints_and_threshold_points():
+    x = np.arange(1000)
+    y = np.sin(x / 50.0)
+
+    keep = lttb_indices(x, y, 100)
+
+    assert len(keep) == 100
+    assert keep[0] == 0 and keep[-1] == 999
+    assert np.all(np.diff(keep) > 0)
+
+
+def test_lttb_keeps_spikes():
+    x = np.arange(1000)
+    y = np.zeros(1000)
+    y[[137, 512, 870]] = [50, -80, 30]
+
+    keep = lttb_indices(x, y, 60)
+
+    assert {137, 512, 870} <= set(keep.tolist())
+
+
+def test_decimate_lines_leaves_short_frames_alone():
+    df = pd.DataFrame({"x": np.arange(10), "a": np.arange(10.0)})
+    assert decimate_lines(df, "x", ["a"], max_points=20) is df
+
+
+def test_decimate_lines_keeps_the_points_of_every_series():
+    dates = pd.date_range("2025-01-01", periods=2000, freq="h")
+    a = np.zeros(2000)
+    b = np.zeros(2000)
+    a[300], b[1700] = 100, -100
+    df = pd.DataFrame({"datetime": dates, "a": a, "b": b})
+
+    thinned = decimate_lines(df, "datetime", ["a", "b"], max_points=100)
+
+    assert len(thinned) <= 100
+    assert thinned["datetime"].is_monotonic_increasing
+    assert thinned["a"].max() == 100 and thinned["b"].min() == -100
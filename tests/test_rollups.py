@@ -0,0 +1,70 @@
+import datetime
+
+import pytest
+
+from config.app_config import ROLLUP_CONFIG
+from db import rollups
+from db.rollups import refresh_client_rollups
+
+LAST_DATE = datetime.date(2025, 6, 30)
+
+
+class FakeCursor:
+    """Answers the watermark and MAX queries; records every query with its params."""
+
+    def __init__(self):
+        self.queries = []
+        self.rows = []
+
+    @property
+    def with_rows(self):
+        return bool(self.rows)
+
+    def execute(self, query, params=()):
+        self.queries.append((" ".join(query.split()), params))
+        if "FROM rollup_watermarks" in query:
+            self.rows = [(100, LAST_DATE)]
+        elif "MAX(id)" in query:
+            self.rows = [(120, LAST_DATE)]
+        else:
+            self.rows = []
+
+    def fetchall(self):
+        return self.rows
+
+
+@pytest.fixture
+def cursor(monkeypatch):
+    monkeypatch.setitem(ROLLUP_CONFIG, "lookback_days", 3)
+    monkeypatch.setitem(ROLLUP_CONFIG, "drift_days", 35)
+    monkeypatch.setattr(rollups, "_refresh_dates", lambda cursor, client_name, dates: None)
+    monkeypatch.setattr(rollups, "_refresh_months", lambda cursor, client_name, months: None)
+    return FakeCursor()
+
+
+def _drift_queries(cursor):
+    return [(query, params) for query, params in cursor.queries if "row_count <> r.row_count" in query]
+
+
+def test_refresh_checks_row_counts_only_in_the_drift_window(cursor):
+    refresh_client_rollups(cursor, "Client")
+
+    [(query, params)] = _drift_queries(cursor)
+    start = LAST_DATE - datetime.timedelta(days=35)
+    assert "WHERE client_name = %s AND date >= %s" in query
+    assert "r.date >= %s" in query
+    assert params == ("Client", start, "Client", start)
+
+
+def test_reconcile_checks_row_counts_of_every_date(cursor):
+    refresh_client_rollups(cursor, "Client", reconcile=True)
+
+    [(query, params)] = _drift_queries(cursor)
+    assert "date >= %s" not in query
+    assert params == ("Client", "Client")
+
+
+def test_full_build_skips_the_row_count_check(cursor):
+    refresh_client_rollups(cursor, "Client", full=True)
+
+    assert _drift_queries(cursor) == []
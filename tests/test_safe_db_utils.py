@@ -0,0 +1,234 @@
+import datetime
+from decimal import Decimal
+
+import mysql.connector
+import numpy as np
+import pandas as pd
+import pytest
+
+from db.safe_db_utils import RunningSums, read_chunked, read_typed, rows_to_frame, safe_read_chunked, safe_read_typed
+
+COLUMNS = ["date", "slot", "generation", "readings"]
+SCHEMA = {"date": "datetime64", "slot": "category", "generation": "float64", "readings": "int64"}
+ROWS = [
+    (datetime.date(2025, 1, 1), "Morning Peak", Decimal("120.50"), 4),
+    (datetime.date(2025, 1, 2), "Off-Peak", Decimal("80.25"), 4),
+]
+
+
+class FakeCursor:
+    """Tuple cursor returning fixed rows, or raising error on execute."""
+
+    def __init__(self, columns, rows, error=None):
+        self.description = [(name,) for name in columns]
+        self.rows = list(rows)
+        self.error = error
+        self.fetch_sizes = []
+        self.closed = False
+
+    def execute(self, query, params=()):
+        if self.error:
+            raise self.error
+
+    def fetchall(self):
+        return self.fetchmany(len(self.rows))
+
+    def fetchmany(self, size):
+        chunk, self.rows = self.rows[:size], self.rows[size:]
+        self.fetch_sizes.append(len(chunk))
+        return chunk
+
+    def nextset(self):
+        return None
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def __init__(self, columns=COLUMNS, rows=ROWS, error=None):
+        self.cursors = []
+        self.columns, self.rows, self.error = columns, rows, error
+
+    def cursor(self, **kwargs):
+        cursor = FakeCursor(self.columns, self.rows, self.error)
+        self.cursors.append(cursor)
+        return cursor
+
+
+def test_rows_to_frame_decodes_declared_dtypes():
+    df = rows_to_frame(COLUMNS, ROWS, SCHEMA)
+
+    assert df["date"].dtype == "datetime64[ns]"
+    assert df["slot"].dtype == "category"
+    assert df["generation"].dtype == np.float64
+    assert df["readings"].dtype == np.int64
+    assert df["generation"].tolist() == [120.5, 80.25]
+    assert df["date"].tolist() == list(pd.to_datetime(["2025-01-01", "2025-01-02"]))
+
+
+def test_rows_to_frame_leaves_undeclared_columns_undecoded():
+    df = rows_to_frame(COLUMNS, ROWS, {"generation": "float64"})
+
+    assert df["date"].tolist() == [datetime.date(2025, 1, 1), datetime.date(2025, 1, 2)]
+    assert df["slot"].tolist() == ["Morning Peak", "Off-Peak"]
+    assert df["readings"].tolist() == [4, 4]
+
+
+def test_rows_to_frame_turns_nulls_into_nan_and_nat():
+    rows = [(None, None, None, 1), (datetime.date(2025, 1, 2), "Off-Peak", Decimal("1.5"), 2)]
+
+    df = rows_to_frame(COLUMNS, rows, SCHEMA)
+
+    assert np.isnan(df["generation"].iloc[0]) and df["generation"].iloc[1] == 1.5
+    assert pd.isna(df["date"].iloc[0])
+    assert pd.isna(df["slot"].iloc[0])
+
+
+def test_rows_to_frame_of_no_rows_keeps_columns_and_dtypes():
+    df = rows_to_frame(COLUMNS, [], SCHEMA)
+
+    assert df.empty
+    assert list(df.columns) == COLUMNS
+    assert df["generation"].dtype == np.float64
+    assert df["date"].dtype == "datetime64[ns]"
+
+
+def test_safe_read_typed_decodes_rows_and_closes_the_cursor():
+    conn = FakeConnection()
+
+    df = safe_read_typed("SELECT 1", conn, schema=SCHEMA, use_cache=False)
+
+    assert df["generation"].dtype == np.float64
+    assert len(df) == 2
+    assert all(cursor.closed for cursor in conn.cursors)
+
+
+def test_safe_read_typed_returns_empty_frame_on_database_error(capsys):
+    conn = FakeConnection(error=mysql.connector.Error("connection lost"))
+
+    df = safe_read_typed("SELECT 1", conn, schema=SCHEMA, use_cache=False)
+
+    assert df.empty
+    assert "connection lost" in capsys.readouterr().out
+    assert all(cursor.closed for cursor in conn.cursors)
+
+
+def test_safe_read_typed_raises_on_decode_error():
+    conn = FakeConnection(rows=[(datetime.date(2025, 1, 1), "Morning Peak", "n/a", 4)])
+
+    with pytest.raises(ValueError):
+        safe_read_typed("SELECT 1", conn, schema=SCHEMA, use_cache=False)
+
+
+def test_read_typed_raises_on_database_error():
+    conn = FakeConnection(error=mysql.connector.Error("connection lost"))
+
+    with pytest.raises(mysql.connector.Error):
+        read_typed("SELECT 1", conn, schema=SCHEMA)
+
+
+def _settlement_rows(days):
+    slots = ["Morning Peak", "Day (Normal)", "Evening Peak", "Off-Peak"]
+    start = datetime.date(2025, 1, 1)
+    return [
+        (start + datetime.timedelta(days=day), slots[day % len(slots)], Decimal(day), day)
+        for day in range(days)
+    ]
+
+
+def _month_slot_sums(rows):
+    df = rows_to_frame(COLUMNS, rows, SCHEMA)
+    df["date"] = df["date"].dt.to_period("M").dt.to_timestamp()
+    return df.groupby(["date", "slot"], observed=True)[["generation", "readings"]].sum().reset_index()
+
+
+def _to_month(chunk):
+    chunk["date"] = chunk["date"].dt.to_period("M").dt.to_timestamp()
+    return chunk
+
+
+def test_running_sums_fold_frames_per_key():
+    sums = RunningSums(["month"], ["value"])
+    sums.add(pd.DataFrame({"month": ["2025-02", "2025-01", "2025-02"], "value": [1.0, 2.0, 3.0]}))
+    sums.add(pd.DataFrame({"month": ["2025-01", "2025-03"], "value": [4.0, 5.0]}))
+    sums.add(pd.DataFrame({"month": [], "value": []}))
+
+    df = sums.frame()
+
+    assert df["month"].tolist() == ["2025-01", "2025-02", "2025-03"]
+    assert df["value"].tolist() == [6.0, 4.0, 5.0]
+
+
+def test_running_sums_keep_missing_keys_together():
+    sums = RunningSums(["slot"], ["value"])
+    sums.add(pd.DataFrame({"slot": [None, "Morning Peak"], "value": [1.0, 2.0]}))
+    sums.add(pd.DataFrame({"slot": [np.nan], "value": [3.0]}))
+
+    assert sorted(sums.frame()["value"].tolist()) == [2.0, 4.0]
+
+
+def test_safe_read_chunked_sums_chunks_per_key():
+    rows = _settlement_rows(75)
+    conn = FakeConnection(rows=rows)
+
+    df = safe_read_chunked("SELECT 1", conn, ["date", "slot"], schema=SCHEMA, prepare=_to_month,
+                           chunk_rows=7, use_cache=False)
+
+    assert conn.cursors[0].fetch_sizes == [7] * 10 + [5, 0]
+    assert conn.cursors[0].closed
+    expected = _month_slot_sums(rows).astype({"slot": str}).sort_values(["date", "slot"], ignore_index=True)
+    # 3 months x 4 slots, however many rows were streamed
+    pd.testing.assert_frame_equal(df, expected, check_dtype=False)
+    assert df["date"].is_monotonic_increasing
+
+
+def test_safe_read_chunked_holds_one_row_per_key(monkeypatch):
+    sums_sizes = []
+    original_add = RunningSums.add
+
+    def add(self, df):
+        original_add(self, df)
+        sums_sizes.append(len(self))
+
+    monkeypatch.setattr(RunningSums, "add", add)
+    safe_read_chunked("SELECT 1", FakeConnection(rows=_settlement_rows(365)), ["date", "slot"], schema=SCHEMA,
+                      prepare=_to_month, chunk_rows=10, use_cache=False)
+
+    # A year of daily rows never holds more than 12 months x 4 slots
+    assert len(sums_sizes) == 37
+    assert max(sums_sizes) == 12 * 4
+
+
+def test_safe_read_chunked_of_no_rows_keeps_columns_and_dtypes():
+    df = safe_read_chunked("SELECT 1", FakeConnection(rows=[]), ["date", "slot"], schema=SCHEMA, use_cache=False)
+
+    assert df.empty
+    assert list(df.columns) == COLUMNS
+    assert df["generation"].dtype == np.float64
+
+
+def test_safe_read_chunked_returns_empty_frame_on_database_error(capsys):
+    conn = FakeConnection(error=mysql.connector.Error("connection lost"))
+
+    df = safe_read_chunked("SELECT 1", conn, ["date", "slot"], schema=SCHEMA, use_cache=False)
+
+    assert df.empty
+    assert "connection lost" in capsys.readouterr().out
+    assert conn.cursors[0].closed
+
+
+def test_safe_read_chunked_raises_on_decode_error():
+    rows = _settlement_rows(4) + [(datetime.date(2025, 2, 1), "Off-Peak", "n/a", 1)]
+
+    with pytest.raises(ValueError):
+        safe_read_chunked("SELECT 1", FakeConnection(rows=rows), ["date", "slot"], schema=SCHEMA,
+                          chunk_rows=2, use_cache=False)
+
+
+def test_read_chunked_raises_on_database_error():
+    conn = FakeConnection(error=mysql.connector.Error("connection lost"))
+
+    with pytest.raises(mysql.connector.Error):
+        read_chunked("SELECT 1", conn, ["date", "slot"], schema=SCHEMA)
+    assert conn.cursors[0].closed
@@ -0,0 +1,127 @@
+import datetime
+from decimal import Decimal
+
+import mysql.connector
+import pandas as pd
+import pytest
+
+from config.app_config import SNAPSHOT_CONFIG
+from db import snapshots
+from db.snapshots import closed_months, export_client, merge_periods, settlement_totals, split_range
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, monkeypatch):
+    monkeypatch.setitem(SNAPSHOT_CONFIG, "enabled", True)
+    monkeypatch.setitem(SNAPSHOT_CONFIG, "path", str(tmp_path))
+    monkeypatch.setitem(SNAPSHOT_CONFIG, "grace_days", 5)
+    return tmp_path
+
+
+def test_closed_months_waits_for_the_grace_period():
+    assert closed_months("2025-01-15", today=datetime.date(2025, 4, 5)) == ["2025-01", "2025-02", "2025-03"]
+    assert closed_months("2025-01-15", today=datetime.date(2025, 4, 4)) == ["2025-01", "2025-02"]
+    assert closed_months("2025-03-15", today=datetime.date(2025, 4, 4)) == []
+
+
+def test_settlement_totals_groups_by_month():
+    df = pd.DataFrame({
+        "date": pd.to_datetime(["2025-01-30", "2025-01-31", "2025-02-01"]),
+        "slot_name": ["Morning Peak", "Off-Peak", "Morning Peak"],
+        "generation": [1.0, 2.0, 4.0]
+    })
+
+    totals = settlement_totals(df, ["month"])
+
+    assert totals[["year", "month_num"]].values.tolist() == [[2025, 1], [2025, 2]]
+    assert totals["generation"].tolist() == [3.0, 4.0]
+
+
+def test_settlement_totals_bins_dates_by_resolution():
+    df = pd.DataFrame({
+        "date": pd.to_datetime(["2025-01-06", "2025-01-08", "2025-01-13"]),
+        "slot_name": ["Morning Peak", "Morning Peak", "Morning Peak"],
+        "generation": [1.0, 2.0, 4.0]
+    })
+
+    totals = settlement_totals(df, ["date", "slot_name"], resolution="week")
+
+    assert totals["date"].tolist() == list(pd.to_datetime(["2025-01-06", "2025-01-13"]))
+    assert totals["generation"].tolist() == [3.0, 4.0]
+
+
+def test_merge_periods_sums_bins_that_straddle_the_cutoff():
+    snapshot_part = pd.DataFrame({"date": pd.to_datetime(["2025-01-27"]), "generation": [10.0]})
+    # MySQL returns DECIMAL sums as Decimal objects and dates as date objects
+    db_part = pd.DataFrame({
+        "date": [datetime.date(2025, 1, 27), datetime.date(2025, 2, 3)],
+        "generation": [Decimal("5.5"), Decimal("7")]
+    })
+
+    merged = merge_periods([snapshot_part, db_part], ["date"])
+
+    assert merged["date"].tolist() == list(pd.to_datetime(["2025-01-27", "2025-02-03"]))
+    assert merged["generation"].tolist() == [15.5, 7.0]
+
+
+def test_merge_periods_skips_missing_parts():
+    part = pd.DataFrame({"date": pd.to_datetime(["2025-01-01"]), "generation": [1.0]})
+
+    assert merge_periods([part, None, pd.DataFrame()], ["date"]) is part
+    assert merge_periods([None, pd.DataFrame()], ["date"]).empty
+
+
+def test_split_range_without_snapshots_reads_everything_from_mysql(snapshot_dir):
+    assert split_range("Client", "2025-01-01", "2025-03-31") == (None, datetime.date(2025, 1, 1))
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.description = None
+        self.rows = []
+
+    def execute(self, query, params=()):
+        if "MIN(date)" in query:
+            first = next((day for table, day in self.conn.first_dates.items() if table in query), None)
+            self.description, self.rows = [("first_date",)], [(first,)]
+            return
+        if params[1] in self.conn.failing_months:
+            raise mysql.connector.Error("lost connection")
+        self.description, self.rows = [("month",)], []
+
+    def fetchall(self):
+        return self.rows
+
+    def nextset(self):
+        return None
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Answers the first-date queries by table; month exports fail for failing_months."""
+
+    def __init__(self, first_dates, failing_months=()):
+        self.first_dates = first_dates
+        self.failing_months = set(failing_months)
+
+    def cursor(self, **kwargs):
+        return FakeCursor(self)
+
+
+@pytest.mark.skipif(snapshots.pq is None, reason="needs pyarrow")
+def test_export_client_does_not_record_failed_months(snapshot_dir, monkeypatch):
+    monkeypatch.setattr(snapshots, "closed_months", lambda first_date: ["2025-01", "2025-02", "2025-03"])
+    conn = FakeConnection({"banking_settlement": datetime.date(2025, 1, 1)},
+                          failing_months=[datetime.date(2025, 2, 1)])
+    manifest = {}
+
+    with pytest.raises(mysql.connector.Error):
+        export_client(conn, "Client", manifest)
+
+    # No settlement rows at all; banking stopped at the failed month
+    assert "settlement" not in manifest["clients"]["Client"]
+    assert list(manifest["clients"]["Client"]["banking"]) == ["2025-01"]
+    assert (snapshot_dir / manifest["clients"]["Client"]["banking"]["2025-01"]["file"]).exists()
@@ -0,0 +1,51 @@
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+from visualizations.tod_calculations import pivot_tod_measures, slot_totals
+from visualizations.tod_config import get_slot_order
+
+
+def test_pivot_tod_measures_builds_one_date_x_slot_table_per_measure(tod_frame):
+    pivots = pivot_tod_measures(tod_frame)
+
+    assert set(pivots) == {"generation", "consumption"}
+    for measure, column in (("generation", "generation_kwh"), ("consumption", "consumption_kwh")):
+        table = pivots[measure]
+        assert list(table.columns) == get_slot_order()
+        assert len(table) == 14
+        assert table.to_numpy().sum() == pytest.approx(tod_frame[column].sum())
+
+
+def test_pivot_tod_measures_merges_slot_aliases_and_fills_missing_slots():
+    df = pd.DataFrame({
+        "date": ["2025-01-01", "2025-01-01", "2025-01-02"],
+        "slot": ["Off-Peak", "Night Off-Peak", "Morning Peak"],
+        "generation_kwh": [Decimal("1.5"), Decimal("2"), Decimal("4")],
+        "consumption_kwh": [Decimal("1"), Decimal("1"), Decimal("1")]
+    })
+
+    generation = pivot_tod_measures(df)["generation"]
+
+    assert generation.loc["2025-01-01", "Night Off-Peak"] == 3.5
+    assert generation.loc["2025-01-01", "Morning Peak"] == 0
+    assert generation.loc["2025-01-02", "Morning Peak"] == 4
+    assert (generation.dtypes == float).all()
+
+
+def test_pivot_tod_measures_of_no_rows_gives_empty_tables():
+    pivots = pivot_tod_measures(pd.DataFrame(columns=["date", "slot", "generation_kwh", "consumption_kwh"]))
+
+    assert all(table.empty and list(table.columns) == get_slot_order() for table in pivots.values())
+    assert slot_totals(pivots).empty
+
+
+def test_slot_totals_add_up_to_the_daily_tables(tod_frame):
+    pivots = pivot_tod_measures(tod_frame)
+
+    totals = slot_totals(pivots)
+
+    assert totals["slot"].tolist() == get_slot_order()
+    assert totals["generation_kwh"].tolist() == pivots["generation"].sum(axis=0).tolist()
+    assert totals["consumption_kwh"].sum() == pytest.approx(tod_frame["consumption_kwh"].sum())
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from visualizations.tod_config import SLOT_DTYPE, get_slot_order, normalize_slot_name, normalize_slot_series
+
+
+def test_normalize_slot_name_maps_aliases_case_insensitively():
+    assert normalize_slot_name("Off-Peak") == "Night Off-Peak"
+    assert normalize_slot_name("  off-peak ") == "Night Off-Peak"
+    assert normalize_slot_name("MORNING PEAK") == "Morning Peak"
+    assert normalize_slot_name("Night Off-Peak") == "Night Off-Peak"
+
+
+def test_normalize_slot_name_keeps_unknown_names():
+    assert normalize_slot_name("Shoulder") == "Shoulder"
+
+
+def test_normalize_slot_series_returns_ordered_categorical():
+    slots = pd.Series(["Off-Peak", "Evening Peak", "morning peak", "Day (Normal)"])
+
+    normalized = normalize_slot_series(slots)
+
+    assert normalized.dtype == SLOT_DTYPE
+    assert normalized.tolist() == ["Night Off-Peak", "Evening Peak", "Morning Peak", "Day (Normal)"]
+    assert normalized.sort_values().tolist() == get_slot_order()
+
+
+def test_normalize_slot_series_sorts_unknown_slots_last():
+    normalized = normalize_slot_series(pd.Series(["Shoulder", "Off-Peak", "Morning Peak"]))
+
+    assert list(normalized.cat.categories) == get_slot_order() + ["Shoulder"]
+    assert normalized.sort_values().tolist() == ["Morning Peak", "Night Off-Peak", "Shoulder"]
+
+
+def test_normalize_slot_series_keeps_missing_values():
+    normalized = normalize_slot_series(pd.Series(["Off-Peak", None, np.nan]))
+
+    assert normalized.iloc[0] == "Night Off-Peak"
+    assert normalized.isna().tolist() == [False, True, True]
+
+
+def test_normalize_slot_series_accepts_categorical_input():
+    slots = pd.Series(pd.Categorical(["Off-Peak", "Day (Normal)", "Off-Peak"]))
+
+    normalized = normalize_slot_series(slots)
+
+    assert normalized.dtype == SLOT_DTYPE
+    assert normalized.tolist() == ["Night Off-Peak", "Day (Normal)", "Night Off-Peak"]
+
+
+def test_normalize_slot_series_returns_normalized_input_unchanged():
+    normalized = normalize_slot_series(pd.Series(["Off-Peak"]))
+
+    assert normalize_slot_series(normalized) is normalized
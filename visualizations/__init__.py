@@ -1,28 +1,30 @@
 # Visualizations Package
 
-# Import functions from tod_tab_visual
-from .tod_tab_visual import (
-    create_monthly_before_banking_plot,
-    create_monthly_banking_settlement_chart,
-    create_tod_binned_plot,
-    create_tod_generation_plot,
-    create_tod_consumption_plot
-)
+# Chart functions are imported on first access, so the db layer can import the
+# plain helpers (visualizations.tod_config, visualizations.resolution) without
+# loading matplotlib and seaborn
+import importlib
 
-# Import functions from summary_tab_visual
-from .summary_tab_visual import (
-    plot_generation_vs_consumption,
-    create_generation_only_plot,
-    create_consumption_plot
-)
+# Exported name -> module defining it
+_EXPORTS = {
+    # tod_tab_visual
+    'create_monthly_before_banking_plot': 'tod_tab_visual',
+    'create_monthly_banking_settlement_chart': 'tod_tab_visual',
+    'create_tod_binned_plot': 'tod_tab_visual',
+    'create_tod_stacked_plot': 'tod_tab_visual',
+    # summary_tab_visual
+    'plot_generation_vs_consumption': 'summary_tab_visual',
+    'create_generation_only_plot': 'summary_tab_visual',
+    'create_consumption_plot': 'summary_tab_visual'
+}
 
-__all__ = [
-    'create_monthly_before_banking_plot',
-    'create_monthly_banking_settlement_chart', 
-    'create_tod_binned_plot',
-    'create_tod_generation_plot',
-    'create_tod_consumption_plot',
-    'plot_generation_vs_consumption',
-    'create_generation_only_plot',
-    'create_consumption_plot'
-]
\ No newline at end of file
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
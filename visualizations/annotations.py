@@ -0,0 +1,165 @@
+"""
+Value labels for bar and line charts.
+
+Labels that would not fit are culled before any Text artist is created. That
+covers bars too small to hold their label and labels that would overlap their
+left neighbour. The remaining bar labels are drawn with a single ax.bar_label
+call. Sizes are estimated from the font size and the axes' pixel geometry at
+call time, so call these after the data is plotted and before tight_layout.
+"""
+import numpy as np
+from matplotlib.container import BarContainer
+
+from config.app_config import ANNOTATION_CONFIG
+
+# Rough glyph metrics as fractions of the font size, good enough for digits and separators
+CHAR_WIDTH = 0.6
+LINE_HEIGHT = 1.2
+
+
+def text_footprint_px(labels: list, fontsize: float, dpi: float, rotation: float = 0) -> tuple:
+    """
+    Estimate the pixel size of each label.
+
+    Returns:
+        (width, height) arrays of the labels' horizontal and vertical extent
+    """
+    points_to_px = dpi / 72.0
+    length = np.array([len(label) for label in labels], dtype=float) * CHAR_WIDTH * fontsize * points_to_px
+    line = np.full(len(labels), LINE_HEIGHT * fontsize * points_to_px)
+    if rotation % 180 == 90:
+        return line, length
+    return length, line
+
+
+def cull_overlapping(centers_px: np.ndarray, widths_px: np.ndarray, gap_px: float) -> np.ndarray:
+    """
+    Greedy left-to-right pass: keep a label only if it clears the last kept one.
+
+    Args:
+        centers_px: Horizontal label centers in pixels
+        widths_px: Horizontal label extents in pixels
+        gap_px: Minimum free space between two labels
+
+    Returns:
+        Boolean mask of the labels to keep
+    """
+    keep = np.zeros(len(centers_px), dtype=bool)
+    last_right = -np.inf
+    for i in np.argsort(centers_px, kind="stable"):
+        left = centers_px[i] - widths_px[i] / 2
+        if left >= last_right + gap_px:
+            keep[i] = True
+            last_right = centers_px[i] + widths_px[i] / 2
+    return keep
+
+
+def _format_labels(values: np.ndarray, fmt: str) -> list:
+    return [fmt.format(value) for value in values]
+
+
+def label_bars(
+    ax,
+    container: BarContainer,
+    values=None,
+    fmt: str = "{:,.0f}",
+    label_type: str = "edge",
+    rotation: float = 0,
+    fontsize: float = 9,
+    **text_kw
+) -> list:
+    """
+    Label the bars of a container, skipping labels that would not be readable.
+
+    Center labels must fit inside their bar. Edge labels are dropped for bars
+    shorter than ANNOTATION_CONFIG['min_bar_px'], and the y axis gets some
+    headroom for them. In both cases a label is dropped when it would overlap
+    the previous label.
+
+    Args:
+        ax: Axes holding the bars
+        container: BarContainer returned by ax.bar; for stacked bars, pass the top layer
+        values: Values to print, defaults to the bar heights (pass stack totals for stacked bars)
+        fmt: str.format pattern of a label
+        label_type: 'edge' (on top of the bar) or 'center' (inside the bar)
+        rotation: Text rotation in degrees
+        fontsize: Font size in points
+        **text_kw: Passed to ax.bar_label (color, fontweight, padding, ...)
+
+    Returns:
+        The Text artists created
+    """
+    patches = list(container.patches)
+    if not patches:
+        return []
+    values = np.asarray(container.datavalues if values is None else values, dtype=float)
+
+    if label_type == "edge":
+        ax.margins(y=ANNOTATION_CONFIG["edge_headroom"])
+
+    # Bar geometry in pixels; reading the limits applies any pending autoscale first
+    ax.get_xlim(), ax.get_ylim()
+    centers = np.array([patch.get_x() + patch.get_width() / 2 for patch in patches])
+    bases = np.array([patch.get_y() for patch in patches]) if label_type == "center" else np.zeros(len(patches))
+    heights = np.array([patch.get_height() for patch in patches]) if label_type == "center" else values
+    bottom_px = ax.transData.transform(np.column_stack([centers, bases]))
+    top_px = ax.transData.transform(np.column_stack([centers, bases + np.nan_to_num(heights)]))
+    heights_px = np.abs(top_px[:, 1] - bottom_px[:, 1])
+
+    labels = _format_labels(values, fmt)
+    widths_px, label_heights_px = text_footprint_px(labels, fontsize, ax.figure.dpi, rotation)
+
+    readable = np.isfinite(values) & (values != 0)
+    if label_type == "center":
+        readable &= heights_px >= label_heights_px
+    else:
+        readable &= heights_px >= ANNOTATION_CONFIG["min_bar_px"]
+
+    keep = np.zeros(len(patches), dtype=bool)
+    keep[readable] = cull_overlapping(bottom_px[readable, 0], widths_px[readable], ANNOTATION_CONFIG["gap_px"])
+    indices = np.flatnonzero(keep)
+    if len(indices) == 0:
+        return []
+
+    # One bar_label call over just the kept bars
+    kept = BarContainer([patches[i] for i in indices], datavalues=values[indices], orientation="vertical")
+    return ax.bar_label(
+        kept,
+        labels=[labels[i] for i in indices],
+        label_type=label_type,
+        rotation=rotation,
+        fontsize=fontsize,
+        **text_kw
+    )
+
+
+def label_points(ax, x, y, labels: list, fontsize: float = 9, **text_kw) -> list:
+    """
+    Place labels centred at (x, y) data points, skipping the ones that would overlap.
+
+    Args:
+        ax: Axes to draw on
+        x, y: Label anchor positions in data units
+        labels: Label text per point, None or '' for no label
+        fontsize: Font size in points
+        **text_kw: Passed to ax.text
+
+    Returns:
+        The Text artists created
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    wanted = np.array([bool(label) for label in labels]) & np.isfinite(y)
+    if not wanted.any():
+        return []
+
+    ax.get_xlim(), ax.get_ylim()
+    centers_px = ax.transData.transform(np.column_stack([x, np.nan_to_num(y)]))[:, 0]
+    widths_px, _ = text_footprint_px([label or "" for label in labels], fontsize, ax.figure.dpi)
+
+    keep = np.zeros(len(x), dtype=bool)
+    keep[wanted] = cull_overlapping(centers_px[wanted], widths_px[wanted], ANNOTATION_CONFIG["gap_px"])
+    return [
+        ax.text(x[i], y[i], labels[i], ha='center', fontsize=fontsize, **text_kw)
+        for i in np.flatnonzero(keep)
+    ]
@@ -0,0 +1,321 @@
+"""
+Browser-rendered chart specs.
+
+Each builder takes the same arguments as its matplotlib counterpart and returns
+a plain Plotly figure dict (data + layout) made of JSON types only, so the
+browser draws, pans, zooms and hovers the chart without a Python rerun.
+CHART_SPECS maps each matplotlib plot function to its spec builder.
+"""
+import numpy as np
+import pandas as pd
+
+from visualizations.tod_config import get_slot_order, get_slot_color_map, normalize_slot_series, add_slot_labels_with_time
+from visualizations.summary_calculations import add_derived_metrics
+from visualizations.resolution import BIN_LABELS, PERIOD_TITLES, decimate_lines
+from visualizations import tod_tab_visual, summary_tab_visual, power_cost_visual
+
+# Values are sent with two decimals, enough for kWh and ₹
+VALUE_DECIMALS = 2
+
+
+def _values(series: pd.Series) -> list:
+    return np.round(series.astype(float).to_numpy(), VALUE_DECIMALS).tolist()
+
+
+def _dates(series: pd.Series, fmt: str = '%Y-%m-%d') -> list:
+    return pd.to_datetime(series).dt.strftime(fmt).tolist()
+
+
+def _date_range_label(start_date, end_date) -> str:
+    return f"{start_date} to {end_date}" if end_date and start_date != end_date else f"{start_date}"
+
+
+def _layout(title: str, xaxis_title: str, yaxis_title: str, **extra) -> dict:
+    layout = {
+        'title': {'text': title},
+        'xaxis': {'title': {'text': xaxis_title}},
+        'yaxis': {'title': {'text': yaxis_title}, 'tickformat': '~s'},
+        'hovermode': 'x unified',
+        'legend': {'orientation': 'v'},
+        'margin': {'t': 80}
+    }
+    layout.update(extra)
+    return layout
+
+
+def _line(x: list, y: list, name: str, color: str, dash: str = 'solid', **extra) -> dict:
+    trace = {
+        'type': 'scatter',
+        'mode': 'lines+markers',
+        'name': name,
+        'x': x,
+        'y': y,
+        'line': {'color': color, 'width': 2.5, 'dash': dash}
+    }
+    trace.update(extra)
+    return trace
+
+
+def _empty_spec(message: str) -> dict:
+    return {
+        'data': [],
+        'layout': {
+            'xaxis': {'visible': False},
+            'yaxis': {'visible': False},
+            'annotations': [{'text': message, 'showarrow': False, 'font': {'size': 14, 'color': 'red'}}]
+        }
+    }
+
+
+##ToD
+def tod_stacked_spec(pivot_df: pd.DataFrame, measure: str, plant_name: str, start_date: str, end_date: str = None, resolution: str = "day"):
+    """Stacked date x slot bars of one measure, Night Off-Peak at the bottom and Morning Peak on top."""
+    if pivot_df.empty:
+        return None
+
+    slot_order = get_slot_order()
+    slot_colors = get_slot_color_map()
+    label = measure.title()
+    dates = _dates(pivot_df.index.to_series())
+    data = [
+        {
+            'type': 'bar',
+            'name': slot,
+            'x': dates,
+            'y': _values(pivot_df[slot]),
+            'marker': {'color': slot_colors.get(slot, '#4CAF50')}
+        }
+        for slot in reversed(slot_order)
+    ]
+    title = f"{PERIOD_TITLES.get(resolution, 'Daily')} ToD-wise {label}<br>{plant_name} ({_date_range_label(start_date, end_date)})"
+    return {
+        'data': data,
+        'layout': _layout(title, BIN_LABELS.get(resolution, "Date"), f"{label} (kWh)", barmode='stack', legend={'title': {'text': "ToD Slot"}, 'traceorder': 'reversed'})
+    }
+
+
+def tod_binned_spec(df: pd.DataFrame, plant_name: str, start_date: str, end_date: str = None):
+    if df.empty:
+        raise ValueError("No data to plot")
+
+    df = df.copy()
+    df['slot'] = normalize_slot_series(df['slot'])
+    totals = df.groupby('slot', observed=False)[['generation_kwh', 'consumption_kwh']].sum().reindex(get_slot_order(), fill_value=0)
+    slot_labels = add_slot_labels_with_time()
+    x = [slot_labels.get(slot, slot) for slot in totals.index]
+
+    data = [
+        {'type': 'bar', 'name': name, 'x': x, 'y': _values(totals[column]),
+         'marker': {'color': color, 'line': {'color': 'black', 'width': 0.5}},
+         'texttemplate': '%{y:.0f}', 'textposition': 'outside'}
+        for column, name, color in (
+            ('generation_kwh', 'generation_kwh', '#4CAF50'),
+            ('consumption_kwh', 'consumption_kwh', '#FFC107')
+        )
+    ]
+    title = f"ToD Binned Generation vs Consumption<br>{plant_name} ({_date_range_label(start_date, end_date)})"
+    return {
+        'data': data,
+        'layout': _layout(title, "ToD Slot", "Energy (kWh)", barmode='group', legend={'title': {'text': "Type"}})
+    }
+
+
+def monthly_before_banking_spec(df: pd.DataFrame, plant_name: str):
+    if df.empty:
+        return _empty_spec("No data available")
+
+    df = df.copy()
+    df['month'] = pd.to_datetime(df['date']).dt.to_period('M').astype(str)
+    df['slot'] = normalize_slot_series(df['slot'])
+
+    slot_order = list(reversed(get_slot_order()))
+    slot_colors = get_slot_color_map()
+    data = []
+    for column, group, pattern in (('generation_kwh', 'Gen', ''), ('consumption_kwh', 'Cons', '/')):
+        pivot = df.pivot_table(
+            index='month', columns='slot', values=column, aggfunc='sum', fill_value=0, observed=False
+        ).reindex(columns=slot_order, fill_value=0).astype(float)
+        months = pivot.index.tolist()
+        base = np.zeros(len(pivot))
+        # Stacked bars per group: one offsetgroup per measure, each slot starts where the last ended
+        for slot in slot_order:
+            values = pivot[slot].to_numpy()
+            data.append({
+                'type': 'bar',
+                'name': f"{group} {slot}",
+                'x': months,
+                'y': np.round(values, VALUE_DECIMALS).tolist(),
+                'base': np.round(base, VALUE_DECIMALS).tolist(),
+                'offsetgroup': group,
+                'legendgroup': group,
+                'marker': {'color': slot_colors.get(slot, '#aaa'), 'pattern': {'shape': pattern}}
+            })
+            base = base + values
+
+    return {
+        'data': data,
+        'layout': _layout(f"{plant_name} - Monthly Before Banking Settlement (ToD-wise)", "Month", "Energy (kWh)", barmode='group')
+    }
+
+
+def monthly_banking_settlement_spec(df: pd.DataFrame, plant_name: str):
+    df = df.rename(columns={
+        'total_matched_settled_sum': 'settlement_without_banking',
+        'total_intra_settlement': 'intra_settlement',
+        'total_inter_settlement': 'inter_settlement',
+        'total_consumption_sum': 'consumption'
+    })
+    df['month'] = pd.to_datetime(df['month'] + '-01')
+    df = df.sort_values('month')
+    df['settlement_with_banking'] = df['intra_settlement'] + df['inter_settlement']
+    df['total_settlement'] = df['settlement_with_banking'] + df['settlement_without_banking']
+    months = _dates(df['month'], '%b %Y')
+
+    total_with_banking = float(df['settlement_with_banking'].sum())
+    total_without_banking = float(df['settlement_without_banking'].sum())
+    unsettled = float(df['consumption'].sum()) - (total_with_banking + total_without_banking)
+
+    data = [
+        _line(months, _values(df['total_settlement']), 'Total Settlement', '#2E7D32'),
+        _line(months, _values(df['settlement_with_banking']), 'With Banking', 'orange', 'dash'),
+        _line(months, _values(df['settlement_without_banking']), 'Without Banking', 'green', 'dot'),
+        {
+            'type': 'pie',
+            'labels': ['With Banking', 'Without Banking', 'Unsettled'],
+            'values': [round(v, VALUE_DECIMALS) for v in (total_with_banking, total_without_banking, unsettled)],
+            'marker': {'colors': ['orange', 'green', 'gray']},
+            'textinfo': 'label+percent',
+            'domain': {'x': [0.62, 1.0], 'y': [0.0, 1.0]},
+            'showlegend': False,
+            'title': {'text': "Total Banking Breakdown"}
+        }
+    ]
+    layout = _layout(f"Monthly Banking Settlement<br>{plant_name}", "Month", "Energy (kWh)")
+    layout['xaxis']['domain'] = [0.0, 0.55]
+    return {'data': data, 'layout': layout}
+
+
+##Summary
+def generation_vs_consumption_spec(df: pd.DataFrame, plant_display_name: str, start_date: str, end_date: str, resolution: str = "day"):
+    if df.empty:
+        return None
+
+    is_single_day = start_date == end_date
+    df = add_derived_metrics(df)
+    x_column = 'datetime' if is_single_day else 'date'
+    date_format = '%Y-%m-%d %H:%M' if is_single_day else '%Y-%m-%d'
+    x = _dates(df[x_column], date_format)
+
+    lines = decimate_lines(df, x_column, ['generation', 'consumption'])
+    line_x = _dates(lines[x_column], date_format)
+    data = [
+        _line(line_x, _values(lines['generation']), 'Generation', 'green'),
+        _line(line_x, _values(lines['consumption']), 'Consumption', 'red', 'dash', fill='tonexty', fillcolor='rgba(128,128,128,0.2)')
+    ]
+    label = start_date if is_single_day else f"{start_date} to {end_date}"
+    layout = _layout(
+        f"Generation vs Consumption for {plant_display_name} ({label})",
+        "Time of Day" if is_single_day else BIN_LABELS.get(resolution, "Date"),
+        "Energy (kWh)"
+    )
+
+    if not is_single_day:
+        # Net surplus bars under the main chart, coloured by surplus type
+        data.append({
+            'type': 'bar',
+            'name': 'Net Surplus',
+            'x': x,
+            'y': _values(df['net_surplus'].abs()),
+            'marker': {'color': df['surplus_color'].tolist()},
+            'xaxis': 'x2',
+            'yaxis': 'y2',
+            'showlegend': False
+        })
+        layout['yaxis']['domain'] = [0.35, 1.0]
+        layout['xaxis']['anchor'] = 'y'
+        layout['xaxis2'] = {'matches': 'x', 'anchor': 'y2', 'title': {'text': BIN_LABELS.get(resolution, "Date")}}
+        layout['yaxis2'] = {'domain': [0.0, 0.25], 'title': {'text': "Surplus Energy (kWh)"}, 'tickformat': '~s'}
+
+    return {'data': data, 'layout': layout}
+
+
+def _daily_total_spec(df: pd.DataFrame, column: str, color: str, title: str, yaxis_title: str, is_single_day: bool, resolution: str) -> dict:
+    if is_single_day:
+        df = df.groupby('datetime', as_index=False)[column].sum()
+        data = [_line(_dates(df['datetime'], '%Y-%m-%d %H:%M'), _values(df[column]), yaxis_title, color)]
+        return {'data': data, 'layout': _layout(title, "Time of Day", yaxis_title)}
+
+    df = df.groupby('date', as_index=False)[column].sum()
+    data = [{
+        'type': 'bar', 'name': yaxis_title, 'x': _dates(df['date']), 'y': _values(df[column]),
+        'marker': {'color': color}, 'texttemplate': '%{y:,.0f}', 'textposition': 'inside', 'textangle': -90
+    }]
+    return {'data': data, 'layout': _layout(title, BIN_LABELS.get(resolution, "Date"), yaxis_title)}
+
+
+def generation_only_spec(df: pd.DataFrame, plant_name: str, start_date: str, end_date: str = None, resolution: str = "day"):
+    if df.empty or 'generation' not in df.columns:
+        return _empty_spec("No data available")
+    is_single_day = end_date is None or start_date == end_date
+    title = f"Generation - {plant_name}<br>{_date_range_label(start_date, None if is_single_day else end_date)}"
+    return _daily_total_spec(df, 'generation', 'green', title, "Generation (kWh)", is_single_day, resolution)
+
+
+def consumption_only_spec(df: pd.DataFrame, plant_name: str, start_date: str, end_date: str = None, resolution: str = "day"):
+    if df.empty or 'consumption' not in df.columns:
+        return _empty_spec("No consumption data available")
+    is_single_day = end_date is None or start_date == end_date
+    title = f"{'Consumption' if is_single_day else PERIOD_TITLES.get(resolution, 'Daily') + ' Consumption'} - {plant_name}<br>{start_date}"
+    return _daily_total_spec(df, 'consumption', 'red', title, "Consumption (kWh)", is_single_day, resolution)
+
+
+##Power Cost
+def _cost_spec(df: pd.DataFrame, plant_name: str, title: str, actual_color: str, savings_color: str) -> dict:
+    df = df.copy()
+    df['month'] = pd.to_datetime(df['Date'] + '-01')
+    df = df.sort_values('month')
+    months = _dates(df['month'], '%b %Y')
+
+    data = [
+        _line(months, _values(df['Grid Cost (₹)']), 'Grid Cost', '#1E88E5'),
+        _line(months, _values(df['Actual Cost (₹)']), 'Actual Cost', actual_color, 'dash'),
+        _line(months, _values(df['Savings (₹)']), 'Savings', savings_color, 'dot')
+    ]
+    layout = _layout(f"{title}<br>{plant_name}", "Month", "Cost (₹)")
+    layout['yaxis']['tickprefix'] = '₹'
+    return {'data': data, 'layout': layout}
+
+
+def costs_with_banking_spec(df: pd.DataFrame, plant_name: str):
+    return _cost_spec(df, plant_name, "Monthly Cost with Banking", '#43A047', '#E53935')
+
+
+def costs_without_banking_spec(df: pd.DataFrame, plant_name: str):
+    return _cost_spec(df, plant_name, "Monthly Cost without Banking", '#E53935', '#43A047')
+
+
+# matplotlib plot function -> spec builder taking the same arguments
+CHART_SPECS = {
+    tod_tab_visual.create_tod_stacked_plot: tod_stacked_spec,
+    tod_tab_visual.create_tod_binned_plot: tod_binned_spec,
+    tod_tab_visual.create_monthly_before_banking_plot: monthly_before_banking_spec,
+    tod_tab_visual.create_monthly_banking_settlement_chart: monthly_banking_settlement_spec,
+    summary_tab_visual.plot_generation_vs_consumption: generation_vs_consumption_spec,
+    summary_tab_visual.create_generation_only_plot: generation_only_spec,
+    summary_tab_visual.create_consumption_plot: consumption_only_spec,
+    power_cost_visual.plot_costs_with_banking: costs_with_banking_spec,
+    power_cost_visual.plot_costs_without_banking: costs_without_banking_spec
+}
+
+
+def build_chart_spec(plot_func, df: pd.DataFrame, *args, **kwargs):
+    """
+    Build the browser chart spec matching plot_func(df, *args, **kwargs).
+
+    Returns:
+        Plotly figure dict, or None if plot_func has no spec builder or no chart
+    """
+    spec_func = CHART_SPECS.get(plot_func)
+    if spec_func is None:
+        return None
+    return spec_func(df, *args, **kwargs)
@@ -0,0 +1,145 @@
+"""
+Process-wide cache of rendered chart images.
+
+A chart is identified by its plot function, a fingerprint of the input
+DataFrame and the remaining plot arguments. On a hit the stored PNG/SVG bytes
+are served and matplotlib is not touched at all; entries are evicted in
+least-recently-used order once the byte budget is exceeded.
+"""
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from config.app_config import FIGURE_CACHE_CONFIG
+from visualizations.figures import close_figure
+
+
+def fingerprint_frame(df: pd.DataFrame) -> str:
+    """Hash the values, index, column names and dtypes of a DataFrame."""
+    digest = hashlib.sha1()
+    digest.update(repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode())
+    if not df.empty:
+        digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def figure_to_bytes(fig, fmt: str = "png", dpi: int = 100) -> bytes:
+    """Render a matplotlib figure to image bytes and close it."""
+    buffer = io.BytesIO()
+    try:
+        fig.savefig(buffer, format=fmt, dpi=dpi, bbox_inches="tight")
+    finally:
+        close_figure(fig)
+    return buffer.getvalue()
+
+
+class FigureCache:
+    """Thread-safe LRU cache of rendered chart images, bounded by total bytes."""
+
+    def __init__(self, max_bytes: int, fmt: str = "png", dpi: int = 100, enabled: bool = True):
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self.format = fmt
+        self.dpi = dpi
+
+        self._entries = OrderedDict()  # key -> image bytes
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @classmethod
+    def from_config(cls, config: dict) -> "FigureCache":
+        return cls(
+            max_bytes=config.get("max_bytes", 64 * 1024 * 1024),
+            fmt=config.get("format", "png"),
+            dpi=config.get("dpi", 100),
+            enabled=config.get("enabled", True),
+        )
+
+    def make_key(self, plot_func, df: pd.DataFrame, args: tuple, kwargs: dict) -> tuple:
+        """
+        Build the cache key for one chart.
+
+        Returns:
+            (function name, frame fingerprint, argument repr, format, dpi)
+        """
+        name = f"{plot_func.__module__}.{plot_func.__qualname__}"
+        params = repr((args, sorted(kwargs.items())))
+        return (name, fingerprint_frame(df), params, self.format, self.dpi)
+
+    def get(self, key: tuple):
+        if not self.enabled:
+            return None
+        with self._lock:
+            image = self._entries.get(key)
+            if image is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return image
+
+    def put(self, key: tuple, image: bytes):
+        if not self.enabled or len(image) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= len(self._entries.pop(key))
+            self._entries[key] = image
+            self._total_bytes += len(image)
+
+            while self._total_bytes > self.max_bytes:
+                _, oldest = self._entries.popitem(last=False)
+                self._total_bytes -= len(oldest)
+                self._stats["evictions"] += 1
+
+    def render(self, plot_func, df: pd.DataFrame, *args, **kwargs):
+        """
+        Return the image bytes of plot_func(df, *args, **kwargs), rendering only on a miss.
+
+        Plot functions returning (fig, extra) tuples are supported; only the figure is kept.
+
+        Returns:
+            Image bytes, or None if the plot function produced no figure
+        """
+        # Fingerprint before plotting, some plot functions add columns to df
+        key = self.make_key(plot_func, df, args, kwargs)
+        image = self.get(key)
+        if image is not None:
+            return image
+
+        fig = plot_func(df, *args, **kwargs)
+        if isinstance(fig, tuple):
+            fig = fig[0]
+        if fig is None:
+            return None
+
+        image = figure_to_bytes(fig, self.format, self.dpi)
+        self.put(key, image)
+        return image
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), bytes=self._total_bytes)
+
+
+# Shared cache for the whole Streamlit server process
+FIGURE_CACHE = FigureCache.from_config(FIGURE_CACHE_CONFIG)
+
+
+def render_cached(plot_func, df: pd.DataFrame, *args, **kwargs):
+    """Render a chart through the shared figure cache, see FigureCache.render."""
+    return FIGURE_CACHE.render(plot_func, df, *args, **kwargs)
+
+
+def get_figure_cache_stats() -> dict:
+    """Get hit/miss/eviction counters and current size of the figure cache."""
+    return FIGURE_CACHE.stats()
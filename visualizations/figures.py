@@ -0,0 +1,33 @@
+"""
+Figure lifecycle helpers for the chart modules.
+
+Charts are built on plain matplotlib Figure objects instead of pyplot, so they
+are never registered with pyplot's global figure manager and are freed as soon
+as the caller drops them. Whoever renders a figure to an image closes it.
+"""
+from matplotlib.figure import Figure
+
+
+def new_figure(figsize=(12, 6), nrows: int = 1, ncols: int = 1, **subplot_kw):
+    """
+    Create a figure outside pyplot's global state, like plt.subplots.
+
+    Args:
+        figsize: Figure size in inches
+        nrows, ncols: Subplot grid
+        **subplot_kw: Passed to Figure.subplots (e.g. gridspec_kw)
+
+    Returns:
+        (fig, axes) where axes is a single Axes or an array of Axes
+    """
+    fig = Figure(figsize=figsize)
+    axes = fig.subplots(nrows, ncols, **subplot_kw)
+    return fig, axes
+
+
+def close_figure(fig):
+    """Release a rendered figure; figures opened through pyplot are also closed there."""
+    if fig.canvas.manager is not None:
+        import matplotlib.pyplot as plt
+        plt.close(fig)
+    fig.clear()
@@ -1,76 +1,32 @@
 import pandas as pd
-from db.safe_db_utils import safe_read_sql
+from db.fetch_tod_tab_data import read_monthly_consumption, read_banking_settlement
 
 def fetch_combined_monthly_data(
     conn,
-    client_name: str = None
+    client_name: str = None,
+    plant_id=None
 ) -> pd.DataFrame:
     """
     Fetch monthly aggregated data for both consumption and banking settlement.
 
+    Uses the same monthly queries as the ToD tab (see build_monthly_consumption_query
+    and build_banking_settlement_query), so both tabs share query cache entries.
+
     Args:
         conn: MySQL connection object
-        plant_name (str, optional): Filter by plant name
+        client_name (str, optional): Filter by client
+        plant_id (optional): tbl_plants id; narrows consumption to one plant,
+            banking settlement stays client-wide
 
     Returns:
         pd.DataFrame: Merged DataFrame with month-wise consumption and settlement data
     """
 
-    # --- Fetch Daily Consumption ---
-    consumption_query = """
-        SELECT
-            date,
-            consumption
-        FROM
-            settlement_data
-        WHERE
-            date IS NOT NULL
-            {plant_filter}
-        ORDER BY
-            date;
-    """
-
-    # --- Fetch Monthly Banking Settlement ---
-    settlement_query = """
-        SELECT
-            date AS month,
-            SUM(matched_settled_sum) AS total_matched_settled_sum,
-            SUM(intra_settlement) AS total_intra_settlement,
-            SUM(inter_settlement) AS total_inter_settlement
-        FROM
-            banking_settlement
-        WHERE
-            date IS NOT NULL
-            {plant_filter}
-        GROUP BY
-            date
-        ORDER BY
-            date;
-    """
-
-    # Prepare query and params
-    params = ()
-    if client_name:
-        consumption_query = consumption_query.format(plant_filter="AND client_name = %s")
-        settlement_query = settlement_query.format(plant_filter="AND client_name = %s")
-        params = (client_name,)
-    else:
-        consumption_query = consumption_query.format(plant_filter="")
-        settlement_query = settlement_query.format(plant_filter="")
-
-    # Read consumption data and group by month
-    df_consumption = safe_read_sql(consumption_query, conn, params)
-    df_consumption['date'] = pd.to_datetime(df_consumption['date'])
-    df_consumption['month'] = df_consumption['date'].dt.to_period('M').astype(str)
-    df_consumption_monthly = (
-        df_consumption.groupby('month', as_index=False)['consumption']
-        .sum()
-        .rename(columns={'consumption': 'total_consumption_sum'})
-    )
+    # Read monthly consumption totals (grouped by the database, or from the rollup)
+    df_consumption_monthly = read_monthly_consumption(conn, client_name, plant_id)[['month', 'total_consumption_sum']]
 
     # Read banking settlement data (already monthly)
-    df_settlement = safe_read_sql(settlement_query, conn, params)
-    df_settlement['month'] = pd.to_datetime(df_settlement['month']).dt.to_period('M').astype(str)
+    df_settlement = read_banking_settlement(conn, client_name)
 
     # Merge both on 'month'
     df_combined = pd.merge(
@@ -1,12 +1,14 @@
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
+from matplotlib.figure import Figure
 from matplotlib.ticker import FuncFormatter
+from visualizations.figures import new_figure
+from visualizations.annotations import label_points
 
 def format_rupees_lakhs(x, _):
     return f"₹{x / 1e5:.1f}L" if x >= 1e5 else f"₹{x:.0f}"
 
-def plot_costs_with_banking(df: pd.DataFrame, plant_name: str) -> plt.Figure:
+def plot_costs_with_banking(df: pd.DataFrame, plant_name: str) -> Figure:
     """
     Plot Grid Cost vs Actual Cost with Banking and Savings, formatted in Lakhs.
     """
@@ -16,7 +18,7 @@ def plot_costs_with_banking(df: pd.DataFrame, plant_name: str) -> plt.Figure:
     df['month_str'] = df['month'].dt.strftime('%b %Y')
     x = np.arange(len(df))
 
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig, ax = new_figure(figsize=(10, 6))
 
     # Main Lines
     ax.plot(x, df['Grid Cost (₹)'], label='Grid Cost', marker='o', linewidth=2.5, color='#1E88E5')
@@ -24,16 +26,15 @@ def plot_costs_with_banking(df: pd.DataFrame, plant_name: str) -> plt.Figure:
     ax.plot(x, df['Savings (₹)'], label='Savings', marker='^', linestyle=':', linewidth=2.5, color='#E53935')  # New savings line
 
     # Annotation for Savings
-    for i, val in enumerate(df['Savings (₹)']):
-        if not pd.isna(val) and val > 0:
-            ax.text(
-                x[i],
-                max(df['Grid Cost (₹)'].iloc[i], df['Actual Cost (₹)'].iloc[i]) * 1.02,
-                f"₹{val / 1e5:.2f}L",
-                ha='center',
-                fontsize=9,
-                color='gray'
-            )
+    savings = df['Savings (₹)']
+    label_points(
+        ax,
+        x,
+        np.fmax(df['Grid Cost (₹)'], df['Actual Cost (₹)']) * 1.02,
+        [f"₹{val / 1e5:.2f}L" if val > 0 else "" for val in savings.fillna(0)],
+        fontsize=9,
+        color='gray'
+    )
 
     ax.set_title(f"Monthly Cost with Banking\n{plant_name}", fontsize=14)
     ax.set_xlabel("Month")
@@ -44,13 +45,13 @@ def plot_costs_with_banking(df: pd.DataFrame, plant_name: str) -> plt.Figure:
     ax.grid(True, linestyle='--', alpha=0.6)
     ax.legend(loc='upper right', frameon=False)
 
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
 
 
 
 
-def plot_costs_without_banking(df: pd.DataFrame, plant_name: str) -> plt.Figure:
+def plot_costs_without_banking(df: pd.DataFrame, plant_name: str) -> Figure:
     """
     Plot Grid Cost vs Actual Cost (without banking logic), now includes Savings line.
     """
@@ -60,7 +61,7 @@ def plot_costs_without_banking(df: pd.DataFrame, plant_name: str) -> plt.Figure:
     df['month_str'] = df['month'].dt.strftime('%b %Y')
     x = np.arange(len(df))
 
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig, ax = new_figure(figsize=(10, 6))
 
     # Core lines
     ax.plot(x, df['Grid Cost (₹)'], label='Grid Cost', marker='o', linewidth=2.5, color='#1E88E5')
@@ -68,16 +69,15 @@ def plot_costs_without_banking(df: pd.DataFrame, plant_name: str) -> plt.Figure:
     ax.plot(x, df['Savings (₹)'], label='Savings', marker='^', linestyle=':', linewidth=2.5, color='#43A047')  # New line
 
     # Annotate savings
-    for i, val in enumerate(df['Savings (₹)']):
-        if not pd.isna(val) and val > 0:
-            ax.text(
-                x[i],
-                max(df['Grid Cost (₹)'].iloc[i], df['Actual Cost (₹)'].iloc[i]) * 1.02,
-                f"₹{val / 1e5:.2f}L",
-                ha='center',
-                fontsize=9,
-                color='gray'
-            )
+    savings = df['Savings (₹)']
+    label_points(
+        ax,
+        x,
+        np.fmax(df['Grid Cost (₹)'], df['Actual Cost (₹)']) * 1.02,
+        [f"₹{val / 1e5:.2f}L" if val > 0 else "" for val in savings.fillna(0)],
+        fontsize=9,
+        color='gray'
+    )
 
     ax.set_title(f"Monthly Cost without Banking\n{plant_name}", fontsize=14)
     ax.set_xlabel("Month")
@@ -88,5 +88,5 @@ def plot_costs_without_banking(df: pd.DataFrame, plant_name: str) -> plt.Figure:
     ax.grid(True, linestyle='--', alpha=0.6)
     ax.legend(loc='upper right', frameon=False)
 
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
\ No newline at end of file
@@ -0,0 +1,127 @@
+"""
+Chart rendering in worker processes.
+
+Matplotlib holds the GIL while it draws, so charts rendered on the Streamlit
+script thread are built one after another on a single core. This module
+renders registered chart functions in a process pool instead. Jobs send the
+function name, the plot arguments and the pickled DataFrame, and the worker
+returns the image bytes. Each worker switches matplotlib to Agg and imports
+the chart modules once, in its initializer.
+
+Every chart in CHART_SPECS is registered. Charts that are not registered, or
+jobs submitted while the pool is broken, are rendered in the calling process.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+from config.app_config import RENDER_POOL_CONFIG
+from visualizations.figure_cache import figure_to_bytes
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Plot function name -> function, built on first use
+_plot_functions = None
+
+
+def plot_function_name(plot_func) -> str:
+    return f"{plot_func.__module__}.{plot_func.__qualname__}"
+
+
+def get_plot_functions() -> dict:
+    """Registry of the chart functions that can be rendered by name."""
+    global _plot_functions
+    if _plot_functions is None:
+        from visualizations.chart_specs import CHART_SPECS
+        _plot_functions = {plot_function_name(plot_func): plot_func for plot_func in CHART_SPECS}
+    return _plot_functions
+
+
+def is_registered(plot_func) -> bool:
+    return plot_function_name(plot_func) in get_plot_functions()
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use("Agg")
+    get_plot_functions()
+
+
+def _render(plot_func, df: pd.DataFrame, args: tuple, kwargs: dict, fmt: str, dpi: int):
+    fig = plot_func(df, *args, **kwargs)
+    if isinstance(fig, tuple):
+        fig = fig[0]
+    if fig is None:
+        return None
+    return figure_to_bytes(fig, fmt, dpi)
+
+
+def render_chart(name: str, df: pd.DataFrame, args: tuple, kwargs: dict, fmt: str = "png", dpi: int = 100):
+    """
+    Render a registered chart to image bytes.
+
+    Args:
+        name: Registered plot function name (see plot_function_name)
+        df, args, kwargs: Arguments of the plot function
+        fmt: Image format
+        dpi: Image resolution
+
+    Returns:
+        Image bytes, or None if the plot function produced no figure
+    """
+    return _render(get_plot_functions()[name], df, args, kwargs, fmt, dpi)
+
+
+def get_render_pool() -> ProcessPoolExecutor:
+    """The shared render pool, started on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            max_workers = RENDER_POOL_CONFIG.get("max_workers") or max(1, (os.cpu_count() or 2) - 1)
+            _executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context(RENDER_POOL_CONFIG.get("start_method", "spawn")),
+                initializer=_init_worker
+            )
+        return _executor
+
+
+def shutdown_render_pool():
+    """Stop the render pool; the next job starts a new one."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _render_here(plot_func, df: pd.DataFrame, args: tuple, kwargs: dict, fmt: str, dpi: int) -> Future:
+    future = Future()
+    try:
+        future.set_result(_render(plot_func, df, args, kwargs, fmt, dpi))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def submit_chart(plot_func, df: pd.DataFrame, args: tuple, kwargs: dict, fmt: str = "png", dpi: int = 100) -> Future:
+    """
+    Render plot_func(df, *args, **kwargs) in the pool.
+
+    Returns:
+        Future resolving to the image bytes (or None if no figure was produced)
+    """
+    if not is_registered(plot_func):
+        return _render_here(plot_func, df, args, kwargs, fmt, dpi)
+
+    try:
+        return get_render_pool().submit(render_chart, plot_function_name(plot_func), df, args, kwargs, fmt, dpi)
+    except (BrokenProcessPool, RuntimeError):
+        # A worker died or the pool was shut down: start afresh next time, render this one here
+        shutdown_render_pool()
+        return _render_here(plot_func, df, args, kwargs, fmt, dpi)
@@ -0,0 +1,142 @@
+"""
+Resolution-aware binning for date-based charts.
+
+Long ranges are drawn at week or month resolution so the number of bars,
+markers and labels per chart stays roughly constant. The bin is chosen from
+the range and the plot width, the database groups by the bin start
+(see BIN_SQL) and long line series are thinned with LTTB.
+"""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from config.app_config import RESOLUTION_CONFIG
+
+RESOLUTIONS = ("day", "week", "month")
+
+# Nominal bin length in days, used for bar widths
+BIN_DAYS = {"day": 1, "week": 7, "month": 30}
+
+# SQL expression giving the first day of the bin containing `date` (weeks start on Monday)
+BIN_SQL = {
+    "day": "date",
+    "week": "DATE_SUB(date, INTERVAL WEEKDAY(date) DAY)",
+    "month": "DATE_SUB(date, INTERVAL DAYOFMONTH(date) - 1 DAY)"
+}
+
+# Date tick format per bin
+BIN_DATE_FORMATS = {"day": "%d-%b", "week": "%d-%b", "month": "%b %Y"}
+
+# Label of the period a bar covers, used for axis labels
+BIN_LABELS = {"day": "Date", "week": "Week starting", "month": "Month"}
+
+# Title prefix of per-period charts
+PERIOD_TITLES = {"day": "Daily", "week": "Weekly", "month": "Monthly"}
+
+
+def _to_date(value) -> date:
+    return pd.Timestamp(value).date()
+
+
+def choose_resolution(start_date, end_date=None, width_px: int = None) -> str:
+    """
+    Pick the finest bin that keeps bars at least min_px_per_bar wide.
+
+    Args:
+        start_date: Range start (date or YYYY-MM-DD)
+        end_date: Range end, defaults to start_date
+        width_px: Plot width in pixels, defaults to RESOLUTION_CONFIG['chart_width_px']
+
+    Returns:
+        'day', 'week' or 'month'
+    """
+    if end_date is None:
+        return "day"
+
+    width_px = width_px or RESOLUTION_CONFIG["chart_width_px"]
+    max_bars = max(1, width_px // RESOLUTION_CONFIG["min_px_per_bar"])
+    days = (_to_date(end_date) - _to_date(start_date)).days + 1
+
+    for resolution in RESOLUTIONS:
+        if days / BIN_DAYS[resolution] <= max_bars:
+            return resolution
+    return "month"
+
+
+def bin_sql(resolution: str) -> str:
+    """SQL expression for the bin start of the `date` column."""
+    return BIN_SQL.get(resolution, BIN_SQL["day"])
+
+
+def bin_start(dates: pd.Series, resolution: str) -> pd.Series:
+    """Vectorized pandas equivalent of BIN_SQL."""
+    dates = pd.to_datetime(dates)
+    if resolution == "week":
+        return dates - pd.to_timedelta(dates.dt.weekday, unit="D")
+    if resolution == "month":
+        return dates.dt.to_period("M").dt.to_timestamp()
+    return dates.dt.normalize()
+
+
+def bar_width_days(resolution: str, fill: float = 0.8) -> float:
+    """Bar width in days (matplotlib date units) covering `fill` of one bin."""
+    return BIN_DAYS.get(resolution, 1) * fill
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Args:
+        x: Monotonic x values (numeric)
+        y: y values
+        threshold: Number of points to keep (>= 3)
+
+    Returns:
+        Sorted indices of the points to keep; first and last points are always kept
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # Interior points split into threshold - 2 buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+
+    keep = np.empty(threshold, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        area = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        keep[i + 1] = previous
+    return keep
+
+
+def decimate_lines(df: pd.DataFrame, x_column: str, y_columns: list, max_points: int = None) -> pd.DataFrame:
+    """
+    Thin a frame of line series with LTTB, keeping the union of the points each series needs.
+
+    Returns:
+        df unchanged if it is short enough, else the selected rows in order
+    """
+    max_points = max_points or RESOLUTION_CONFIG["max_line_points"]
+    if len(df) <= max_points:
+        return df
+
+    x = pd.to_datetime(df[x_column]).to_numpy().astype("int64") if not np.issubdtype(df[x_column].dtype, np.number) else df[x_column].to_numpy()
+    per_series = max(3, max_points // len(y_columns))
+    keep = np.unique(np.concatenate([
+        lttb_indices(x, df[column].to_numpy(dtype=float), per_series) for column in y_columns
+    ]))
+    return df.iloc[keep]
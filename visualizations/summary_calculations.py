@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+# Colour class of a net surplus value: generation surplus, demand surplus, balanced
+SURPLUS_COLORS = np.array(['green', 'red', 'gray'])
+
+# Transmission/distribution loss applied to generation in the summary metrics
+GENERATION_LOSS_PERCENTAGE = 2.8
+
+
+def add_derived_metrics(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add the derived surplus columns used by the Summary tab charts.
+
+    Args:
+        df (pd.DataFrame): Frame with 'generation' and 'consumption' columns; existing
+            'surplus_generation' / 'surplus_demand' columns (from settlement_data) are kept
+
+    Returns:
+        pd.DataFrame: Copy of df with float generation, consumption, surplus_generation,
+        surplus_demand, net_surplus and a surplus_color column ('green', 'red' or 'gray')
+    """
+    df = df.copy()
+
+    # SUM over DECIMAL columns arrives as Decimal objects
+    df['generation'] = df['generation'].astype(float)
+    df['consumption'] = df['consumption'].astype(float)
+    difference = df['generation'].to_numpy() - df['consumption'].to_numpy()
+
+    if 'surplus_generation' in df.columns:
+        df['surplus_generation'] = df['surplus_generation'].astype(float)
+    else:
+        df['surplus_generation'] = np.maximum(difference, 0.0)
+
+    if 'surplus_demand' in df.columns:
+        df['surplus_demand'] = df['surplus_demand'].astype(float)
+    else:
+        df['surplus_demand'] = np.maximum(-difference, 0.0)
+
+    net_surplus = df['surplus_generation'].to_numpy() - df['surplus_demand'].to_numpy()
+    df['net_surplus'] = net_surplus
+    # 0 -> green (net generation), 1 -> red (net demand), 2 -> gray (balanced)
+    df['surplus_color'] = SURPLUS_COLORS[np.where(net_surplus > 0, 0, np.where(net_surplus < 0, 1, 2))]
+
+    return df
+
+
+def summarize_generation_consumption(df: pd.DataFrame, loss_percentage: float = GENERATION_LOSS_PERCENTAGE) -> dict:
+    """
+    Compute the Summary tab headline metrics in one pass over the frame.
+
+    Args:
+        df (pd.DataFrame): Frame with generation, consumption, settled and surplus_demand columns (kWh)
+        loss_percentage (float): Generation loss applied for 'generation after loss'
+
+    Returns:
+        dict with total_generation_mwh, total_generation_after_loss_mwh, total_consumption_mwh,
+        total_settled_mwh, surplus_demand_mwh, replacement_percentage and loss_percentage
+    """
+    totals = df[['generation', 'consumption', 'settled', 'surplus_demand']].astype(float).sum() / 1000
+
+    total_consumption_mwh = totals['consumption']
+    replacement_percentage = (
+        totals['settled'] / total_consumption_mwh * 100 if total_consumption_mwh > 0 else 0
+    )
+
+    return {
+        'total_generation_mwh': totals['generation'],
+        'total_generation_after_loss_mwh': totals['generation'] * (1 - loss_percentage / 100),
+        'total_consumption_mwh': total_consumption_mwh,
+        'total_settled_mwh': totals['settled'],
+        'surplus_demand_mwh': totals['surplus_demand'],
+        'replacement_percentage': replacement_percentage,
+        'loss_percentage': loss_percentage
+    }
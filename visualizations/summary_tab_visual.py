@@ -1,8 +1,12 @@
-import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+from matplotlib.artist import setp
 from matplotlib.ticker import FuncFormatter
 import pandas as pd
 from matplotlib.patches import Patch
+from visualizations.summary_calculations import add_derived_metrics
+from visualizations.figures import new_figure
+from visualizations.annotations import label_bars
+from visualizations.resolution import BIN_DATE_FORMATS, BIN_LABELS, PERIOD_TITLES, bar_width_days, decimate_lines
 
 
 
@@ -11,59 +15,67 @@ from matplotlib.patches import Patch
 def format_thousands(x, _):
     return f'{int(x):,}'
 
+
+def set_date_axis(ax, n_points: int, resolution: str = "day", date_format: str = None):
+    """Date ticks for a multi-day axis: every other day for short daily ranges, automatic otherwise."""
+    ax.xaxis.set_major_formatter(mdates.DateFormatter(date_format or BIN_DATE_FORMATS.get(resolution, '%b %d')))
+    if resolution == "day" and n_points <= 30:
+        ax.xaxis.set_major_locator(mdates.DayLocator(interval=2))
+    else:
+        ax.xaxis.set_major_locator(mdates.AutoDateLocator())
+
 #####Generation VS Consumption
 def plot_generation_vs_consumption(
     df: pd.DataFrame,
     plant_display_name: str,
     start_date: str,
-    end_date: str
+    end_date: str,
+    resolution: str = "day"
 ):
-    """Area plot for generation vs. consumption with surplus bar chart for multiple days."""
+    """
+    Area plot for generation vs. consumption with surplus bar chart for multiple days.
+
+    Multi-day frames may be binned by week or month (resolution); long line series
+    are LTTB-decimated so the number of drawn points stays bounded.
+    """
     if df.empty:
         print("⚠️ No data available to plot.")
         return
 
     is_single_day = start_date == end_date
-    
-    # Calculate surplus generation and demand if not already present
-    if 'surplus_generation' not in df.columns:
-        df['surplus_generation'] = df.apply(lambda row: max(0, row['generation'] - row['consumption']), axis=1)
-    if 'surplus_demand' not in df.columns:
-        df['surplus_demand'] = df.apply(lambda row: max(0, row['consumption'] - row['generation']), axis=1)
+
+    # Surplus, net surplus and bar colours on a copy, the input frame is shared between panels
+    df = add_derived_metrics(df)
     
     # Create subplots - single plot for single day, two plots for multiple days
     if is_single_day:
-        fig, ax = plt.subplots(figsize=(16, 8))
+        fig, ax = new_figure(figsize=(16, 8))
         axes = [ax]
     else:
-        fig, axes = plt.subplots(2, 1, figsize=(16, 12), gridspec_kw={'height_ratios': [3, 1]})
+        fig, axes = new_figure(nrows=2, ncols=1, figsize=(16, 12), gridspec_kw={'height_ratios': [3, 1]})
         ax = axes[0]
     
     # Main area plot
+    x_column = 'datetime' if is_single_day else 'date'
+    lines = decimate_lines(df, x_column, ['generation', 'consumption'])
+    x = lines[x_column]
     if is_single_day:
-        x = df['datetime']
         ax.set_xlabel("Time of Day", fontsize=12)
         ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
     else:
-        x = df['date']
-        ax.set_xlabel("Date", fontsize=12)
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%b %d'))
-        # Set appropriate date locators based on date range
-        if len(df) > 30:
-            ax.xaxis.set_major_locator(mdates.WeekdayLocator(interval=2))
-        else:
-            ax.xaxis.set_major_locator(mdates.DayLocator(interval=2))
+        ax.set_xlabel(BIN_LABELS.get(resolution, "Date"), fontsize=12)
+        set_date_axis(ax, len(df), resolution)
 
     # Add line plots for generation and consumption
-    ax.plot(x, df['generation'], color='green', linewidth=2.5, marker='o', markersize=6, label='Generation')
-    ax.plot(x, df['consumption'], color='red', linewidth=2.5, marker='s', markersize=6, linestyle='--', label='Consumption')
+    ax.plot(x, lines['generation'], color='green', linewidth=2.5, marker='o', markersize=6, label='Generation')
+    ax.plot(x, lines['consumption'], color='red', linewidth=2.5, marker='s', markersize=6, linestyle='--', label='Consumption')
     
     # Add fill between curves to show surplus/deficit areas
-    ax.fill_between(x, df['generation'], df['consumption'], 
-                    where=(df['generation'] >= df['consumption']), 
+    ax.fill_between(x, lines['generation'], lines['consumption'], 
+                    where=(lines['generation'] >= lines['consumption']), 
                     color='green', alpha=0.3, interpolate=True, label='Surplus Generation')
-    ax.fill_between(x, df['generation'], df['consumption'], 
-                    where=(df['generation'] < df['consumption']), 
+    ax.fill_between(x, lines['generation'], lines['consumption'], 
+                    where=(lines['generation'] < lines['consumption']), 
                     color='red', alpha=0.3, interpolate=True, label='Surplus Demand')
 
     # Format labels and title
@@ -75,59 +87,50 @@ def plot_generation_vs_consumption(
     
     # Format y-axis with thousands formatter if values are large
     if df[['generation', 'consumption']].max().max() > 1000:
-        ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x/1000:.1f}K' if x >= 1000 else f'{x:.0f}'))
+        ax.yaxis.set_major_formatter(FuncFormatter(lambda x, p: f'{x/1000:.1f}K' if x >= 1000 else f'{x:.0f}'))
     
     ax.legend(loc='upper right', fontsize=11)
     ax.grid(True, linestyle='--', alpha=0.4)
     
     # Format x-axis labels
-    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+    setp(ax.get_xticklabels(), rotation=45, ha='right')
     
 
     # Add surplus bar chart for multiple days
     if not is_single_day and len(axes) > 1:
         ax2 = axes[1]
     
-        # Calculate net surplus and color logic
-        df['net_surplus'] = df['surplus_generation'] - df['surplus_demand']
-        colors = df['net_surplus'].apply(lambda x: 'green' if x > 0 else ('red' if x < 0 else 'gray'))
-    
         # Plot single bar per day with color indicating type
         ax2.bar(df['date'], df['net_surplus'].abs(), 
-                color=colors, alpha=0.7, width=0.8, label='Net Surplus')
+                color=df['surplus_color'], alpha=0.7, width=bar_width_days(resolution), label='Net Surplus')
     
         # Axis and formatting
-        ax2.set_xlabel("Date", fontsize=12)
+        ax2.set_xlabel(BIN_LABELS.get(resolution, "Date"), fontsize=12)
         ax2.set_ylabel("Surplus Energy (kWh)", fontsize=12)
-        ax2.set_title("Daily Net Surplus (Generation or Demand)", fontsize=14, fontweight='bold')
+        ax2.set_title(f"{PERIOD_TITLES.get(resolution, 'Daily')} Net Surplus (Generation or Demand)", fontsize=14, fontweight='bold')
         ax2.grid(True, linestyle='--', alpha=0.4)
     
         # Legend (custom patch)
-        from matplotlib.patches import Patch
         legend_elements = [
             Patch(facecolor='green', label='Surplus Generation'),
             Patch(facecolor='red', label='Surplus Demand')
         ]
         ax2.legend(handles=legend_elements, loc='upper right', fontsize=10)
     
-        ax2.xaxis.set_major_formatter(mdates.DateFormatter('%b %d'))
-        if len(df) > 30:
-            ax2.xaxis.set_major_locator(mdates.WeekdayLocator(interval=2))
-        else:
-            ax2.xaxis.set_major_locator(mdates.DayLocator(interval=2))
+        set_date_axis(ax2, len(df), resolution)
     
         if df['net_surplus'].abs().max() > 1000:
-            ax2.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x/1000:.1f}K'))
+            ax2.yaxis.set_major_formatter(FuncFormatter(lambda x, p: f'{x/1000:.1f}K'))
     
         # ✅ Only apply rotation if ax2 exists
-        plt.setp(ax2.get_xticklabels(), rotation=45, ha='right')
+        setp(ax2.get_xticklabels(), rotation=45, ha='right')
 
 
     
     # Adjust layout
-    plt.tight_layout()
+    fig.tight_layout()
     if not is_single_day and len(axes) > 1:
-        plt.subplots_adjust(hspace=0.3)
+        fig.subplots_adjust(hspace=0.3)
     
     return fig
 
@@ -136,14 +139,14 @@ def plot_generation_vs_consumption(
 
 
 
-def create_generation_only_plot(df, plant_name, start_date, end_date=None):
+def create_generation_only_plot(df, plant_name, start_date, end_date=None, resolution="day"):
     if df.empty or 'generation' not in df.columns:
-        fig, ax = plt.subplots(figsize=(10, 5))
+        fig, ax = new_figure(figsize=(10, 5))
         ax.text(0.5, 0.5, "No data available", ha='center', va='center', fontsize=12)
         return fig
 
     is_single_day = end_date is None or start_date == end_date
-    fig, ax = plt.subplots(figsize=(12, 6))
+    fig, ax = new_figure(figsize=(12, 6))
 
     if is_single_day:
         x = df['datetime']
@@ -152,26 +155,14 @@ def create_generation_only_plot(df, plant_name, start_date, end_date=None):
         ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
     else:
         x = df['date']
-        bars = ax.bar(x, df['generation'], color='green', alpha=0.8)
-
-        # Add values inside bars rotated 90 degrees
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(
-                bar.get_x() + bar.get_width() / 2,
-                height * 0.5,
-                f"{int(height):,}",
-                ha='center',
-                va='center',
-                fontsize=9,
-                rotation=90,
-                color='white'
-            )
-
-        ax.set_xlabel("Date")
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%d-%b'))
-        ax.xaxis.set_major_locator(mdates.DayLocator(interval=2))
-        plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
+        bars = ax.bar(x, df['generation'], color='green', alpha=0.8, width=bar_width_days(resolution))
+
+        # Add values inside bars rotated 90 degrees, where they fit
+        label_bars(ax, bars, fmt="{:,.0f}", label_type='center', rotation=90, fontsize=9, color='white')
+
+        ax.set_xlabel(BIN_LABELS.get(resolution, "Date"))
+        set_date_axis(ax, len(df), resolution, '%d-%b' if resolution == "day" else None)
+        setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
 
     ax.set_ylabel("Generation (kWh)")
     title = f"Generation - {plant_name}\n{start_date}"
@@ -180,15 +171,15 @@ def create_generation_only_plot(df, plant_name, start_date, end_date=None):
     ax.set_title(title, fontsize=14, fontweight='bold')
     ax.yaxis.set_major_formatter(FuncFormatter(format_thousands))
     ax.grid(True, linestyle='--', alpha=0.6)
-    plt.tight_layout()
+    fig.tight_layout()
 
     return fig
 
 
 
 # ##Consumption
-def create_consumption_plot(df, plant_name, start_date, end_date=None):
-    fig, ax = plt.subplots(figsize=(12, 6))
+def create_consumption_plot(df, plant_name, start_date, end_date=None, resolution="day"):
+    fig, ax = new_figure(figsize=(12, 6))
 
     if df.empty or 'consumption' not in df.columns:
         ax.text(0.5, 0.5, 'No consumption data available', ha='center', va='center', fontsize=12, color='red')
@@ -198,6 +189,7 @@ def create_consumption_plot(df, plant_name, start_date, end_date=None):
     is_single_day = end_date is None or start_date == end_date
 
     if is_single_day:
+        df = df.copy()
         df['datetime'] = pd.to_datetime(df['datetime'])
         df = df.groupby('datetime', as_index=False)['consumption'].sum()
         ax.plot(df['datetime'], df['consumption'], color='red', marker='o', linewidth=2)
@@ -207,32 +199,20 @@ def create_consumption_plot(df, plant_name, start_date, end_date=None):
         title = f"Consumption - {plant_name}\n{start_date}"
     else:
         df = df.groupby('date', as_index=False)['consumption'].sum()
-        bars = ax.bar(df['date'], df['consumption'], color='red', alpha=0.8)
-
-        # Add values inside bars rotated 90 degrees
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(
-                bar.get_x() + bar.get_width() / 2,
-                height * 0.5,
-                f"{int(height):,}",
-                ha='center',
-                va='center',
-                fontsize=9,
-                rotation=90,
-                color='black'
-            )
-
-        ax.set_xlabel("Date")
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%d-%b'))
-        ax.xaxis.set_major_locator(mdates.DayLocator(interval=2))
-        title = f"Daily Consumption - {plant_name}\n{start_date}"
+        bars = ax.bar(df['date'], df['consumption'], color='red', alpha=0.8, width=bar_width_days(resolution))
+
+        # Add values inside bars rotated 90 degrees, where they fit
+        label_bars(ax, bars, fmt="{:,.0f}", label_type='center', rotation=90, fontsize=9, color='black')
+
+        ax.set_xlabel(BIN_LABELS.get(resolution, "Date"))
+        set_date_axis(ax, len(df), resolution, '%d-%b' if resolution == "day" else None)
+        title = f"{PERIOD_TITLES.get(resolution, 'Daily')} Consumption - {plant_name}\n{start_date}"
 
     ax.set_title(title, fontsize=14, fontweight='bold')
     ax.set_ylabel("Consumption (kWh)")
     ax.yaxis.set_major_formatter(FuncFormatter(format_thousands))
     ax.grid(True, linestyle='--', alpha=0.6)
-    plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
-    plt.tight_layout()
+    setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
+    fig.tight_layout()
 
     return fig
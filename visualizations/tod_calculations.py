@@ -0,0 +1,63 @@
+from typing import Dict
+
+import pandas as pd
+
+from visualizations.tod_config import SLOT_DTYPE, get_slot_order, normalize_slot_series
+
+# ToD measure -> kWh column of the date x slot frame
+TOD_MEASURES = {
+    "generation": "generation_kwh",
+    "consumption": "consumption_kwh"
+}
+
+
+def pivot_tod_measures(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    Pivot a date x slot frame into one date x slot table per measure, in a single pass.
+
+    Args:
+        df (pd.DataFrame): Rows with date, slot, generation_kwh and consumption_kwh
+
+    Returns:
+        dict: measure ('generation', 'consumption') -> float DataFrame indexed by date,
+        one column per slot in get_slot_order(); empty tables when df is empty
+    """
+    slot_order = get_slot_order()
+    if df.empty:
+        empty = pd.DataFrame(columns=slot_order, index=pd.DatetimeIndex([], name='date'), dtype=float)
+        return {measure: empty for measure in TOD_MEASURES}
+
+    columns = list(TOD_MEASURES.values())
+    df = df[['date', 'slot'] + columns].assign(
+        date=pd.to_datetime(df['date']),
+        slot=normalize_slot_series(df['slot']),
+        # SUM over DECIMAL columns arrives as Decimal objects
+        **{column: df[column].astype(float) for column in columns}
+    )
+    pivot = df.pivot_table(index='date', columns='slot', values=columns, aggfunc='sum', fill_value=0, observed=False)
+
+    return {
+        measure: pivot[column].reindex(columns=slot_order, fill_value=0).astype(float)
+        for measure, column in TOD_MEASURES.items()
+    }
+
+
+def slot_totals(pivots: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Per-slot totals over the whole range (the binned ToD view), as column sums of the
+    date x slot tables, so they always add up to the daily view drawn from the same tables.
+
+    Args:
+        pivots (dict): Output of pivot_tod_measures
+
+    Returns:
+        pd.DataFrame: slot, generation_kwh, consumption_kwh, one row per slot in slot order;
+        empty when the tables are empty
+    """
+    if all(table.empty for table in pivots.values()):
+        return pd.DataFrame(columns=['slot'] + list(TOD_MEASURES.values()))
+
+    return pd.DataFrame({
+        'slot': pd.Categorical(get_slot_order(), dtype=SLOT_DTYPE),
+        **{column: pivots[measure].sum(axis=0).to_numpy() for measure, column in TOD_MEASURES.items()}
+    })
@@ -1,4 +1,5 @@
 # slot_config.py
+import pandas as pd
 
 SLOT_METADATA = {
     "Morning Peak": {
@@ -33,13 +34,37 @@ def get_slot_order():
 def get_slot_color_map():
     return {slot: SLOT_METADATA[slot]["color"] for slot in SLOT_METADATA}
 
+# Lowercase database alias (or display name) -> display name, built once
+SLOT_ALIASES = {
+    alias.strip().lower(): display_name
+    for display_name, metadata in SLOT_METADATA.items()
+    for alias in metadata["db_names"] + [display_name]
+}
+
+# Ordered categorical of the display names, so sorting and grouping follow slot order
+SLOT_DTYPE = pd.CategoricalDtype(get_slot_order(), ordered=True)
+
 def normalize_slot_name(raw_slot: str) -> str:
-    raw_slot_lower = raw_slot.strip().lower()
-    for display_name, metadata in SLOT_METADATA.items():
-        for alias in metadata["db_names"]:
-            if raw_slot_lower == alias.strip().lower():
-                return display_name
-    return raw_slot  # fallback if unknown
+    return SLOT_ALIASES.get(raw_slot.strip().lower(), raw_slot)  # fallback if unknown
+
+def normalize_slot_series(slots: pd.Series) -> pd.Series:
+    """
+    Normalize a whole column of slot names at once.
+
+    Only the distinct values are looked up, then mapped onto the column.
+
+    Returns:
+        Ordered categorical Series in slot order; unknown names are kept and sorted last
+    """
+    if slots.dtype == SLOT_DTYPE:
+        return slots
+
+    mapping = {raw: normalize_slot_name(str(raw)) for raw in slots.dropna().unique()}
+    normalized = slots.map(mapping)
+
+    unknown = sorted(set(mapping.values()) - set(SLOT_DTYPE.categories))
+    dtype = SLOT_DTYPE if not unknown else pd.CategoricalDtype(list(SLOT_DTYPE.categories) + unknown, ordered=True)
+    return normalized.astype(object).astype(dtype)
 
 def add_slot_labels_with_time():
     return {
@@ -1,11 +1,15 @@
 
-import matplotlib.pyplot as plt
 import pandas as pd
 import seaborn as sns
 import numpy as np
 from matplotlib.ticker import FuncFormatter
 import matplotlib.dates as mdates
-from .tod_config import get_slot_order, get_slot_color_map, normalize_slot_name, add_slot_labels_with_time
+from matplotlib.artist import setp
+from matplotlib.figure import Figure
+from .figures import new_figure
+from .annotations import label_bars
+from .resolution import BIN_DATE_FORMATS, BIN_LABELS, PERIOD_TITLES, bar_width_days
+from .tod_config import get_slot_order, get_slot_color_map, normalize_slot_series, add_slot_labels_with_time
 
 def format_thousands(x, pos):
     return f'{x/1000:.0f}K' if x >= 1000 else f'{x:.0f}'
@@ -17,35 +21,30 @@ def create_monthly_before_banking_plot(df: pd.DataFrame, plant_name: str):
     """
     Create monthly ToD-wise generation vs. consumption stacked bar chart.
     """
-    fig, ax = plt.subplots(figsize=(14, 8))
+    fig, ax = new_figure(figsize=(14, 8))
 
     if df.empty:
         ax.text(0.5, 0.5, "No data available", ha='center', va='center', fontsize=14, color='red')
         ax.set_title(f"{plant_name} - Monthly Before Banking", fontsize=16)
         return fig
 
-    # Step 1: Extract month
+    # Step 1: Extract month (on a copy, the frame may be shared with other panels)
+    df = df.copy()
     df['date'] = pd.to_datetime(df['date'])
     df['month'] = df['date'].dt.to_period('M').astype(str)
 
     # Step 2: Normalize slots
-    df['slot'] = df['slot'].apply(normalize_slot_name)
+    df['slot'] = normalize_slot_series(df['slot'])
 
-    # Step 3: Pivot tables
-    gen_pivot = df.pivot_table(index='month', columns='slot', values='generation_kwh', aggfunc='sum', fill_value=0)
-    cons_pivot = df.pivot_table(index='month', columns='slot', values='consumption_kwh', aggfunc='sum', fill_value=0)
-
-    # Step 4: Order and align columns
+    # Step 3: Order of stacked columns
     slot_order = list(reversed(get_slot_order()))  # Top-down visual stacking
     slot_colors = get_slot_color_map()
 
-    for slot in slot_order:
-        if slot not in gen_pivot.columns:
-            gen_pivot[slot] = 0.0
-        if slot not in cons_pivot.columns:
-            cons_pivot[slot] = 0.0
-    gen_pivot = gen_pivot[slot_order].astype(float)
-    cons_pivot = cons_pivot[slot_order].astype(float)
+    # Step 4: Pivot tables, aligned to the slot order
+    gen_pivot = df.pivot_table(index='month', columns='slot', values='generation_kwh', aggfunc='sum', fill_value=0, observed=False)
+    cons_pivot = df.pivot_table(index='month', columns='slot', values='consumption_kwh', aggfunc='sum', fill_value=0, observed=False)
+    gen_pivot = gen_pivot.reindex(columns=slot_order, fill_value=0).astype(float)
+    cons_pivot = cons_pivot.reindex(columns=slot_order, fill_value=0).astype(float)
 
     # Step 5: Plot
     x = np.arange(len(gen_pivot.index))
@@ -83,14 +82,9 @@ def create_monthly_before_banking_plot(df: pd.DataFrame, plant_name: str):
         cons_bottom += cons_pivot[slot].values
         legend_items.append((f'Cons {slot}', cons_bar[0]))
 
-    # Add total labels
-    for i in range(len(x)):
-        g_total = gen_bottom[i]
-        c_total = cons_bottom[i]
-        if g_total > 0:
-            ax.text(x[i] - bar_width/2, g_total + g_total * 0.02, f"{g_total:.0f}", ha='center', va='bottom', fontsize=9, color='green')
-        if c_total > 0:
-            ax.text(x[i] + bar_width/2, c_total + c_total * 0.02, f"{c_total:.0f}", ha='center', va='bottom', fontsize=9, color='darkred')
+    # Add total labels on top of each stack
+    label_bars(ax, gen_bar, gen_bottom, fmt="{:.0f}", fontsize=9, color='green', padding=2)
+    label_bars(ax, cons_bar, cons_bottom, fmt="{:.0f}", fontsize=9, color='darkred', padding=2)
 
     # Final touches
     ax.set_xticks(x)
@@ -120,14 +114,14 @@ def create_monthly_before_banking_plot(df: pd.DataFrame, plant_name: str):
         frameon=False
     )
 
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
 
 
 
 
 ##Monthly Banking Settlement
-def create_monthly_banking_settlement_chart(df: pd.DataFrame, plant_name: str) -> tuple[plt.Figure, pd.DataFrame]:
+def create_monthly_banking_settlement_chart(df: pd.DataFrame, plant_name: str) -> tuple[Figure, pd.DataFrame]:
     """
     Create a chart showing monthly banking settlement breakdown (line + pie), integrating consumption + unsettled logic.
     """
@@ -155,7 +149,7 @@ def create_monthly_banking_settlement_chart(df: pd.DataFrame, plant_name: str) -
     x = np.arange(len(df))
 
     # 🎨 Plotting
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 7))
+    fig, (ax1, ax2) = new_figure(nrows=1, ncols=2, figsize=(16, 7))
 
     # --- Line Chart ---
     ax1.plot(x, df['total_settlement'], label='Total Settlement', marker='o', linewidth=2.5, color="#2E7D32")
@@ -204,7 +198,7 @@ def create_monthly_banking_settlement_chart(df: pd.DataFrame, plant_name: str) -
     )
     ax2.set_title("Total Banking Breakdown", fontsize=14)
 
-    plt.tight_layout()
+    fig.tight_layout()
     return fig, df
 
 
@@ -226,7 +220,8 @@ def create_tod_binned_plot(
         raise ValueError("No data to plot")
 
     # ✅ Normalize slot names
-    df['slot'] = df['slot'].apply(normalize_slot_name)
+    df = df.copy()
+    df['slot'] = normalize_slot_series(df['slot'])
 
     # ✅ Melt the DataFrame for seaborn
     df_melted = df.melt(
@@ -242,7 +237,7 @@ def create_tod_binned_plot(
 
     # ✅ Setup seaborn style
     sns.set(style="whitegrid")
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig, ax = new_figure(figsize=(10, 6))
 
     # ✅ Create barplot
     sns.barplot(
@@ -275,7 +270,7 @@ def create_tod_binned_plot(
     ax.set_xticks(range(len(slot_order)))
     ax.set_xticklabels([slot_labels.get(slot, slot) for slot in slot_order], rotation=45)
 
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
 
 
@@ -366,59 +361,50 @@ def create_tod_binned_plot(
 
 
 
-##ToD Generation
-def format_thousands(x, pos):
-    return f'{x/1000:.0f}K' if x >= 1000 else f'{x:.0f}'
-
-
-
-
-def create_tod_generation_plot(df: pd.DataFrame, plant_name: str, start_date: str, end_date: str = None):
+##ToD Generation / Consumption
+def create_tod_stacked_plot(
+    pivot_df: pd.DataFrame,
+    measure: str,
+    plant_name: str,
+    start_date: str,
+    end_date: str = None,
+    resolution: str = "day"
+):
     """
-    Create a smart Seaborn-styled stacked bar chart of ToD slot-wise generation,
-    with dynamic bar width, date tick intervals, total annotations, and ordered legend.
+    Create a stacked bar chart of one ToD measure per day (or week / month), with
+    Night Off-Peak at the bottom and Morning Peak on top, stack totals and an ordered legend.
+
+    Args:
+        pivot_df: date x slot kWh table, from tod_calculations.pivot_tod_measures
+        measure: 'generation' or 'consumption'
+        plant_name: Plant or client shown in the title
+        start_date, end_date: Range shown in the title
+        resolution: Date bin of the rows ('day', 'week' or 'month')
     """
-    if df.empty:
+    if pivot_df.empty:
         return
 
     sns.set(style="whitegrid")
 
-    # Normalize input
-    df['slot'] = df['slot'].apply(normalize_slot_name)
-    df['date'] = pd.to_datetime(df['date'])
-    df['generation_kwh'] = df['generation_kwh'].astype(float)
-
     # Load slot config
     slot_order = get_slot_order()
     slot_colors = get_slot_color_map()
-
-    # Pivot to date × slot
-    pivot_df = df.pivot_table(
-        index='date',
-        columns='slot',
-        values='generation_kwh',
-        aggfunc='sum',
-        fill_value=0
-    )
-    for slot in slot_order:
-        if slot not in pivot_df.columns:
-            pivot_df[slot] = 0.0
-    pivot_df = pivot_df[slot_order]
+    label = measure.title()
 
     # Plot config
-    fig, ax = plt.subplots(figsize=(12, 6))
+    fig, ax = new_figure(figsize=(12, 6))
     bottom = np.zeros(len(pivot_df), dtype=float)
     dates = pivot_df.index
 
-    total_days = (dates[-1] - dates[0]).days + 1
-    bar_width = min(0.8, max(0.3, 20 / total_days))  # Dynamically scale width
+    # Bars span most of their day / week / month bin
+    bar_width = bar_width_days(resolution)
 
     bar_handles = []
 
     # Plot stacked bars (bottom to top)
     for slot in reversed(slot_order):
-        values = pivot_df[slot].values
-        bar = ax.bar(
+        values = pivot_df[slot].to_numpy(dtype=float)
+        bars = ax.bar(
             dates,
             values,
             bottom=bottom,
@@ -427,151 +413,29 @@ def create_tod_generation_plot(df: pd.DataFrame, plant_name: str, start_date: st
             edgecolor='white',
             width=bar_width
         )
-        bar_handles.append((slot, bar[0]))
+        bar_handles.append((slot, bars[0]))
         bottom += values
 
-    # Annotate inside bars
-    for i, total in enumerate(bottom):
-        ax.text(
-            dates[i],
-            total * 0.5,
-            f"{total:.0f}",
-            ha='center',
-            va='center',
-            fontsize=9,
-            fontweight='bold',
-            color='black',
-            rotation=90
-        )
+    # Stack totals on top of the bars
+    label_bars(ax, bars, bottom, fmt="{:.0f}", rotation=90, fontsize=9, fontweight='bold', color='black', padding=2)
 
     # Axis labels and title
-    ax.set_ylabel("Generation (kWh)", fontsize=12)
-    ax.set_xlabel("Date", fontsize=12)
-    label = f"{start_date} to {end_date}" if end_date and start_date != end_date else start_date
-    ax.set_title(f"Daily ToD-wise Generation\n{plant_name} ({label})", fontsize=14)
+    ax.set_ylabel(f"{label} (kWh)", fontsize=12)
+    ax.set_xlabel(BIN_LABELS.get(resolution, "Date"), fontsize=12)
+    date_label = f"{start_date} to {end_date}" if end_date and start_date != end_date else start_date
+    ax.set_title(f"{PERIOD_TITLES.get(resolution, 'Daily')} ToD-wise {label}\n{plant_name} ({date_label})", fontsize=14)
 
     # Smart date formatting
-    ax.set_xticks(dates)
-    ax.xaxis.set_major_formatter(mdates.DateFormatter('%d-%b'))
+    ax.xaxis.set_major_formatter(mdates.DateFormatter(BIN_DATE_FORMATS.get(resolution, '%d-%b')))
     ax.xaxis.set_major_locator(mdates.AutoDateLocator())
-    plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
+    setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
 
     # Format Y axis
     ax.yaxis.set_major_formatter(FuncFormatter(format_thousands))
 
     # Ordered legend (bottom to top of stack = top to bottom of legend)
     legend_handles = [handle for name in slot_order for s, handle in reversed(bar_handles) if s == name]
-    legend_labels = [name for name in slot_order]
-    ax.legend(legend_handles, legend_labels, title="ToD Slot", loc='upper left', bbox_to_anchor=(1.01, 1), frameon=False)
+    ax.legend(legend_handles, slot_order, title="ToD Slot", loc='upper left', bbox_to_anchor=(1.01, 1), frameon=False)
 
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
-
-
-
-
-
-
-##ToD Consumption
-
-def create_tod_consumption_plot(df: pd.DataFrame, plant_name: str, start_date: str, end_date: str = None):
-    """
-    Create a smart stacked bar chart with Morning Peak on top and Night Off-Peak at the bottom,
-    for ToD slot-wise consumption per day with dynamic bar width, x-axis handling, and legend ordering.
-    """
-    if df.empty:
-        return
-
-    sns.set(style="whitegrid")
-
-    # Clean and normalize input
-    df['slot'] = df['slot'].apply(normalize_slot_name)
-    df['date'] = pd.to_datetime(df['date'])
-    df['consumption_kwh'] = df['consumption_kwh'].astype(float)
-
-    # Slot configuration
-    slot_order = get_slot_order()
-    slot_colors = get_slot_color_map()
-
-    # Pivot table
-    pivot_df = df.pivot_table(
-        index='date',
-        columns='slot',
-        values='consumption_kwh',
-        aggfunc='sum',
-        fill_value=0
-    )
-    for slot in slot_order:
-        if slot not in pivot_df.columns:
-            pivot_df[slot] = 0.0
-    pivot_df = pivot_df[slot_order]
-
-    # Prepare for plotting
-    fig, ax = plt.subplots(figsize=(12, 6))
-    bottom = np.zeros(len(pivot_df), dtype=float)
-    dates = pivot_df.index
-
-    total_days = (dates[-1] - dates[0]).days + 1
-    bar_width = min(0.8, max(0.3, 20 / total_days))  # Adjust bar width dynamically
-
-    bar_handles = []
-
-    # Reverse slot order for stacking: bottom up
-    for slot in reversed(slot_order):
-        values = pivot_df[slot].values
-        bars = ax.bar(
-            dates,
-            values,
-            bottom=bottom,
-            label=slot,
-            color=slot_colors.get(slot, '#4CAF50'),
-            edgecolor='white',
-            width=bar_width
-        )
-        bar_handles.append((slot, bars[0]))  # Capture for legend
-        bottom += values
-
-    # Add value labels inside bars
-    for i, total in enumerate(bottom):
-        ax.text(
-            dates[i],
-            total * 0.5,
-            f"{total:.0f}",
-            ha='center',
-            va='center',
-            fontsize=9,
-            fontweight='bold',
-            color='black',
-            rotation=90
-        )
-
-    # Styling
-    ax.set_ylabel("Consumption (kWh)", fontsize=12)
-    ax.set_xlabel("Date", fontsize=12)
-    label = f"{start_date} to {end_date}" if end_date and start_date != end_date else start_date
-    ax.set_title(f"Daily ToD-wise Consumption\n{plant_name} ({label})", fontsize=14)
-
-    # Smart x-axis ticks
-    ax.set_xticks(dates)
-    ax.xaxis.set_major_formatter(mdates.DateFormatter('%d-%b'))
-    ax.xaxis.set_major_locator(mdates.AutoDateLocator())
-    plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
-
-    # Format Y-axis
-    ax.yaxis.set_major_formatter(FuncFormatter(format_thousands))
-
-    # Ordered legend (from bottom to top stack)
-    legend_handles = [handle for name in slot_order for s, handle in reversed(bar_handles) if s == name]
-    legend_labels = [name for name in slot_order]
-    ax.legend(legend_handles, legend_labels, title="ToD Slot", loc='upper left', bbox_to_anchor=(1.01, 1), frameon=False)
-
-    plt.tight_layout()
-    return fig
-
-
-
-
-
-
-
-